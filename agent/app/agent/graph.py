@@ -32,6 +32,7 @@ _PATIENT_SCOPED_TOOLS = {
     "get_vitals",
     "get_allergies_detailed",
     "create_clinical_note",
+    "get_interaction_screening",
 }
 
 # Tools that require human approval before proceeding
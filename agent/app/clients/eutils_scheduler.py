@@ -0,0 +1,177 @@
+"""Process-wide request scheduler for NCBI E-utilities.
+
+NCBI allows 3 requests/second per IP without an API key and 10 with one, and
+answers bursts above that with 429. Every PubMedClient sends through a
+RateLimitedTransport, which takes a token from the EUtilsScheduler shared by
+all clients using the same key before each attempt (retries included).
+
+Requests that cannot get a token right away wait in one FIFO queue per
+conversation; the queues are served round-robin, so one chat firing a burst
+of searches cannot starve the others. The conversation comes from the
+``current_conversation`` context variable, which the /chat route sets.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from contextvars import ContextVar
+from typing import Any
+
+import httpx
+
+# E-utilities usage policy, requests per second.
+ANONYMOUS_RATE = 3.0
+API_KEY_RATE = 10.0
+
+current_conversation: ContextVar[str] = ContextVar(
+    "current_conversation", default=""
+)
+
+
+def rate_for(api_key: str) -> float:
+    return API_KEY_RATE if api_key else ANONYMOUS_RATE
+
+
+class EUtilsScheduler:
+    """Token bucket with fair per-conversation queueing.
+
+    ``burst`` is the bucket size; the default of 1 spaces requests evenly at
+    1/rate so no one-second window ever exceeds the policy.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._queues: OrderedDict[str, deque[tuple[asyncio.Future[None], float]]] = (
+            OrderedDict()
+        )
+        self._dispatcher: asyncio.Task[None] | None = None
+        self.granted = 0
+        self.queued = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def acquire(self, conversation: str = "") -> None:
+        """Wait for a token; callers of one conversation are served in order."""
+        if not self._queues and self._take_token():
+            self.granted += 1
+            return
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(conversation, deque()).append((future, self._clock()))
+        self.queued += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        # A cancelled waiter is skipped by the dispatcher without using a token.
+        await future
+
+    async def _dispatch(self) -> None:
+        while self._queues:
+            delay = self._until_token()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            conversation, queue = next(iter(self._queues.items()))
+            future, enqueued_at = queue.popleft()
+            if queue:
+                self._queues.move_to_end(conversation)
+            else:
+                del self._queues[conversation]
+            if future.done():
+                continue
+            self._tokens -= 1
+            wait = self._clock() - enqueued_at
+            self.granted += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            future.set_result(None)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            float(self.burst), self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def _take_token(self) -> bool:
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def _until_token(self) -> float:
+        self._refill()
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+    def queue_depth(self) -> int:
+        return sum(
+            1 for queue in self._queues.values() for future, _ in queue
+            if not future.done()
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "queue_depth": self.queue_depth(),
+            "waiting_conversations": len(self._queues),
+            "granted": self.granted,
+            "queued": self.queued,
+            "avg_wait_seconds": (
+                round(self.total_wait / self.queued, 3) if self.queued else 0.0
+            ),
+            "max_wait_seconds": round(self.max_wait, 3),
+        }
+
+
+class SchedulerRegistry:
+    """Process-wide map of API key -> EUtilsScheduler."""
+
+    def __init__(self) -> None:
+        self._schedulers: dict[str, EUtilsScheduler] = {}
+
+    def get(self, api_key: str = "") -> EUtilsScheduler:
+        scheduler = self._schedulers.get(api_key)
+        if scheduler is None:
+            scheduler = self._schedulers[api_key] = EUtilsScheduler(rate_for(api_key))
+        return scheduler
+
+    def reset(self) -> None:
+        self._schedulers.clear()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        # Never expose the key itself.
+        return {
+            (f"api_key:...{key[-4:]}" if key else "anonymous"): s.stats()
+            for key, s in self._schedulers.items()
+        }
+
+
+registry = SchedulerRegistry()
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that takes a scheduler token before every request."""
+
+    def __init__(
+        self, inner: httpx.AsyncBaseTransport, scheduler: EUtilsScheduler
+    ) -> None:
+        self._inner = inner
+        self.scheduler = scheduler
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self.scheduler.acquire(current_conversation.get())
+        return await self._inner.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
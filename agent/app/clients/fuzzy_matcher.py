@@ -0,0 +1,200 @@
+"""Local approximate drug-name matching (stand-in for RxNav approximateTerm).
+
+Free-text medication strings ("Metformin 500mg", "lisinoprl tab") are first
+reduced to their drug words by stripping dose, unit, route and dose-form
+tokens. The remainder is matched against the ingredient/brand vocabulary of
+the offline RxNorm index with a trigram index:
+
+1. names sharing the most trigrams with the query (and of a plausible
+   length) become candidates,
+2. candidates are re-ranked by Levenshtein distance,
+3. scores are 0-100, like RxNav's approximateTerm scores.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Any
+
+_DOSE_RE = re.compile(
+    r"\b\d+(?:[.,]\d+)?\s*(?:mg|mcg|µg|ug|g|gm|kg|ml|l|meq|mmol|iu|units?|%|hr|h)?\b"
+    r"|(?<=\d)\s*(?:mg|mcg|ml|%)|%"
+)
+# Route, dose-form and release words that never identify the drug itself.
+_FORM_WORDS = frozenset({
+    "tab", "tabs", "tablet", "tablets", "cap", "caps", "capsule", "capsules",
+    "oral", "po", "iv", "im", "sc", "subq", "sl", "topical", "ophthalmic",
+    "solution", "soln", "susp", "suspension", "syrup", "elixir", "liquid",
+    "injection", "inj", "injectable", "cream", "ointment", "gel", "lotion",
+    "patch", "inhaler", "inhalation", "spray", "nasal", "drops", "powder",
+    "er", "xr", "xl", "sr", "cr", "dr", "ir", "ec", "od", "extended", "delayed",
+    "release", "immediate", "chewable", "disintegrating", "film", "coated",
+    "daily", "bid", "tid", "qid", "qd", "qhs", "prn", "once", "twice",
+    "mg", "mcg", "ml", "unit", "units", "dose", "doses", "each", "per",
+})
+_WORD_RE = re.compile(r"[a-z][a-z\-']*")
+
+
+def strip_dose_form(text: str) -> str:
+    """Reduce a free-text medication string to its drug-name words."""
+    lowered = _DOSE_RE.sub(" ", text.lower())
+    words = [w.strip("-'") for w in _WORD_RE.findall(lowered)]
+    return " ".join(w for w in words if w and w not in _FORM_WORDS)
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def levenshtein(a: str, b: str, max_dist: int | None = None) -> int:
+    """Edit distance between two strings (insert/delete/substitute = 1).
+
+    Bit-parallel (Myers/Hyyrö): one pass over the longer string with the
+    shorter one packed into an int, so drug-name lengths cost a few
+    microseconds. With max_dist, distances above it are reported as
+    max_dist + 1.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    m = len(b)
+    if max_dist is not None and len(a) - m > max_dist:
+        return max_dist + 1
+    if not m:
+        return len(a)
+    peq: dict[str, int] = {}
+    for i, c in enumerate(b):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, dist = mask, 0, m
+    for c in a:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            dist += 1
+        elif mh & last:
+            dist -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    if max_dist is not None:
+        return min(dist, max_dist + 1)
+    return dist
+
+
+def similarity_score(a: str, b: str, min_score: int = 0) -> int:
+    """0-100 similarity from edit distance, relative to the longer string.
+
+    Scores below min_score may be reported as any value below min_score.
+    """
+    longest = max(len(a), len(b))
+    if not longest:
+        return 0
+    max_dist = int(longest * (100 - min_score) / 100) if min_score else None
+    return round(100 * (1 - levenshtein(a, b, max_dist) / longest))
+
+
+class FuzzyMatcher:
+    """Trigram + edit-distance matcher over a fixed drug-name vocabulary."""
+
+    def __init__(
+        self,
+        vocabulary: Iterable[tuple[str, str]],
+        min_score: int = 70,
+        max_candidates: int = 12,
+    ) -> None:
+        """vocabulary yields (name, rxcui) pairs; names are matched lowercased."""
+        self.min_score = min_score
+        self.max_candidates = max_candidates
+        self._names: list[str] = []
+        self._entries: list[list[dict[str, str]]] = []
+        self._grams: list[frozenset[str]] = []
+        self._postings: dict[str, list[int]] = defaultdict(list)
+        by_name: dict[str, int] = {}
+        for name, rxcui in vocabulary:
+            key = " ".join(name.lower().split())
+            idx = by_name.get(key)
+            if idx is None:
+                idx = by_name[key] = len(self._names)
+                self._names.append(key)
+                self._entries.append([])
+                grams = frozenset(trigrams(key))
+                self._grams.append(grams)
+                for gram in grams:
+                    self._postings[gram].append(idx)
+            self._entries[idx].append({"rxcui": rxcui, "name": name})
+        # Free-text med lists repeat the same strings across patients/turns.
+        self._cached_match = lru_cache(maxsize=4096)(self._match)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def match(self, term: str, max_entries: int = 5) -> list[dict[str, Any]]:
+        """Candidates for a free-text drug term, best first.
+
+        Returns dicts with 'rxcui', 'name' and 'score' (0-100), like
+        DrugInteractionClient.get_approximate_match. Cached per term.
+        """
+        return [dict(c) for c in self._cached_match(term, max_entries)]
+
+    def _match(self, term: str, max_entries: int) -> tuple[dict[str, Any], ...]:
+        query = strip_dose_form(term) or " ".join(term.lower().split())
+        if not query:
+            return ()
+        results = self._search(query, max_entries)
+        if not results and " " in query:
+            # "tylenol extra strength": fall back to the leading drug word,
+            # scored a little lower than a full-string match.
+            head = query.split()[0]
+            results = [
+                {**r, "score": r["score"] - 10}
+                for r in self._search(head, max_entries)
+                if r["score"] - 10 >= self.min_score
+            ]
+        return tuple(results)
+
+    def _search(self, query: str, max_entries: int) -> list[dict[str, Any]]:
+        query_grams = trigrams(query)
+        # Count shared trigrams over the rarest posting lists only: the most
+        # common grams ("ine", "in ") would touch a large part of the
+        # vocabulary while hardly changing the ranking. Counting runs in C
+        # (Counter.update); only names of a plausible length are kept.
+        postings = sorted(
+            (p for g in query_grams if (p := self._postings.get(g))), key=len
+        )
+        counts: Counter[int] = Counter()
+        for posting in postings[: max(3, len(postings) * 2 // 3)]:
+            counts.update(posting)
+        slack = len(query) * (100 - self.min_score) / 100 + 1
+        ranked = [
+            i
+            for i, _ in counts.most_common(self.max_candidates * 4)
+            if abs(len(self._names[i]) - len(query)) <= slack
+        ][: self.max_candidates]
+
+        scored: list[tuple[int, str, int]] = []
+        for i in ranked:
+            name = self._names[i]
+            score = similarity_score(query, name, self.min_score)
+            # A whole-word hit ("metformin" in "metformin hydrochloride")
+            # counts as at least a threshold match.
+            if score < self.min_score and query in name.split():
+                score = self.min_score
+            if score >= self.min_score:
+                scored.append((score, name, i))
+        scored.sort(key=lambda s: (-s[0], len(s[1]), s[1]))
+
+        results = [
+            {**entry, "score": score}
+            for score, _, i in scored
+            for entry in self._entries[i]
+        ]
+        return results[:max_entries]
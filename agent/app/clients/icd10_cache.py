@@ -0,0 +1,105 @@
+"""Typeahead-aware LRU cache for ICD-10 search results.
+
+Clinical Tables matches a query when every query word is a prefix of a word
+in the code or the description, so refining a query ("E1" -> "E11" ->
+"E11.6", "diab" -> "diabetes type 2") can only narrow the match set. When a
+cached result for a prefix of the new query was complete (the API reported
+no more hits than it returned), the new query's result is that list filtered
+locally, with no request.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+@dataclass
+class _Entry:
+    results: list[dict[str, str]]
+    complete: bool
+
+
+def _words(result: dict[str, str]) -> list[str]:
+    code = result.get("code", "").lower()
+    return [code, code.replace(".", ""), *_WORD_RE.findall(result.get("description", "").lower())]
+
+
+def matches(result: dict[str, str], query: str) -> bool:
+    """Whether every word of a normalized query prefixes a word of the result."""
+    words = _words(result)
+    return all(any(w.startswith(token) for w in words) for token in query.split())
+
+
+class ICD10QueryCache:
+    """LRU map of normalized query -> results, answering refinements locally."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self.hits = 0
+        self.prefix_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, query: str, max_results: int) -> list[dict[str, str]] | None:
+        """Cached or locally derived results, or None on a miss."""
+        key = normalize_query(query)
+        entry = self._entries.get(key)
+        if entry is not None and (entry.complete or len(entry.results) >= max_results):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _copy(entry.results[:max_results])
+        # Longest complete cached prefix of the query.
+        for end in range(len(key) - 1, 0, -1):
+            prefix = self._entries.get(key[:end])
+            if prefix is None or not prefix.complete:
+                continue
+            self._entries.move_to_end(key[:end])
+            results = [r for r in prefix.results if matches(r, key)]
+            self._store(key, _Entry(results, complete=True))
+            self.prefix_hits += 1
+            return _copy(results[:max_results])
+        self.misses += 1
+        return None
+
+    def put(
+        self, query: str, results: list[dict[str, str]], complete: bool
+    ) -> None:
+        """Cache an API result; complete means no hits were left out."""
+        self._store(normalize_query(query), _Entry(_copy(results), complete))
+
+    def _store(self, key: str, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.prefix_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "prefix_hits": self.prefix_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (
+                round((self.hits + self.prefix_hits) / lookups, 3) if lookups else 0.0
+            ),
+        }
+
+
+def _copy(results: list[dict[str, str]]) -> list[dict[str, str]]:
+    return [dict(r) for r in results]
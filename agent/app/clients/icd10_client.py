@@ -1,9 +1,15 @@
 """ICD-10 code lookup using NLM Clinical Tables API."""
 
 import logging
+from typing import Any
 
 import httpx
 
+from app.clients.icd10_cache import ICD10QueryCache
+from app.clients.icd10_index import ICD10Index
+from app.clients.retry import RetryPolicy, RetryTransport
+from app.clients.upstream_guard import GuardedTransport
+
 logger = logging.getLogger(__name__)
 
 ICD10_BASE = "https://clinicaltables.nlm.nih.gov/api/icd10cm/v3/search"
@@ -12,8 +18,21 @@ ICD10_BASE = "https://clinicaltables.nlm.nih.gov/api/icd10cm/v3/search"
 class ICD10Client:
     """Searches ICD-10-CM codes via the NLM Clinical Tables API (no auth required)."""
 
-    def __init__(self, timeout: float = 30.0) -> None:
-        self.http = httpx.AsyncClient(timeout=timeout)
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        retry: RetryPolicy | None = None,
+        index: ICD10Index | None = None,
+        cache_size: int = 1024,
+    ) -> None:
+        self.http = httpx.AsyncClient(
+            timeout=timeout,
+            transport=RetryTransport(GuardedTransport(), retry, client="icd10"),
+        )
+        # Offline CMS code set; when loaded, searches never leave the process.
+        self.index = index
+        # Typeahead cache for API results; 0 disables it.
+        self.cache = ICD10QueryCache(cache_size) if cache_size > 0 else None
 
     async def search(
         self, query: str, max_results: int = 10
@@ -21,7 +40,14 @@ class ICD10Client:
         """Search ICD-10-CM codes by keyword or code prefix.
 
         Returns list of {"code": "...", "description": "..."} dicts.
+        Answered from the offline index when one is loaded.
         """
+        if self.index is not None:
+            return self.index.search(query, max_results)
+        if self.cache is not None:
+            cached = self.cache.get(query, max_results)
+            if cached is not None:
+                return cached
         resp = await self.http.get(
             ICD10_BASE,
             params={"sf": "code,name", "terms": query, "maxList": max_results},
@@ -35,7 +61,18 @@ class ICD10Client:
         for i, code in enumerate(codes):
             desc = displays[i][1] if i < len(displays) and len(displays[i]) > 1 else ""
             results.append({"code": code, "description": desc})
+        if self.cache is not None:
+            total = data[0] if data and isinstance(data[0], int) else None
+            complete = (
+                total <= len(results) if total is not None
+                else len(results) < max_results
+            )
+            self.cache.put(query, results, complete)
         return results
 
+    def cache_stats(self) -> dict[str, Any]:
+        """Typeahead cache hit/miss counters (empty when disabled)."""
+        return self.cache.stats() if self.cache is not None else {}
+
     async def close(self) -> None:
         await self.http.aclose()
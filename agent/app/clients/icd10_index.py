@@ -0,0 +1,257 @@
+"""Offline ICD-10-CM index for in-process code and keyword lookups.
+
+Loads a CMS ICD-10-CM release file, either the order file
+(icd10cm_order_YYYY.txt, which also carries category headers such as "E11")
+or the billable codes file (icd10cm_codes_YYYY.txt), and answers the same
+queries as the Clinical Tables API without network access:
+
+- code prefixes ("E11", "e11.6") walk a character trie whose nodes hold the
+  range of matching codes in the sorted code list
+- keywords ("diabetes type 2") go through an inverted token index ranked
+  with BM25; the last query word also matches as a prefix ("diab")
+
+Results use the ICD10Client.search shape: {"code": "E11.9", "description": ...}.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+import re
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# "E", "E1", "E11", "E11.6", "e116", "S72.001A"
+_CODE_QUERY_RE = re.compile(r"^[A-Za-z](?:[0-9](?:[0-9A-Za-z]\.?[0-9A-Za-z]{0,4})?)?$")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = frozenset({
+    "a", "an", "and", "by", "for", "in", "of", "on", "or", "the", "to", "with",
+})
+# BM25 parameters (the usual defaults).
+_K1 = 1.2
+_B = 0.75
+# Last-word prefix expansion is capped so "c" doesn't touch the whole index.
+_MAX_PREFIX_TERMS = 50
+
+
+def format_code(code: str) -> str:
+    """CMS codes are stored without the dot: "E1165" -> "E11.65"."""
+    code = code.strip().upper()
+    return f"{code[:3]}.{code[3:]}" if len(code) > 3 else code
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOP_WORDS]
+
+
+def read_cms_file(path: str) -> list[tuple[str, str]]:
+    """(code, description) pairs from a CMS order or codes file."""
+    entries: list[tuple[str, str]] = []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if not line.strip():
+                continue
+            if line[:5].isdigit() and line[5:6] == " ":
+                # Order file: order(5) code(7) header-flag short(60) long.
+                entries.append((line[6:13].strip(), line[77:].strip()))
+            else:
+                code, _, description = line.partition(" ")
+                entries.append((code, description.strip()))
+    return entries
+
+
+def _contains(posting: array, i: int) -> bool:
+    j = bisect_left(posting, i)
+    return j < len(posting) and posting[j] == i
+
+
+class _TrieNode:
+    __slots__ = ("children", "start", "end")
+
+    def __init__(self, start: int) -> None:
+        self.children: dict[str, _TrieNode] | None = None
+        self.start = start
+        self.end = start + 1
+
+
+class ICD10Index:
+    """In-memory ICD-10-CM code trie plus BM25 keyword index."""
+
+    def __init__(self, entries: Iterable[tuple[str, str]]) -> None:
+        """entries are (code, description); codes with or without the dot."""
+        by_code = {code.replace(".", "").upper(): desc for code, desc in entries if code}
+        self._codes = sorted(by_code)
+        self._descriptions = [by_code[c] for c in self._codes]
+        self._root = _TrieNode(0)
+        self._root.end = 0
+        for i, code in enumerate(self._codes):
+            self._insert(code, i)
+
+        # Keyword side. Documents are numbered shortest description first, so
+        # posting lists (sorted by document) are also sorted by BM25 length
+        # norm: for a fixed set of query terms, the first matches found are
+        # the best ones and a scan can stop after max_results hits.
+        tokenized = [tokenize(desc) for desc in self._descriptions]
+        order = sorted(range(len(tokenized)), key=lambda i: (len(tokenized[i]), i))
+        self._doc_pos = array("I", order)
+        postings: dict[str, list[int]] = defaultdict(list)
+        lengths = []
+        for doc, pos in enumerate(order):
+            lengths.append(len(tokenized[pos]))
+            for token in set(tokenized[pos]):
+                postings[token].append(doc)
+        # Term frequency is taken as 1 (ICD titles rarely repeat a word), so
+        # a posting is just a document number.
+        self._postings = {t: array("I", ids) for t, ids in postings.items()}
+        self._vocabulary = sorted(self._postings)
+        avg_length = sum(lengths) / len(lengths) if lengths else 1.0
+        self._norms = array("d", (
+            (_K1 + 1) / (1 + _K1 * (1 - _B + _B * length / avg_length))
+            for length in lengths
+        ))
+
+    @classmethod
+    def from_file(cls, path: str) -> ICD10Index:
+        return cls(read_cms_file(path))
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def _insert(self, code: str, i: int) -> None:
+        # Codes arrive sorted, so every node's matches form one contiguous
+        # range [start, end) of the sorted code list.
+        node = self._root
+        node.end = i + 1
+        for ch in code:
+            if node.children is None:
+                node.children = {}
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _TrieNode(i)
+            else:
+                child.end = i + 1
+            node = child
+
+    # --- Queries ---
+
+    def search(self, query: str, max_results: int = 10) -> list[dict[str, str]]:
+        """Code-prefix lookup for code-like queries, keyword search otherwise."""
+        query = query.strip()
+        if not query:
+            return []
+        if _CODE_QUERY_RE.match(query):
+            results = self.prefix(query, max_results)
+            if results:
+                return results
+        return self.keyword(query, max_results)
+
+    def prefix(self, code_prefix: str, max_results: int = 10) -> list[dict[str, str]]:
+        """Codes starting with a prefix, in code order (the category first)."""
+        node: _TrieNode | None = self._root
+        for ch in code_prefix.replace(".", "").upper():
+            node = node.children.get(ch) if node and node.children else None
+            if node is None:
+                return []
+        assert node is not None
+        stop = min(node.end, node.start + max_results)
+        return [self._result(i) for i in range(node.start, stop)]
+
+    def keyword(self, query: str, max_results: int = 10) -> list[dict[str, str]]:
+        """BM25-ranked codes whose descriptions contain every query word.
+
+        The last word also matches as a prefix. Falls back to matching any
+        word when no description has them all.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        groups = [self._terms([t]) for t in tokens[:-1]]
+        groups.append(self._terms(self._expand(tokens[-1])))
+        scores: dict[int, float] = {}
+        if all(groups):
+            scores = self._match_all(groups, max_results)
+        if not scores:
+            scores = self._match_any(groups)
+        ranked = heapq.nsmallest(max_results, scores.items(), key=lambda s: (-s[1], s[0]))
+        return [self._result(self._doc_pos[doc]) for doc, _ in ranked]
+
+    def _terms(self, terms: list[str]) -> list[tuple[array, float]]:
+        n = len(self._codes)
+        found = []
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is not None:
+                idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                found.append((posting, idf))
+        return found
+
+    def _expand(self, token: str) -> list[str]:
+        """The token itself plus vocabulary words it is a prefix of."""
+        start = bisect_left(self._vocabulary, token)
+        terms: list[str] = []
+        for term in self._vocabulary[start:start + _MAX_PREFIX_TERMS]:
+            if not term.startswith(token):
+                break
+            terms.append(term)
+        return terms or [token]
+
+    def _match_all(
+        self, groups: list[list[tuple[array, float]]], limit: int
+    ) -> dict[int, float]:
+        """Top documents containing one term of every group.
+
+        Each alternative for the last (prefix-expanded) group is a separate
+        conjunctive query with a constant idf sum, so its best documents are
+        its first matches in document order. Their union holds the overall
+        top `limit`.
+        """
+        fixed = [g[0] for g in groups[:-1]]
+        fixed_idf = sum(idf for _, idf in fixed)
+        scores: dict[int, float] = {}
+        for posting, idf in groups[-1]:
+            lists = sorted([p for p, _ in fixed] + [posting], key=len)
+            driver, others = lists[0], lists[1:]
+            weight = fixed_idf + idf
+            hits = 0
+            for doc in driver:
+                for other in others:
+                    if not _contains(other, doc):
+                        break
+                else:
+                    score = weight * self._norms[doc]
+                    if score > scores.get(doc, 0.0):
+                        scores[doc] = score
+                    hits += 1
+                    if hits == limit:
+                        break
+        return scores
+
+    def _match_any(self, groups: list[list[tuple[array, float]]]) -> dict[int, float]:
+        """BM25 over documents matching any group (the rare fallback)."""
+        scores: dict[int, float] = {}
+        for group in groups:
+            best: dict[int, float] = {}
+            for posting, idf in group:
+                for doc in posting:
+                    if idf > best.get(doc, 0.0):
+                        best[doc] = idf
+            for doc, idf in best.items():
+                scores[doc] = scores.get(doc, 0.0) + idf * self._norms[doc]
+        return scores
+
+    def _result(self, i: int) -> dict[str, str]:
+        return {"code": format_code(self._codes[i]), "description": self._descriptions[i]}
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "codes": len(self._codes),
+            "terms": len(self._postings),
+            "postings": sum(len(p) for p in self._postings.values()),
+        }
@@ -0,0 +1,77 @@
+"""Drug-drug interaction results stored per unordered RxCUI pair.
+
+A medication-list check is broken into its pairs. Pairs already in the store
+(including pairs known to have no interaction) are answered locally, so only
+the pairs touched by a newly added drug go to RxNav. Entries live in the
+shared SqliteTTLCache under their own namespace.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from app.persistence.ttl_cache import SqliteTTLCache
+
+INTERACTION_NAMESPACE = "drug_interaction_pair"
+DEFAULT_INTERACTION_TTL = 7 * 24 * 3600.0
+
+
+def pair_key(a: str, b: str) -> str:
+    """Order-independent key for a pair of RxCUIs ("1191+2670")."""
+    return "+".join(sorted((a, b), key=lambda r: (len(r), r)))
+
+
+def unique_pairs(rxcuis: list[str]) -> list[tuple[str, str]]:
+    """Distinct unordered pairs of distinct RxCUIs, in input order."""
+    ordered = list(dict.fromkeys(rxcuis))
+    return [
+        (a, b)
+        for i, a in enumerate(ordered)
+        for b in ordered[i + 1:]
+    ]
+
+
+def group_by_pair(
+    interactions: list[dict[str, Any]],
+) -> tuple[dict[str, list[dict[str, Any]]], list[dict[str, Any]]]:
+    """Split parsed interactions into {pair_key: [...]} plus unkeyable ones.
+
+    Mirrored pairs (A-B and B-A) and the same finding reported twice collapse
+    into one entry. Interactions without two RxCUIs can't be keyed and are
+    returned separately, uncached.
+    """
+    by_pair: dict[str, list[dict[str, Any]]] = {}
+    unkeyed: list[dict[str, Any]] = []
+    seen: set[tuple[str, str, str]] = set()
+    for interaction in interactions:
+        rxcuis = interaction.get("rxcuis", [])
+        if len(rxcuis) != 2 or not all(rxcuis):
+            unkeyed.append(interaction)
+            continue
+        key = pair_key(*rxcuis)
+        fingerprint = (key, interaction["severity"], interaction["description"])
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        by_pair.setdefault(key, []).append(interaction)
+    return by_pair, unkeyed
+
+
+class InteractionPairStore:
+    """Per-pair interaction results in a SqliteTTLCache.
+
+    An empty list is a stored negative: RxNav reported no interaction for
+    that pair.
+    """
+
+    def __init__(
+        self, cache: SqliteTTLCache, ttl: float = DEFAULT_INTERACTION_TTL
+    ) -> None:
+        self.cache = cache
+        self.ttl = ttl
+
+    async def get_many(self, keys: list[str]) -> dict[str, list[dict[str, Any]]]:
+        return await self.cache.get_many(INTERACTION_NAMESPACE, keys)
+
+    async def set_many(self, results: dict[str, list[dict[str, Any]]]) -> None:
+        await self.cache.set_many(INTERACTION_NAMESPACE, results, self.ttl)
@@ -0,0 +1,284 @@
+"""Offline BM25 literature index over a PubMed baseline subset.
+
+build_index() streams PubMed baseline XML files (pubmedYYnNNNN.xml[.gz], or
+any efetch output) through the efetch ArticleStream and writes an on-disk
+inverted index to a SQLite file:
+
+- articles: document number -> PMID, the search-result fields, MeSH terms
+  and the full abstract (zlib-compressed)
+- postings: term -> document frequency plus two packed arrays, the sorted
+  document numbers and the term frequency in each
+- doc_lengths: one packed array of document lengths for BM25 length norms
+
+Title and MeSH terms count twice towards term frequency, so an article
+about a topic outranks one that only mentions it in the abstract.
+
+LiteratureIndex answers queries in the PubMedClient.search result shape
+({"pmid", "title", "authors", "source", "pubdate"}) by reading only the
+posting rows of the query terms, and serves abstracts in the
+PubMedClient.iter_abstracts record shape, so both work without E-utilities.
+"""
+
+from __future__ import annotations
+
+import gzip
+import heapq
+import json
+import logging
+import math
+import re
+import sqlite3
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from app.clients.pubmed_efetch import DEFAULT_ABSTRACT_TOKENS, ArticleStream, truncate_to_tokens
+from app.persistence.sqlite_build import building_sqlite
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "that", "the", "this", "to", "was", "were", "with",
+})
+# BM25 parameters (the usual defaults).
+_K1 = 1.2
+_B = 0.75
+# Field weights: title and MeSH occurrences count this many times.
+_TITLE_WEIGHT = 2
+_MESH_WEIGHT = 2
+# A term whose posting list is this many times longer than the current
+# candidate set only rescores the candidates (by binary search) instead of
+# adding every document it appears in.
+_RESCORE_RATIO = 8
+# Baseline files are read in chunks of this size.
+_CHUNK_BYTES = 1 << 20
+# Never truncate abstracts while indexing.
+_NO_BUDGET = 1 << 30
+# PMIDs per abstracts() statement, under SQLite's bound-variable limit.
+_MAX_IDS_PER_QUERY = 500
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOP_WORDS]
+
+
+def read_baseline(path: str) -> Iterator[dict[str, Any]]:
+    """Article records from a PubMed XML file, gzipped or not."""
+    opener = gzip.open if path.endswith(".gz") else open
+    stream = ArticleStream(max_tokens=_NO_BUDGET)
+    with opener(path, "rb") as f:
+        while chunk := f.read(_CHUNK_BYTES):
+            yield from stream.feed(chunk)
+    yield from stream.close()
+
+
+def _term_counts(article: dict[str, Any]) -> Counter[str]:
+    counts: Counter[str] = Counter(tokenize(article.get("abstract", "")))
+    for token in tokenize(article.get("title", "")):
+        counts[token] += _TITLE_WEIGHT
+    for token in tokenize(" ".join(article.get("mesh_terms", []))):
+        counts[token] += _MESH_WEIGHT
+    return counts
+
+
+def build_index(articles: Iterable[dict[str, Any]], db_path: str) -> dict[str, int]:
+    """Build the SQLite index from article records.
+
+    Later records with an already-seen PMID (baseline updates) replace the
+    earlier version. Postings are accumulated in memory and written once, so
+    a full baseline needs RAM for its term counts but a single pass over the
+    files. Returns article and term counts.
+    """
+    # Abstracts are reduced to term counts as they stream past; the text
+    # itself is kept compressed for offline abstract retrieval.
+    by_pmid: dict[str, tuple[tuple[str, str, str, str, str, bytes], Counter[str]]] = {}
+    for article in articles:
+        if article.get("pmid"):
+            fields = (
+                article.get("title", ""),
+                json.dumps(article.get("authors", [])),
+                article.get("source", ""),
+                article.get("pubdate", ""),
+                json.dumps(article.get("mesh_terms", [])),
+                zlib.compress(article.get("abstract", "").encode()),
+            )
+            by_pmid[article["pmid"]] = (fields, _term_counts(article))
+
+    postings: dict[str, tuple[array, array]] = defaultdict(
+        lambda: (array("I"), array("I"))
+    )
+    lengths = array("I")
+    rows = []
+    for doc, (pmid, (fields, counts)) in enumerate(by_pmid.items()):
+        lengths.append(sum(counts.values()))
+        for term, tf in counts.items():
+            docs, tfs = postings[term]
+            docs.append(doc)
+            tfs.append(tf)
+        rows.append((doc, pmid, *fields))
+    by_pmid.clear()
+
+    with building_sqlite(db_path) as conn:
+        conn.executescript(
+            """
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE articles (
+                doc INTEGER PRIMARY KEY, pmid TEXT NOT NULL, title TEXT NOT NULL,
+                authors TEXT NOT NULL, source TEXT NOT NULL, pubdate TEXT NOT NULL,
+                mesh_terms TEXT NOT NULL, abstract BLOB NOT NULL
+            );
+            CREATE TABLE postings (
+                term TEXT PRIMARY KEY, df INTEGER NOT NULL, docs BLOB NOT NULL,
+                tfs BLOB NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE doc_lengths (lengths BLOB NOT NULL);
+            """
+        )
+        conn.executemany("INSERT INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany(
+            "INSERT INTO postings VALUES (?, ?, ?, ?)",
+            (
+                (term, len(docs), docs.tobytes(), tfs.tobytes())
+                for term, (docs, tfs) in postings.items()
+            ),
+        )
+        conn.execute("INSERT INTO doc_lengths VALUES (?)", (lengths.tobytes(),))
+        conn.execute("CREATE UNIQUE INDEX articles_pmid ON articles (pmid)")
+        conn.commit()
+        conn.execute("VACUUM")
+    built = {"articles": len(rows), "terms": len(postings)}
+    logger.info("Built literature index at %s: %s", db_path, built)
+    return built
+
+
+class LiteratureIndex:
+    """Read-only BM25 search against an index built by build_index()."""
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self._conn = sqlite3.connect(
+            f"file:{db_path}?mode=ro", uri=True, check_same_thread=False
+        )
+        row = self._conn.execute("SELECT lengths FROM doc_lengths").fetchone()
+        lengths = array("I")
+        lengths.frombytes(row[0])
+        avg_length = sum(lengths) / len(lengths) if lengths else 1.0
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(articles)")}
+        # Indexes built before abstracts were stored can still be searched.
+        self.has_abstracts = "abstract" in columns
+        if not self.has_abstracts:
+            logger.warning(
+                "Literature index %s has no abstracts; rebuild it to serve them", db_path
+            )
+        # Per-document BM25 length factor, precomputed once.
+        self._norms = array("d", (
+            _K1 * (1 - _B + _B * length / avg_length) for length in lengths
+        ))
+        self.queries = 0
+
+    def __len__(self) -> int:
+        return len(self._norms)
+
+    def search(self, query: str, max_results: int = 5) -> list[dict[str, Any]]:
+        """BM25-ranked articles matching any query term.
+
+        Terms are scored rarest first. Once rarer terms have produced
+        candidates, a much more common term only adds to their scores, so
+        articles matching nothing but common words are not ranked at all.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._norms:
+            return []
+        self.queries += 1
+        placeholders = ",".join("?" * len(terms))
+        rows = self._conn.execute(
+            f"SELECT df, docs, tfs FROM postings WHERE term IN ({placeholders}) "
+            f"ORDER BY df",
+            terms,
+        ).fetchall()
+        n = len(self._norms)
+        norms = self._norms
+        scores: dict[int, float] = defaultdict(float)
+        for df, doc_bytes, tf_bytes in rows:
+            docs, tfs = array("I"), array("I")
+            docs.frombytes(doc_bytes)
+            tfs.frombytes(tf_bytes)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            if scores and df > len(scores) * _RESCORE_RATIO:
+                for doc in list(scores):
+                    i = bisect_left(docs, doc)
+                    if i < df and docs[i] == doc:
+                        tf = tfs[i]
+                        scores[doc] += idf * tf * (_K1 + 1) / (tf + norms[doc])
+                continue
+            for doc, tf in zip(docs, tfs):
+                scores[doc] += idf * tf * (_K1 + 1) / (tf + norms[doc])
+        ranked = heapq.nlargest(max_results, scores.items(), key=lambda s: (s[1], -s[0]))
+        return [self._article(doc) for doc, _ in ranked]
+
+    def _article(self, doc: int) -> dict[str, Any]:
+        pmid, title, authors, source, pubdate = self._conn.execute(
+            "SELECT pmid, title, authors, source, pubdate FROM articles WHERE doc = ?",
+            (doc,),
+        ).fetchone()
+        return {
+            "pmid": pmid,
+            "title": title,
+            "authors": json.loads(authors),
+            "source": source,
+            "pubdate": pubdate,
+        }
+
+    def abstracts(
+        self, pmids: list[str], max_tokens: int = DEFAULT_ABSTRACT_TOKENS
+    ) -> list[dict[str, Any]]:
+        """Abstract records for the indexed PMIDs, in the order given.
+
+        Same shape as pubmed_efetch.parse_article(); unknown PMIDs are
+        skipped, and each abstract is cut to about max_tokens.
+        """
+        if not self.has_abstracts:
+            return []
+        pmids = list(dict.fromkeys(pmids))
+        rows: dict[str, tuple[Any, ...]] = {}
+        for start in range(0, len(pmids), _MAX_IDS_PER_QUERY):
+            chunk = pmids[start:start + _MAX_IDS_PER_QUERY]
+            placeholders = ",".join("?" * len(chunk))
+            for row in self._conn.execute(
+                f"SELECT pmid, title, authors, source, pubdate, mesh_terms, abstract "
+                f"FROM articles WHERE pmid IN ({placeholders})",
+                chunk,
+            ):
+                rows[row[0]] = row
+        records = []
+        for pmid in pmids:
+            if pmid not in rows:
+                continue
+            _, title, authors, source, pubdate, mesh_terms, abstract = rows[pmid]
+            text, truncated = truncate_to_tokens(
+                zlib.decompress(abstract).decode(), max_tokens
+            )
+            records.append({
+                "pmid": pmid,
+                "title": title,
+                "authors": json.loads(authors),
+                "source": source,
+                "pubdate": pubdate,
+                "abstract": text,
+                "mesh_terms": json.loads(mesh_terms),
+                "truncated": truncated,
+            })
+        return records
+
+    def stats(self) -> dict[str, Any]:
+        terms = self._conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+        return {"articles": len(self), "terms": terms, "queries": self.queries}
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,39 @@
+"""Per-request counters for outbound upstream calls.
+
+CostTrackerMiddleware opens a RequestMetrics for each /chat request; client
+transports record into whichever one is current, so the counts land in the
+cost log next to the request's timing. Outside a request nothing is recorded.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class RequestMetrics:
+    """Upstream retry counts for one inbound request, keyed by client name."""
+
+    retries: Counter[str] = field(default_factory=Counter)
+    retry_wait_seconds: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "upstream_retries": dict(self.retries),
+            "upstream_retry_wait_seconds": round(self.retry_wait_seconds, 3),
+        }
+
+
+current_metrics: ContextVar[RequestMetrics | None] = ContextVar(
+    "current_metrics", default=None
+)
+
+
+def record_retry(client: str, delay: float) -> None:
+    metrics = current_metrics.get()
+    if metrics is not None:
+        metrics.retries[client] += 1
+        metrics.retry_wait_seconds += delay
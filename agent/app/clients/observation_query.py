@@ -0,0 +1,155 @@
+"""FHIR Observation search filters, with a client-side fallback.
+
+ObservationQuery turns date windows, LOINC codes, sort order, a result count
+and an _elements projection into FHIR search params. Servers are free to
+ignore search params they do not support, so the same filters are applied
+again to whatever comes back — results are correct either way, and only
+payload size depends on what the server honoured. A search may stop paging
+early only once the server has echoed the requested _sort in its self link.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+LOINC_SYSTEM = "http://loinc.org"
+
+# Always kept when projecting with _elements (FHIR mandatory elements).
+_MANDATORY_ELEMENTS = ("resourceType", "id", "meta")
+# Elements effective_date() reads; kept until entries have been sorted.
+_DATE_ELEMENTS = ("effectiveDateTime", "effectivePeriod", "issued")
+
+
+def effective_date(resource: dict[str, Any]) -> str:
+    """Clinically relevant date of an Observation, or "" if it has none."""
+    date: str = (
+        resource.get("effectiveDateTime")
+        or resource.get("effectivePeriod", {}).get("start")
+        or resource.get("issued")
+        or ""
+    )
+    return date
+
+
+@dataclass
+class ObservationQuery:
+    """Filters for an Observation search.
+
+    Dates are ISO dates (YYYY-MM-DD) and inclusive. Codes are LOINC codes,
+    optionally prefixed with a system ("system|code"). sort is "date" or
+    "-date". count caps the number of results returned.
+    """
+
+    date_from: str | None = None
+    date_to: str | None = None
+    codes: list[str] = field(default_factory=list)
+    sort: str | None = None
+    count: int | None = None
+    elements: list[str] = field(default_factory=list)
+
+    def search_params(self) -> dict[str, Any]:
+        """FHIR search params for these filters."""
+        params: dict[str, Any] = {}
+        dates = []
+        if self.date_from:
+            dates.append(f"ge{self.date_from}")
+        if self.date_to:
+            dates.append(f"le{self.date_to}")
+        if dates:
+            params["date"] = dates if len(dates) > 1 else dates[0]
+        if self.codes:
+            params["code"] = ",".join(
+                c if "|" in c else f"{LOINC_SYSTEM}|{c}" for c in self.codes
+            )
+        if self.sort:
+            params["_sort"] = self.sort
+        if self.count:
+            params["_count"] = str(self.count)
+        if self.elements:
+            # A server may honour _elements but not _sort; keep the dates
+            # the local sort reads. project() drops them again afterwards.
+            elements = list(self.elements)
+            if self.sort:
+                elements += [e for e in _DATE_ELEMENTS if e not in elements]
+            params["_elements"] = ",".join(elements)
+        return params
+
+    def matches(self, resource: dict[str, Any]) -> bool:
+        """Whether a resource passes the date and code filters."""
+        if self.date_from or self.date_to:
+            date = effective_date(resource)[:10]
+            if not date:
+                return False
+            if self.date_from and date < self.date_from[:10]:
+                return False
+            if self.date_to and date > self.date_to[:10]:
+                return False
+        if self.codes:
+            wanted = {c.rsplit("|", 1)[-1] for c in self.codes}
+            codings = resource.get("code", {}).get("coding", [])
+            if not any(c.get("code") in wanted for c in codings):
+                return False
+        return True
+
+    def filter_page(self, entries: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Drop entries the server should have excluded."""
+        kept = [e for e in entries if self.matches(e.get("resource", {}))]
+        if len(kept) < len(entries):
+            logger.debug(
+                "Server ignored Observation filters; dropped %d entries client-side",
+                len(entries) - len(kept),
+            )
+        return kept
+
+    def sort_confirmed(self, page: dict[str, Any]) -> bool:
+        """Whether the server says it applied the requested sort.
+
+        FHIR servers echo the search params they honoured in the Bundle's
+        self link; a sort that is not echoed there may have been ignored.
+        """
+        if not self.sort:
+            return True
+        for link in page.get("link", []):
+            if link.get("relation") == "self" and link.get("url"):
+                sorts = parse_qs(urlsplit(link["url"]).query).get("_sort", [])
+                return any(s.split(",")[0] == self.sort for s in sorts)
+        return False
+
+    def is_ordered(self, entries: list[dict[str, Any]]) -> bool:
+        """Whether entries are already in the requested sort order."""
+        if not self.sort:
+            return True
+        dates = [effective_date(e.get("resource", {})) for e in entries]
+        if self.sort.startswith("-"):
+            return all(a >= b for a, b in zip(dates, dates[1:]))
+        return all(a <= b for a, b in zip(dates, dates[1:]))
+
+    def project(self, entries: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Apply the _elements projection (for servers that ignored it)."""
+        if not self.elements:
+            return entries
+        keep = set(self.elements) | set(_MANDATORY_ELEMENTS)
+        return [
+            {**e, "resource": {k: v for k, v in e.get("resource", {}).items() if k in keep}}
+            for e in entries
+        ]
+
+    def finalize(self, entries: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Sort, truncate and project filtered entries.
+
+        Projection comes last: it may drop the date elements the sort reads.
+        """
+        if self.sort and not self.is_ordered(entries):
+            entries = sorted(
+                entries,
+                key=lambda e: effective_date(e.get("resource", {})),
+                reverse=self.sort.startswith("-"),
+            )
+        if self.count is not None:
+            entries = entries[: self.count]
+        return self.project(entries)
@@ -1,29 +1,59 @@
 """OpenEMR FHIR/REST client with OAuth2 auto-registration and token management."""
 
+import asyncio
+import json
 import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
 from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit
 
 import httpx
 
+from app.clients.observation_query import ObservationQuery
+from app.clients.response_cache import ResponseCache
+from app.clients.retry import RetryPolicy, RetryTransport
+from app.clients.singleflight import SingleFlight
+from app.clients.token_manager import TokenManager
+from app.clients.upstream_guard import GuardedTransport
 from app.config import Settings
 
 logger = logging.getLogger(__name__)
 
+# Chart sections fetched by get_chart(), in display order.
+CHART_SECTIONS = ("patient", "conditions", "medications", "allergies", "vitals")
+
 
 class OpenEMRClient:
     """Async client for OpenEMR FHIR R4 and REST APIs.
 
     On first authenticate(), auto-registers an OAuth2 client via RFC 7591
     dynamic client registration, then obtains a token via password grant.
-    Automatically retries on 401 (token expiry).
+    Tokens are refreshed ahead of expiry and on 401, one refresh at a time
+    (see TokenManager).
+
+    GET responses are cached per patient (see ResponseCache). Pass a cache
+    instance to share or customise it; by default one is created from
+    settings unless openemr_cache_enabled is False.
     """
 
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self, settings: Settings, cache: ResponseCache | None = None
+    ) -> None:
         self.settings = settings
+        if cache is None and settings.openemr_cache_enabled:
+            cache = ResponseCache(
+                max_bytes=settings.openemr_cache_max_bytes,
+                ttls=settings.openemr_cache_ttls,
+            )
+        self.cache = cache
         # Use persistent credentials if provided, otherwise register dynamically.
         self._client_id: str | None = settings.openemr_client_id or None
         self._client_secret: str | None = settings.openemr_client_secret or None
-        self._access_token: str | None = None
+        self._tokens = TokenManager(
+            self._acquire_token,
+            refresh_margin=settings.openemr_token_refresh_margin_seconds,
+        )
 
         # TLS verification logic
         is_https = settings.openemr_base_url.startswith("https")
@@ -41,8 +71,18 @@ class OpenEMRClient:
 
         self.http = httpx.AsyncClient(
             timeout=settings.tool_timeout_seconds,
-            verify=verify,
+            transport=RetryTransport(
+                GuardedTransport(verify=verify),
+                RetryPolicy.from_settings(settings, "openemr"),
+                client="openemr",
+            ),
         )
+        # Identical concurrent GETs share one request.
+        self._inflight: SingleFlight[bytes] = SingleFlight()
+        # Bounds concurrent section fetches in get_chart().
+        self._fanout = asyncio.Semaphore(settings.openemr_max_concurrency)
+        # Cleared the first time the server rejects a batch Bundle.
+        self._batch_supported = True
 
     # --- OAuth2 ---
 
@@ -73,8 +113,8 @@ class OpenEMRClient:
         self._client_secret = data["client_secret"]
         logger.info("OAuth2 client registered: %s", self._client_id)
 
-    async def _token_request(self) -> None:
-        """Password grant token request."""
+    async def _token_request(self) -> dict[str, Any]:
+        """Password grant token request. Returns the token endpoint response."""
         url = f"{self.settings.openemr_base_url}/oauth2/default/token"
         payload = {
             "grant_type": "password",
@@ -91,15 +131,27 @@ class OpenEMRClient:
             headers={"Content-Type": "application/x-www-form-urlencoded"},
         )
         resp.raise_for_status()
-        data = resp.json()
-        self._access_token = data["access_token"]
-        logger.info("OAuth2 token obtained")
+        data: dict[str, Any] = resp.json()
+        logger.info("OAuth2 token obtained (expires_in=%s)", data.get("expires_in"))
+        return data
 
-    async def authenticate(self) -> None:
-        """Register client (if needed) and obtain access token."""
+    async def _acquire_token(self) -> dict[str, Any]:
+        """Register client (if needed) and request a token. Called by TokenManager."""
         if not self._client_id:
             await self._register_client()
-        await self._token_request()
+        return await self._token_request()
+
+    async def authenticate(self) -> None:
+        """Register client (if needed) and obtain a fresh access token."""
+        await self._tokens.refresh()
+
+    @property
+    def _access_token(self) -> str | None:
+        return self._tokens.access_token
+
+    @_access_token.setter
+    def _access_token(self, token: str | None) -> None:
+        self._tokens.access_token = token
 
     def _auth_headers(self) -> dict[str, str]:
         if not self._access_token:
@@ -110,32 +162,314 @@ class OpenEMRClient:
 
     async def _fhir_get(self, path: str, params: dict | None = None) -> dict[str, Any]:
         """GET from the FHIR API with auto-retry on 401."""
-        if not self._access_token:
-            await self.authenticate()
-        url = f"{self.settings.openemr_fhir_url}/{path}"
-        resp = await self.http.get(url, headers=self._auth_headers(), params=params)
-        if resp.status_code == 401:
-            logger.info("Token expired, re-authenticating")
-            await self.authenticate()
-            resp = await self.http.get(url, headers=self._auth_headers(), params=params)
-        resp.raise_for_status()
-        result: dict[str, Any] = resp.json()
-        return result
+        return await self._cached_get("fhir", self.settings.openemr_fhir_url, path, params)
 
     async def _api_get(self, path: str, params: dict | None = None) -> dict[str, Any]:
         """GET from the REST API with auto-retry on 401."""
-        if not self._access_token:
-            await self.authenticate()
-        url = f"{self.settings.openemr_api_url}/{path}"
-        resp = await self.http.get(url, headers=self._auth_headers(), params=params)
-        if resp.status_code == 401:
-            logger.info("Token expired, re-authenticating")
-            await self.authenticate()
-            resp = await self.http.get(url, headers=self._auth_headers(), params=params)
-        resp.raise_for_status()
-        result: dict[str, Any] = resp.json()
+        return await self._cached_get("api", self.settings.openemr_api_url, path, params)
+
+    async def _cached_get(
+        self, namespace: str, base_url: str, path: str, params: dict | None
+    ) -> dict[str, Any]:
+        """Serve a GET from the response cache, fetching and storing on a miss.
+
+        Concurrent misses for the same key are coalesced into one request.
+        An expired entry with an ETag/Last-Modified is revalidated with a
+        conditional GET, and a 304 serves the cached body.
+        """
+        key = ResponseCache.make_key(f"{namespace}:{path}", params)
+        if self.cache is not None:
+            body = self.cache.get(key)
+            if body is not None:
+                cached: dict[str, Any] = json.loads(body)
+                return cached
+
+        async def fetch() -> bytes:
+            conditional = self.cache.validators(key) if self.cache is not None else {}
+            resp = await self._authed_get(f"{base_url}/{path}", params, headers=conditional)
+            if resp.status_code == 304 and self.cache is not None:
+                cached_body = self.cache.revalidate(key)
+                if cached_body is not None:
+                    return cached_body
+                # Evicted while in flight — fetch unconditionally.
+                resp = await self._authed_get(f"{base_url}/{path}", params)
+            self._cache_store(
+                key,
+                resp.content,
+                path,
+                params,
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+            )
+            return resp.content
+
+        content = await self._inflight.do(key, fetch)
+        result: dict[str, Any] = json.loads(content)
         return result
 
+    def _cache_store(
+        self,
+        key: str,
+        body: bytes,
+        path: str,
+        params: dict | None,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        if self.cache is not None:
+            self.cache.set(
+                key,
+                body,
+                resource_type=path.split("/", 1)[0],
+                patient_uuid=_patient_scope(path, params),
+                etag=etag,
+                last_modified=last_modified,
+            )
+
+    async def _authed_get(
+        self, url: str, params: dict | None, headers: dict[str, str] | None = None
+    ) -> httpx.Response:
+        """GET with bearer auth, re-authenticating once on 401.
+
+        A 304 is returned as-is when conditional headers were sent.
+        """
+        resp = await self._authed_send(self.http.get, url, headers=headers, params=params)
+        if not (headers and resp.status_code == 304):
+            resp.raise_for_status()
+        return resp
+
+    async def _authed_send(
+        self,
+        send: Callable[..., Awaitable[httpx.Response]],
+        url: str,
+        headers: dict[str, str] | None = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send a request with bearer auth, retrying once after a 401.
+
+        Concurrent 401s for the same token trigger a single refresh.
+        """
+        await self._tokens.get_token()
+        generation = self._tokens.generation
+        resp = await send(url, headers={**self._auth_headers(), **(headers or {})}, **kwargs)
+        if resp.status_code == 401:
+            logger.info("Token rejected, re-authenticating")
+            await self._tokens.refresh(stale_generation=generation)
+            resp = await send(url, headers={**self._auth_headers(), **(headers or {})}, **kwargs)
+        return resp
+
+    # --- FHIR batch ---
+
+    async def execute_batch(
+        self, requests: list[tuple[str, dict | None]]
+    ) -> list[dict[str, Any] | Exception]:
+        """Run several FHIR GETs as a single batch Bundle POST.
+
+        Each request is a (path, params) pair as passed to _fhir_get. Results
+        come back in request order; a request that failed is returned as its
+        exception rather than raised. Cached responses are served without
+        going to the server, and fresh results are cached individually.
+
+        If the server rejects batch Bundles the requests fall back to
+        concurrent single GETs, and batching is skipped from then on.
+        """
+        results: list[dict[str, Any] | Exception | None] = [None] * len(requests)
+        keys = [ResponseCache.make_key(f"fhir:{path}", params) for path, params in requests]
+        pending: list[int] = []
+        for i, key in enumerate(keys):
+            body = self.cache.get(key) if self.cache is not None else None
+            if body is not None:
+                results[i] = json.loads(body)
+            else:
+                pending.append(i)
+
+        batched = None
+        if len(pending) > 1 and self._batch_supported:
+            batched = await self._post_batch([requests[i] for i in pending])
+        if batched is not None:
+            for i, result in zip(pending, batched):
+                if not isinstance(result, Exception):
+                    path, params = requests[i]
+                    self._cache_store(keys[i], json.dumps(result).encode(), path, params)
+                results[i] = result
+        else:
+
+            async def single(i: int) -> None:
+                async with self._fanout:
+                    try:
+                        results[i] = await self._fhir_get(*requests[i])
+                    except Exception as e:
+                        results[i] = e
+
+            await asyncio.gather(*(single(i) for i in pending))
+
+        return [r if r is not None else RuntimeError("No result") for r in results]
+
+    async def _post_batch(
+        self, requests: list[tuple[str, dict | None]]
+    ) -> list[dict[str, Any] | Exception] | None:
+        """POST a batch Bundle. Returns None if the server does not support it."""
+        bundle = {
+            "resourceType": "Bundle",
+            "type": "batch",
+            "entry": [
+                {
+                    "request": {
+                        "method": "GET",
+                        "url": f"{path}?{urlencode(params, doseq=True)}" if params else path,
+                    }
+                }
+                for path, params in requests
+            ],
+        }
+        try:
+            resp = await self._authed_send(
+                self.http.post, self.settings.openemr_fhir_url, json=bundle
+            )
+        except httpx.HTTPError as e:
+            logger.warning("FHIR batch request failed, using single GETs: %s", e)
+            return None
+
+        data: Any = {}
+        if resp.status_code == 200:
+            try:
+                data = resp.json()
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                # An HTML error page or proxy interstitial; likely transient,
+                # so batching stays enabled for later charts.
+                logger.warning("FHIR batch response was not a JSON object; using single GETs")
+                return None
+        entries = data.get("entry", [])
+        if data.get("type") != "batch-response" or len(entries) != len(requests):
+            if resp.status_code < 500:
+                logger.info(
+                    "FHIR server rejected batch Bundle (HTTP %s); using single GETs",
+                    resp.status_code,
+                )
+                self._batch_supported = False
+            return None
+
+        results: list[dict[str, Any] | Exception] = []
+        for (path, _), entry in zip(requests, entries):
+            status = str(entry.get("response", {}).get("status", ""))
+            resource = entry.get("resource")
+            if status.startswith("2") and isinstance(resource, dict):
+                results.append(resource)
+            else:
+                results.append(RuntimeError(f"Batch entry {path} failed: {status}"))
+        return results
+
+    # --- Cache management ---
+
+    def invalidate_patient(self, patient_uuid: str) -> int:
+        """Drop all cached responses for a patient (e.g. after a chart write)."""
+        if self.cache is None:
+            return 0
+        return self.cache.invalidate_patient(patient_uuid)
+
+    def cache_stats(self) -> dict[str, Any]:
+        """Response cache hit/miss counters, or {} when caching is disabled."""
+        return self.cache.stats() if self.cache is not None else {}
+
+    def coalescing_stats(self) -> dict[str, Any]:
+        """How many GETs were sent vs coalesced onto an in-flight request."""
+        return self._inflight.stats()
+
+    # --- Bundle pagination ---
+
+    async def iter_bundle(
+        self,
+        path: str,
+        params: dict | None = None,
+        page_size: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield the entries of a FHIR search, page by page.
+
+        Follows link[rel=next] until the server stops returning one. Only the
+        current page is held in memory, so callers can stream arbitrarily
+        long result sets. page_size sets _count (default openemr_page_size).
+        """
+        async for page in self._iter_pages(path, params, page_size):
+            for entry in page.get("entry", []):
+                yield entry
+
+    def _search_params(
+        self, params: dict | None, page_size: int | None = None
+    ) -> dict[str, Any]:
+        query = dict(params or {})
+        query.setdefault("_count", str(page_size or self.settings.openemr_page_size))
+        return query
+
+    async def _iter_pages(
+        self,
+        path: str,
+        params: dict | None,
+        page_size: int | None = None,
+        first_page: dict[str, Any] | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield each Bundle page of a search, following next links.
+
+        first_page, if already fetched (e.g. by a batch), is used as-is.
+        """
+        if first_page is not None:
+            page = first_page
+        else:
+            page = await self._fhir_get(path, self._search_params(params, page_size))
+        seen: set[str] = set()
+        while True:
+            yield page
+            next_url = _next_link(page)
+            if not next_url or next_url in seen:
+                return
+            seen.add(next_url)
+            next_path, next_params = self._split_fhir_url(next_url)
+            page = await self._fhir_get(next_path, next_params)
+
+    async def _get_bundle(
+        self,
+        path: str,
+        params: dict | None = None,
+        first_page: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Fetch every page of a search and merge the entries into one Bundle.
+
+        Stops after openemr_max_bundle_entries entries to bound memory.
+        """
+        limit = self.settings.openemr_max_bundle_entries
+        bundle: dict[str, Any] = {}
+        entries: list[dict[str, Any]] = []
+        async for page in self._iter_pages(path, params, first_page=first_page):
+            if not bundle:
+                bundle = {k: v for k, v in page.items() if k not in ("entry", "link")}
+            entries.extend(page.get("entry", []))
+            if len(entries) >= limit:
+                logger.warning("%s search truncated at %d entries", path, limit)
+                del entries[limit:]
+                break
+        bundle["entry"] = entries
+        return bundle
+
+    def _split_fhir_url(self, url: str) -> tuple[str, dict[str, Any]]:
+        """Split an absolute next-page URL into a FHIR path and params.
+
+        OpenEMR builds next links from its public site address, which may not
+        match openemr_fhir_url inside Docker, so the path is taken from
+        whatever follows "/fhir/" and re-based onto the configured URL.
+        """
+        parts = urlsplit(url)
+        base_path = urlsplit(self.settings.openemr_fhir_url).path.rstrip("/")
+        if base_path and parts.path.startswith(base_path + "/"):
+            path = parts.path[len(base_path) + 1:]
+        else:
+            path = parts.path.split("/fhir/", 1)[-1].lstrip("/")
+        values: dict[str, list[str]] = {}
+        for key, value in parse_qsl(parts.query, keep_blank_values=True):
+            values.setdefault(key, []).append(value)
+        params = {k: v[0] if len(v) == 1 else v for k, v in values.items()}
+        return path, params
+
     # --- FHIR resource methods ---
 
     async def get_patient(self, patient_uuid: str) -> dict[str, Any]:
@@ -150,40 +484,208 @@ class OpenEMRClient:
         if name:
             search_params["name"] = name
         search_params.update(params)
-        return await self._fhir_get("Patient", params=search_params)
+        return await self._get_bundle("Patient", params=search_params)
 
     async def get_conditions(self, patient_uuid: str) -> dict[str, Any]:
         """Fetch Condition resources for a patient."""
-        return await self._fhir_get("Condition", params={"patient": patient_uuid})
+        return await self._get_bundle("Condition", params={"patient": patient_uuid})
 
     async def get_medications(self, patient_uuid: str) -> dict[str, Any]:
         """Fetch MedicationRequest resources for a patient."""
-        return await self._fhir_get(
+        return await self._get_bundle(
             "MedicationRequest", params={"patient": patient_uuid}
         )
 
     async def get_observations(
-        self, patient_uuid: str, category: str | None = None
+        self,
+        patient_uuid: str,
+        category: str | None = None,
+        *,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        codes: list[str] | None = None,
+        sort: str | None = None,
+        count: int | None = None,
+        elements: list[str] | None = None,
     ) -> dict[str, Any]:
-        """Fetch Observation resources (labs, vitals) for a patient."""
-        params: dict[str, str] = {"patient": patient_uuid}
+        """Fetch Observation resources (labs, vitals) for a patient.
+
+        Optional filters are sent as FHIR search params (date=ge/le, code,
+        _sort, _count, _elements) and re-applied to the results in case the
+        server ignores any of them. See ObservationQuery.
+        """
+        params: dict[str, Any] = {"patient": patient_uuid}
         if category:
             params["category"] = category
-        return await self._fhir_get("Observation", params=params)
+        query = ObservationQuery(
+            date_from=date_from,
+            date_to=date_to,
+            codes=codes or [],
+            sort=sort,
+            count=count,
+            elements=elements or [],
+        )
+        params.update(query.search_params())
+
+        limit = self.settings.openemr_max_bundle_entries
+        bundle: dict[str, Any] = {}
+        entries: list[dict[str, Any]] = []
+        sorted_by_server = False
+        async for page in self._iter_pages("Observation", params):
+            if not bundle:
+                bundle = {k: v for k, v in page.items() if k not in ("entry", "link")}
+                sorted_by_server = query.sort_confirmed(page)
+            entries.extend(query.filter_page(page.get("entry", [])))
+            # Once the server has confirmed _sort, the first `count` matches
+            # are the answer; otherwise read every page and sort locally.
+            if count is not None and len(entries) >= count and sorted_by_server:
+                break
+            if len(entries) >= limit:
+                logger.warning("Observation search truncated at %d entries", limit)
+                break
+        bundle["entry"] = query.finalize(entries[:limit])
+        return bundle
 
     async def get_allergies(self, patient_uuid: str) -> dict[str, Any]:
         """Fetch AllergyIntolerance resources for a patient."""
-        return await self._fhir_get(
+        return await self._get_bundle(
             "AllergyIntolerance", params={"patient": patient_uuid}
         )
 
     async def get_appointments(self, patient_uuid: str) -> dict[str, Any]:
         """Fetch Appointment resources for a patient."""
-        return await self._fhir_get("Appointment", params={"patient": patient_uuid})
+        return await self._get_bundle("Appointment", params={"patient": patient_uuid})
+
+    async def get_vitals(self, patient_uuid: str, **filters: Any) -> dict[str, Any]:
+        """Fetch vital signs (Observation category=vital-signs).
 
-    async def get_vitals(self, patient_uuid: str) -> dict[str, Any]:
-        """Fetch vital signs (Observation category=vital-signs)."""
-        return await self.get_observations(patient_uuid, category="vital-signs")
+        Accepts the same keyword filters as get_observations().
+        """
+        return await self.get_observations(
+            patient_uuid, category="vital-signs", **filters
+        )
+
+    # --- Chart fan-out ---
+
+    async def get_chart(
+        self, patient_uuid: str, sections: Iterable[str] | None = None
+    ) -> dict[str, Any]:
+        """Fetch several chart sections for one patient concurrently.
+
+        When openemr_fhir_batch is on, the first page of every section is
+        requested in one batch Bundle (sections then share one timing);
+        otherwise section fetches run concurrently under a semaphore sized by
+        openemr_max_concurrency. A failing section does not fail the chart —
+        its error is reported and the remaining sections are still returned.
+
+        Returns a dict with:
+            sections: dict[str, dict]  (resource or bundle per fetched section)
+            errors: dict[str, str]  (section -> "ExceptionType: message")
+            timings_ms: dict[str, float]  (per-section fetch time)
+        """
+        fetchers: dict[str, Callable[[str], Awaitable[dict[str, Any]]]] = {
+            "patient": self.get_patient,
+            "conditions": self.get_conditions,
+            "medications": self.get_medications,
+            "allergies": self.get_allergies,
+            "vitals": self.get_vitals,
+        }
+        requested = list(sections) if sections is not None else list(CHART_SECTIONS)
+        unknown = [name for name in requested if name not in fetchers]
+        if unknown:
+            raise ValueError(f"Unknown chart section(s): {', '.join(unknown)}")
+
+        chart: dict[str, Any] = {"sections": {}, "errors": {}, "timings_ms": {}}
+        requested = list(dict.fromkeys(requested))
+        if self.settings.openemr_fhir_batch and self._batch_supported and len(requested) > 1:
+            await self._get_chart_batched(patient_uuid, requested, chart)
+            return chart
+
+        async def fetch_section(name: str) -> None:
+            async with self._fanout:
+                start = time.monotonic()
+                try:
+                    chart["sections"][name] = await fetchers[name](patient_uuid)
+                except Exception as e:
+                    logger.warning("Chart section %s failed: %s", name, e)
+                    chart["errors"][name] = f"{type(e).__name__}: {e}"
+                finally:
+                    elapsed = (time.monotonic() - start) * 1000
+                    chart["timings_ms"][name] = round(elapsed, 1)
+
+        await asyncio.gather(*(fetch_section(name) for name in requested))
+        logger.info(
+            "Chart fetched: %s",
+            ", ".join(f"{k}={v}ms" for k, v in chart["timings_ms"].items()),
+        )
+        return chart
+
+    async def _get_chart_batched(
+        self, patient_uuid: str, sections: list[str], chart: dict[str, Any]
+    ) -> None:
+        """Fill chart with sections fetched through one batch Bundle."""
+        queries = [_chart_query(name, patient_uuid) for name in sections]
+        requests = [
+            (path, params if path.startswith("Patient/") else self._search_params(params))
+            for path, params in queries
+        ]
+        start = time.monotonic()
+        results = await self.execute_batch(requests)
+        for name, (path, params), result in zip(sections, requests, results):
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                if _next_link(result):
+                    result = await self._get_bundle(path, params, first_page=result)
+                elif not path.startswith("Patient/"):
+                    result = {k: v for k, v in result.items() if k != "link"}
+                    result.setdefault("entry", [])
+                chart["sections"][name] = result
+            except Exception as e:
+                logger.warning("Chart section %s failed: %s", name, e)
+                chart["errors"][name] = f"{type(e).__name__}: {e}"
+            chart["timings_ms"][name] = round((time.monotonic() - start) * 1000, 1)
+        logger.info(
+            "Chart fetched via batch in %.1f ms (%d sections)",
+            (time.monotonic() - start) * 1000,
+            len(sections),
+        )
 
     async def close(self) -> None:
+        await self._tokens.close()
         await self.http.aclose()
+
+
+def _chart_query(section: str, patient_uuid: str) -> tuple[str, dict | None]:
+    """FHIR path and params behind a get_chart() section.
+
+    Mirrors get_patient/get_conditions/... so batched and single fetches
+    share cache keys.
+    """
+    if section == "patient":
+        return f"Patient/{patient_uuid}", None
+    resource, extra = {
+        "conditions": ("Condition", {}),
+        "medications": ("MedicationRequest", {}),
+        "allergies": ("AllergyIntolerance", {}),
+        "vitals": ("Observation", {"category": "vital-signs"}),
+    }[section]
+    return resource, {"patient": patient_uuid, **extra}
+
+
+def _next_link(bundle: dict[str, Any]) -> str | None:
+    """URL of the next page of a search Bundle, if any."""
+    for link in bundle.get("link", []):
+        if link.get("relation") == "next" and link.get("url"):
+            url: str = link["url"]
+            return url
+    return None
+
+
+def _patient_scope(path: str, params: dict | None) -> str | None:
+    """Patient UUID a request belongs to, used to index cache entries."""
+    if path.startswith("Patient/"):
+        return path.split("/", 2)[1]
+    if params and params.get("patient"):
+        return str(params["patient"])
+    return None
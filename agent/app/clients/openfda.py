@@ -1,21 +1,87 @@
 """Drug interaction client using RxNorm (for RxCUI lookup) and NLM interaction API."""
 
+import asyncio
 import logging
+from collections.abc import Awaitable, Callable
 from typing import Any
 
 import httpx
 
+from app.clients.fuzzy_matcher import FuzzyMatcher
+from app.clients.interaction_store import (
+    InteractionPairStore,
+    group_by_pair,
+    pair_key,
+    unique_pairs,
+)
+from app.clients.retry import RetryPolicy, RetryTransport
+from app.clients.rxnorm_index import RxNormIndex, normalize_name
+from app.clients.upstream_guard import GuardedTransport
+from app.persistence.ttl_cache import SqliteTTLCache
+
 logger = logging.getLogger(__name__)
 
 RXNORM_BASE = "https://rxnav.nlm.nih.gov/REST"
 INTERACTION_BASE = "https://rxnav.nlm.nih.gov/REST/interaction"
 
+RESOLUTION_NAMESPACE = "drug_resolution"
+# RxNorm concepts are stable; unresolved names are retried sooner in case the
+# name was added (RxNorm updates weekly) or the miss was transient.
+DEFAULT_RESOLUTION_TTL = 7 * 24 * 3600.0
+DEFAULT_NEGATIVE_TTL = 3600.0
+# A local fuzzy match (0-100) is used without asking RxNav only at this score
+# or above, and only when it leads any candidate for another ingredient by the
+# margin; "metfromin" -> metformin scores 78.
+FUZZY_ACCEPT_SCORE = 75
+FUZZY_MIN_MARGIN = 10
+
 
 class DrugInteractionClient:
     """Looks up drug interactions via NLM RxNorm + Interaction APIs."""
 
-    def __init__(self, timeout: float = 30.0) -> None:
-        self.http = httpx.AsyncClient(timeout=timeout)
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        retry: RetryPolicy | None = None,
+        resolution_cache: SqliteTTLCache | None = None,
+        resolution_ttl: float = DEFAULT_RESOLUTION_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        max_concurrency: int = 8,
+        rxnorm_index: RxNormIndex | None = None,
+        fuzzy_matcher: FuzzyMatcher | None = None,
+        interaction_store: InteractionPairStore | None = None,
+        hedge_delay: float | None = None,
+    ) -> None:
+        self.http = httpx.AsyncClient(
+            timeout=timeout,
+            transport=RetryTransport(GuardedTransport(), retry, client="rxnav"),
+        )
+        # Persistent name -> resolution cache shared across workers/restarts.
+        self.resolution_cache = resolution_cache
+        self.resolution_ttl = resolution_ttl
+        self.negative_ttl = negative_ttl
+        # Bounds concurrent RxNav calls across all in-flight resolutions. Held
+        # per HTTP call, not per resolution, so nested fan-out can't deadlock.
+        self._slots = asyncio.Semaphore(max_concurrency)
+        # Offline RxNorm index; answers exact/synonym/ingredient lookups
+        # locally, with RxNav as the fallback.
+        self.rxnorm_index = rxnorm_index
+        # Local approximate matching over the index vocabulary (tier 2).
+        self.fuzzy_matcher = fuzzy_matcher
+        # Per-pair interaction results, so incremental list checks only
+        # query RxNav for pairs involving new drugs.
+        self.interaction_store = interaction_store
+        # None runs the RxNav tiers one after another; otherwise lower tiers
+        # are started hedge_delay seconds apart without waiting for the
+        # higher ones to finish.
+        self.hedge_delay = hedge_delay
+
+    async def _get(self, url: str, params: dict[str, Any]) -> httpx.Response:
+        """GET an RxNav endpoint under the concurrency bound."""
+        async with self._slots:
+            resp = await self.http.get(url, params=params)
+        resp.raise_for_status()
+        return resp
 
     # ------------------------------------------------------------------
     # Core RxNorm API methods
@@ -26,11 +92,10 @@ class DrugInteractionClient:
 
         Uses exact match (search=0). Returns the first RxCUI or None.
         """
-        resp = await self.http.get(
+        resp = await self._get(
             f"{RXNORM_BASE}/rxcui.json",
             params={"name": drug_name, "search": 0},
         )
-        resp.raise_for_status()
         data = resp.json()
         id_group = data.get("idGroup", {})
         rxnorm_ids = id_group.get("rxnormId")
@@ -44,11 +109,10 @@ class DrugInteractionClient:
 
         Returns a list of candidate dicts with 'rxcui', 'name', 'score'.
         """
-        resp = await self.http.get(
+        resp = await self._get(
             f"{RXNORM_BASE}/approximateTerm.json",
             params={"term": term, "maxEntries": 5},
         )
-        resp.raise_for_status()
         data = resp.json()
         candidates: list[dict[str, Any]] = []
         group = data.get("approximateGroup", {})
@@ -63,14 +127,18 @@ class DrugInteractionClient:
     async def get_ingredient_rxcui(self, rxcui: str) -> dict[str, Any]:
         """Normalize an RxCUI to its ingredient-level concept.
 
-        Uses /rxcui/{rxcui}/related.json?tty=IN to find the base ingredient.
+        Uses the offline RxNorm index when it knows the RxCUI, otherwise
+        /rxcui/{rxcui}/related.json?tty=IN to find the base ingredient.
         Returns {'rxcui': str, 'name': str} or empty dict if not found.
         """
-        resp = await self.http.get(
+        if self.rxnorm_index is not None:
+            ingredient = self.rxnorm_index.get_ingredient(rxcui)
+            if ingredient:
+                return ingredient
+        resp = await self._get(
             f"{RXNORM_BASE}/rxcui/{rxcui}/related.json",
             params={"tty": "IN"},
         )
-        resp.raise_for_status()
         data = resp.json()
         for group in data.get("relatedGroup", {}).get("conceptGroup", []):
             props = group.get("conceptProperties", [])
@@ -87,11 +155,10 @@ class DrugInteractionClient:
         Uses /drugs.json to find matching drug concepts.
         Returns a list of dicts with 'rxcui' and 'name'.
         """
-        resp = await self.http.get(
+        resp = await self._get(
             f"{RXNORM_BASE}/drugs.json",
             params={"name": name},
         )
-        resp.raise_for_status()
         data = resp.json()
         results: list[dict[str, Any]] = []
         for group in data.get("drugGroup", {}).get("conceptGroup", []):
@@ -109,6 +176,14 @@ class DrugInteractionClient:
     async def resolve_drug_name(self, drug_name: str) -> dict[str, Any]:
         """Resolve a drug name to an RxCUI using 4-tier fallback strategy.
 
+        The offline RxNorm index (exact, synonym, then local fuzzy match) is
+        consulted first, when configured, without any network call. A fuzzy
+        match is only accepted when it is clearly the one drug meant (see
+        _resolve_fuzzy); otherwise RxNav decides. Network results are served
+        from the persistent resolution cache when present, keyed by
+        normalized name. Unresolved names are cached for the shorter
+        negative TTL, and not at all if a tier failed with an error.
+
         Returns a dict with:
             rxcui: str | None
             name: str  (resolved name)
@@ -118,78 +193,51 @@ class DrugInteractionClient:
             ambiguous: bool
             original_name: str
         """
+        if self.rxnorm_index is not None:
+            local = self.rxnorm_index.resolve(drug_name)
+            if local is None and self.fuzzy_matcher is not None:
+                local = self._resolve_fuzzy(drug_name)
+            if local is not None:
+                return local
+
+        key = normalize_name(drug_name)
+        if self.resolution_cache is not None:
+            cached = await self.resolution_cache.get(RESOLUTION_NAMESPACE, key)
+            if cached is not None:
+                return {**cached, "original_name": drug_name}
+
+        resolution, failed = await self._resolve_tiers(drug_name)
+
+        if self.resolution_cache is not None:
+            if resolution["rxcui"]:
+                await self.resolution_cache.set(
+                    RESOLUTION_NAMESPACE, key, resolution, self.resolution_ttl
+                )
+            elif not failed:
+                await self.resolution_cache.set(
+                    RESOLUTION_NAMESPACE, key, resolution, self.negative_ttl
+                )
+        return resolution
+
+    async def _resolve_tiers(self, drug_name: str) -> tuple[dict[str, Any], bool]:
+        """Run the tiers against RxNav. Also returns whether any tier errored."""
         base = {
             "original_name": drug_name,
             "candidates": [],
             "ambiguous": False,
         }
-
-        # Tier 1: Exact match
-        try:
-            rxcui = await self.get_rxcui(drug_name)
-            if rxcui:
-                ingredient = await self._safe_get_ingredient(rxcui)
-                return {
-                    **base,
-                    "rxcui": ingredient.get("rxcui", rxcui),
-                    "name": ingredient.get("name", drug_name),
-                    "resolution_tier": 1,
-                    "confidence": 1.0,
-                }
-        except Exception:
-            logger.debug("Tier 1 failed for %s, trying tier 2", drug_name)
-
-        # Tier 2: Approximate match
-        try:
-            candidates = await self.get_approximate_match(drug_name)
-            if candidates:
-                # Normalize all to ingredient level
-                ingredients = await self._resolve_candidates_to_ingredients(
-                    candidates
-                )
-                unique = _deduplicate_ingredients(ingredients)
-
-                if len(unique) == 1:
-                    ing = unique[0]
-                    return {
-                        **base,
-                        "rxcui": ing["rxcui"],
-                        "name": ing["name"],
-                        "resolution_tier": 2,
-                        "confidence": 0.85,
-                        "candidates": candidates,
-                    }
-                elif len(unique) > 1:
-                    # Ambiguous — multiple different ingredients
-                    return {
-                        **base,
-                        "rxcui": unique[0]["rxcui"],
-                        "name": unique[0]["name"],
-                        "resolution_tier": 2,
-                        "confidence": 0.4,
-                        "candidates": candidates,
-                        "ambiguous": True,
-                    }
-        except Exception:
-            logger.debug("Tier 2 failed for %s, trying tier 3", drug_name)
-
-        # Tier 3: Brand/synonym search
-        try:
-            drugs = await self.get_drugs_by_name(drug_name)
-            if drugs:
-                ingredient = await self._safe_get_ingredient(
-                    drugs[0]["rxcui"]
-                )
-                return {
-                    **base,
-                    "rxcui": ingredient.get("rxcui", drugs[0]["rxcui"]),
-                    "name": ingredient.get("name", drugs[0]["name"]),
-                    "resolution_tier": 3,
-                    "confidence": 0.6,
-                    "candidates": drugs[:3],
-                }
-        except Exception:
-            logger.debug("Tier 3 failed for %s, marking unresolved", drug_name)
+        tiers = (self._tier_exact, self._tier_approximate, self._tier_brand)
+        if self.hedge_delay is None:
+            failed = False
+            for tier in tiers:
+                result, errored = await _run_tier(tier, drug_name, base)
+                failed = failed or errored
+                if result is not None:
+                    return result, failed
+        else:
+            result, failed = await self._race_tiers(tiers, drug_name, base)
+            if result is not None:
+                return result, failed
 
         # Tier 4: Unresolved
         return {
@@ -198,8 +246,121 @@ class DrugInteractionClient:
             "name": drug_name,
             "resolution_tier": 4,
             "confidence": 0.0,
+        }, failed
+
+    async def _race_tiers(
+        self,
+        tiers: tuple[Callable[[str, dict[str, Any]], Awaitable[Any]], ...],
+        drug_name: str,
+        base: dict[str, Any],
+    ) -> tuple[dict[str, Any] | None, bool]:
+        """Hedged tiers: tier N starts N * hedge_delay after tier 1, or as soon
+        as every higher tier has come back empty.
+
+        Results are still taken in tier order, so the outcome is the same as
+        the sequential walk; only the waiting overlaps. Once a tier answers,
+        lower tiers are cancelled (before sending anything, if still waiting
+        out their delay).
+        """
+        assert self.hedge_delay is not None
+        delay = self.hedge_delay
+        may_start = [asyncio.Event() for _ in tiers]
+        may_start[0].set()
+
+        async def hedge(i: int) -> tuple[dict[str, Any] | None, bool]:
+            try:
+                await asyncio.wait_for(may_start[i].wait(), delay * i)
+            except TimeoutError:
+                pass
+            return await _run_tier(tiers[i], drug_name, base)
+
+        tasks = [asyncio.create_task(hedge(i)) for i in range(len(tiers))]
+        failed = False
+        try:
+            for i, task in enumerate(tasks):
+                result, errored = await task
+                failed = failed or errored
+                if result is not None:
+                    return result, failed
+                if i + 1 < len(tiers):
+                    may_start[i + 1].set()
+        finally:
+            for task in tasks:
+                task.cancel()
+        return None, failed
+
+    async def _tier_exact(
+        self, drug_name: str, base: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Tier 1: exact name match."""
+        rxcui = await self.get_rxcui(drug_name)
+        if not rxcui:
+            return None
+        ingredient = await self._safe_get_ingredient(rxcui)
+        return {
+            **base,
+            "rxcui": ingredient.get("rxcui", rxcui),
+            "name": ingredient.get("name", drug_name),
+            "resolution_tier": 1,
+            "confidence": 1.0,
+        }
+
+    async def _tier_approximate(
+        self, drug_name: str, base: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Tier 2: approximate match, normalized to ingredients."""
+        candidates = await self.get_approximate_match(drug_name)
+        if not candidates:
+            return None
+        ingredients = await self._resolve_candidates_to_ingredients(candidates)
+        unique = _deduplicate_ingredients(ingredients)
+        if not unique:
+            return None
+        return _approximate_result(base, candidates, unique)
+
+    async def _tier_brand(
+        self, drug_name: str, base: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Tier 3: brand/synonym search."""
+        drugs = await self.get_drugs_by_name(drug_name)
+        if not drugs:
+            return None
+        ingredient = await self._safe_get_ingredient(drugs[0]["rxcui"])
+        return {
+            **base,
+            "rxcui": ingredient.get("rxcui", drugs[0]["rxcui"]),
+            "name": ingredient.get("name", drugs[0]["name"]),
+            "resolution_tier": 3,
+            "confidence": 0.6,
+            "candidates": drugs[:3],
         }
 
+    def _resolve_fuzzy(self, drug_name: str) -> dict[str, Any] | None:
+        """Tier 2 against the local index; None to fall back to RxNav.
+
+        The local vocabulary is a subset of RxNav's, so a close neighbour may
+        not be the drug meant. A match is only used when its score reaches
+        FUZZY_ACCEPT_SCORE and it leads every candidate for a different
+        ingredient by FUZZY_MIN_MARGIN; weak or contested matches go to RxNav.
+        """
+        assert self.rxnorm_index is not None and self.fuzzy_matcher is not None
+        candidates = self.fuzzy_matcher.match(drug_name)
+        scored = [
+            (c["score"], ingredient)
+            for c in candidates[:5]
+            if (ingredient := self.rxnorm_index.get_ingredient(c["rxcui"]))
+        ]
+        if not scored or scored[0][0] < FUZZY_ACCEPT_SCORE:
+            return None
+        best_score, best = scored[0]
+        for score, ingredient in scored[1:]:
+            if ingredient["rxcui"] != best["rxcui"]:
+                if best_score - score < FUZZY_MIN_MARGIN:
+                    return None
+                break
+        base = {"original_name": drug_name, "candidates": [], "ambiguous": False}
+        return _approximate_result(base, candidates, [best])
+
     async def _safe_get_ingredient(self, rxcui: str) -> dict[str, Any]:
         """Get ingredient RxCUI, returning empty dict on failure."""
         try:
@@ -211,12 +372,10 @@ class DrugInteractionClient:
         self, candidates: list[dict[str, Any]]
     ) -> list[dict[str, Any]]:
         """Normalize a list of candidates to their ingredient-level RxCUIs."""
-        ingredients = []
-        for c in candidates[:5]:  # Limit API calls
-            ing = await self._safe_get_ingredient(c["rxcui"])
-            if ing:
-                ingredients.append(ing)
-        return ingredients
+        results = await asyncio.gather(  # Limit API calls to the top 5
+            *(self._safe_get_ingredient(c["rxcui"]) for c in candidates[:5])
+        )
+        return [ing for ing in results if ing]
 
     # ------------------------------------------------------------------
     # Interaction checking
@@ -224,11 +383,10 @@ class DrugInteractionClient:
 
     async def check_interactions(self, rxcui: str) -> list[dict[str, Any]]:
         """Get known drug interactions for a given RxCUI."""
-        resp = await self.http.get(
+        resp = await self._get(
             f"{INTERACTION_BASE}/interaction.json",
             params={"rxcui": rxcui},
         )
-        resp.raise_for_status()
         data = resp.json()
         results: list[dict[str, Any]] = []
         for group in data.get("interactionTypeGroup", []):
@@ -247,34 +405,77 @@ class DrugInteractionClient:
     async def check_multi_interactions(
         self, rxcuis: list[str]
     ) -> list[dict[str, Any]]:
-        """Check interactions between multiple drugs (by RxCUI list)."""
-        if len(rxcuis) < 2:
+        """Check interactions between multiple drugs (by RxCUI list).
+
+        With an interaction store, the list is split into unordered pairs and
+        only the drugs of pairs missing from the store are sent to list.json;
+        every pair of that query (with or without an interaction) is stored.
+        When some results can't be tied to a queried pair (no RxCUIs, or
+        RxCUIs other than the ones sent), they are returned and the query's
+        pairs without a finding are not stored as negatives, so the next
+        check asks again and gets the same answer.
+        """
+        pairs = unique_pairs(rxcuis)
+        if not pairs:
             return []
-        resp = await self.http.get(
+        if self.interaction_store is None:
+            return await self._fetch_interaction_list(list(dict.fromkeys(rxcuis)))
+
+        keys = [pair_key(a, b) for a, b in pairs]
+        known = await self.interaction_store.get_many(keys)
+        missing = [pair for pair, key in zip(pairs, keys) if key not in known]
+        unkeyed: list[dict[str, Any]] = []
+        if missing:
+            query = list(dict.fromkeys(r for pair in missing for r in pair))
+            by_pair, unkeyed = group_by_pair(
+                await self._fetch_interaction_list(query)
+            )
+            fetched = {
+                pair_key(a, b): by_pair.pop(pair_key(a, b), [])
+                for a, b in unique_pairs(query)
+            }
+            # Whatever is left in by_pair is keyed to RxCUIs we did not send.
+            unkeyed += [i for found in by_pair.values() for i in found]
+            if unkeyed:
+                fetched = {key: found for key, found in fetched.items() if found}
+            await self.interaction_store.set_many(fetched)
+            known.update(fetched)
+        return [i for key in keys for i in known.get(key, [])] + unkeyed
+
+    async def _fetch_interaction_list(
+        self, rxcuis: list[str]
+    ) -> list[dict[str, Any]]:
+        resp = await self._get(
             f"{INTERACTION_BASE}/list.json",
             params={"rxcuis": "+".join(rxcuis)},
         )
-        resp.raise_for_status()
         data = resp.json()
         results: list[dict[str, Any]] = []
         for group in data.get("fullInteractionTypeGroup", []):
             for itype in group.get("fullInteractionType", []):
                 for pair in itype.get("interactionPair", []):
+                    concepts = [
+                        c.get("minConceptItem", {})
+                        for c in pair.get("interactionConcept", [])
+                    ]
                     results.append({
                         "severity": pair.get("severity", "N/A"),
                         "description": pair.get("description", ""),
-                        "drugs": [
-                            c.get("minConceptItem", {}).get("name", "")
-                            for c in pair.get("interactionConcept", [])
-                        ],
+                        "drugs": [c.get("name", "") for c in concepts],
+                        "rxcuis": [c.get("rxcui", "") for c in concepts],
                     })
         return results
 
     async def check_interactions_by_names(
-        self, drug_names: list[str]
+        self,
+        drug_names: list[str],
+        resolve: Callable[[str], Awaitable[dict[str, Any]]] | None = None,
     ) -> dict[str, Any]:
         """Resolve drug names via tiered strategy and check interactions.
 
+        resolve replaces resolve_drug_name, e.g. with a memoizing wrapper
+        shared across many lists.
+
         Returns a dict with:
             interactions: list[dict]
             resolutions: dict[str, dict]  (per-drug resolution metadata)
@@ -286,8 +487,9 @@ class DrugInteractionClient:
         rxcuis: list[str] = []
         unresolved: list[str] = []
 
-        for name in drug_names:
-            resolution = await self.resolve_drug_name(name)
+        resolve = resolve or self.resolve_drug_name
+        resolved = await asyncio.gather(*(resolve(name) for name in drug_names))
+        for name, resolution in zip(drug_names, resolved):
             resolutions[name] = resolution
             if resolution["rxcui"]:
                 rxcuis.append(resolution["rxcui"])
@@ -321,6 +523,46 @@ class DrugInteractionClient:
         await self.http.aclose()
 
 
+async def _run_tier(
+    tier: Callable[[str, dict[str, Any]], Awaitable[Any]],
+    drug_name: str,
+    base: dict[str, Any],
+) -> tuple[dict[str, Any] | None, bool]:
+    """Run one tier; errors count as an empty answer plus an error flag."""
+    try:
+        return await tier(drug_name, base), False
+    except Exception:
+        logger.debug("%s failed for %s", tier.__name__, drug_name)
+        return None, True
+
+
+def _approximate_result(
+    base: dict[str, Any],
+    candidates: list[dict[str, Any]],
+    unique: list[dict[str, Any]],
+) -> dict[str, Any]:
+    """Tier 2 resolution from approximate-match candidates and their ingredients."""
+    if len(unique) == 1:
+        return {
+            **base,
+            "rxcui": unique[0]["rxcui"],
+            "name": unique[0]["name"],
+            "resolution_tier": 2,
+            "confidence": 0.85,
+            "candidates": candidates,
+        }
+    # Ambiguous — multiple different ingredients
+    return {
+        **base,
+        "rxcui": unique[0]["rxcui"],
+        "name": unique[0]["name"],
+        "resolution_tier": 2,
+        "confidence": 0.4,
+        "candidates": candidates,
+        "ambiguous": True,
+    }
+
+
 def _deduplicate_ingredients(
     ingredients: list[dict[str, Any]],
 ) -> list[dict[str, Any]]:
@@ -1,21 +1,88 @@
 """PubMed search client using NCBI E-utilities."""
 
 import logging
+import xml.etree.ElementTree as ET
+from collections.abc import AsyncIterator
 from typing import Any
+from urllib.parse import urlencode
 
 import httpx
 
+from app.clients.eutils_scheduler import EUtilsScheduler, RateLimitedTransport
+from app.clients.eutils_scheduler import registry as eutils_schedulers
+from app.clients.literature_index import LiteratureIndex
+from app.clients.pubmed_efetch import DEFAULT_ABSTRACT_TOKENS, ArticleStream
+from app.clients.retry import RetryPolicy, RetryTransport
+from app.clients.singleflight import SingleFlight
+from app.clients.upstream_guard import GuardedTransport, UpstreamUnavailableError
+from app.persistence.ttl_cache import SqliteTTLCache
+
 logger = logging.getLogger(__name__)
 
 EUTILS_BASE = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
 
+QUERY_NAMESPACE = "pubmed_query"
+SUMMARY_NAMESPACE = "pubmed_summary"
+# Search results change as new articles are indexed; published article
+# summaries effectively never do.
+DEFAULT_QUERY_TTL = 6 * 3600.0
+DEFAULT_SUMMARY_TTL = 30 * 24 * 3600.0
+
+# Up to this many PMIDs go straight into the efetch URL; larger sets are
+# posted to the history server once and fetched back in pages.
+EFETCH_MAX_IDS = 200
+
+# How a loaded local literature index is used: "local" answers every search
+# from it; "fallback" only when E-utilities fails.
+LOCAL_MODES = ("local", "fallback")
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a search term: case- and whitespace-insensitive."""
+    return " ".join(query.lower().split())
+
 
 class PubMedClient:
-    """Searches PubMed via E-utilities (esearch + esummary). Free, no key required."""
+    """Searches PubMed via E-utilities (esearch + esummary). Free, no key required.
+
+    Requests are paced by the process-wide EUtilsScheduler for the API key
+    (3/s without one, 10/s with), and identical requests already queued or in
+    flight share one upstream call.
+    """
 
-    def __init__(self, api_key: str = "", timeout: float = 30.0) -> None:
+    def __init__(
+        self,
+        api_key: str = "",
+        timeout: float = 30.0,
+        retry: RetryPolicy | None = None,
+        scheduler: EUtilsScheduler | None = None,
+        cache: SqliteTTLCache | None = None,
+        query_ttl: float = DEFAULT_QUERY_TTL,
+        summary_ttl: float = DEFAULT_SUMMARY_TTL,
+        local_index: LiteratureIndex | None = None,
+        local_mode: str = "fallback",
+    ) -> None:
+        if local_mode not in LOCAL_MODES:
+            raise ValueError(f"local_mode must be one of {LOCAL_MODES}, got {local_mode!r}")
         self.api_key = api_key
-        self.http = httpx.AsyncClient(timeout=timeout)
+        self.scheduler = scheduler or eutils_schedulers.get(api_key)
+        self.http = httpx.AsyncClient(
+            timeout=timeout,
+            transport=RetryTransport(
+                RateLimitedTransport(GuardedTransport(), self.scheduler),
+                retry,
+                client="pubmed",
+            ),
+        )
+        self._flight: SingleFlight[Any] = SingleFlight()
+        # Persistent query -> PMID list and PMID -> summary layers; summaries
+        # are shared by every query that returns the same article.
+        self.cache = cache
+        self.query_ttl = query_ttl
+        self.summary_ttl = summary_ttl
+        # Offline BM25 index over a PubMed baseline subset.
+        self.local_index = local_index
+        self.local_mode = local_mode
 
     def _base_params(self) -> dict[str, str]:
         params: dict[str, str] = {}
@@ -23,14 +90,58 @@ class PubMedClient:
             params["api_key"] = self.api_key
         return params
 
+    async def _get_json(self, endpoint: str, params: dict[str, str]) -> Any:
+        """GET an E-utilities endpoint, coalescing identical pending requests."""
+        url = f"{EUTILS_BASE}/{endpoint}"
+
+        async def fetch() -> Any:
+            resp = await self.http.get(url, params=params)
+            resp.raise_for_status()
+            return resp.json()
+
+        return await self._flight.do(f"{url}?{urlencode(sorted(params.items()))}", fetch)
+
     async def search(
         self, query: str, max_results: int = 5
     ) -> list[dict[str, Any]]:
         """Search PubMed and return article summaries.
 
         Returns list of {"pmid", "title", "authors", "source", "pubdate"} dicts.
+        With a cache, a repeated query needs no call, and a new query whose
+        articles were all seen before needs only the esearch. With a local
+        index, searches are answered from it in "local" mode, or when
+        E-utilities is down in "fallback" mode.
         """
+        if self.local_index is not None and self.local_mode == "local":
+            return self.local_index.search(query, max_results)
+        try:
+            return await self._search_remote(query, max_results)
+        except (httpx.HTTPError, UpstreamUnavailableError) as e:
+            if self.local_index is None:
+                raise
+            logger.warning("PubMed unavailable (%s); searching local index", e)
+            return self.local_index.search(query, max_results)
+
+    async def _search_remote(
+        self, query: str, max_results: int
+    ) -> list[dict[str, Any]]:
         # Step 1: esearch to get PMIDs
+        id_list = await self._search_ids(query, max_results)
+        if not id_list:
+            return []
+
+        # Step 2: esummary for article details
+        summaries = await self._summaries(id_list)
+        return [summaries[pmid] for pmid in id_list if pmid in summaries]
+
+    async def _search_ids(self, query: str, max_results: int) -> list[str]:
+        key = normalize_query(query)
+        if self.cache is not None:
+            cached = await self.cache.get(QUERY_NAMESPACE, key)
+            # A list fetched with a larger retmax answers smaller ones too.
+            if cached is not None and cached["retmax"] >= max_results:
+                return list(cached["ids"][:max_results])
+
         search_params = {
             **self._base_params(),
             "db": "pubmed",
@@ -38,43 +149,135 @@ class PubMedClient:
             "retmax": str(max_results),
             "retmode": "json",
         }
-        resp = await self.http.get(f"{EUTILS_BASE}/esearch.fcgi", params=search_params)
-        resp.raise_for_status()
-        search_data = resp.json()
-        id_list = search_data.get("esearchresult", {}).get("idlist", [])
-        if not id_list:
-            return []
+        search_data = await self._get_json("esearch.fcgi", search_params)
+        id_list: list[str] = search_data.get("esearchresult", {}).get("idlist", [])
+        if self.cache is not None:
+            await self.cache.set(
+                QUERY_NAMESPACE,
+                key,
+                {"retmax": max_results, "ids": id_list},
+                self.query_ttl,
+            )
+        return id_list
+
+    async def _summaries(self, id_list: list[str]) -> dict[str, dict[str, Any]]:
+        """{pmid: summary}; only PMIDs missing from the cache are fetched."""
+        found: dict[str, dict[str, Any]] = {}
+        if self.cache is not None:
+            found = await self.cache.get_many(SUMMARY_NAMESPACE, id_list)
+        missing = [pmid for pmid in id_list if pmid not in found]
+        if not missing:
+            return found
 
-        # Step 2: esummary for article details
         summary_params = {
             **self._base_params(),
             "db": "pubmed",
-            "id": ",".join(id_list),
+            "id": ",".join(missing),
             "retmode": "json",
         }
-        resp = await self.http.get(
-            f"{EUTILS_BASE}/esummary.fcgi", params=summary_params
-        )
-        resp.raise_for_status()
-        summary_data = resp.json()
+        summary_data = await self._get_json("esummary.fcgi", summary_params)
 
-        results: list[dict[str, Any]] = []
+        fetched: dict[str, dict[str, Any]] = {}
         result_block = summary_data.get("result", {})
-        for pmid in id_list:
+        for pmid in missing:
             article = result_block.get(pmid, {})
             if not article:
                 continue
             authors = [
                 a.get("name", "") for a in article.get("authors", [])[:3]
             ]
-            results.append({
+            fetched[pmid] = {
                 "pmid": pmid,
                 "title": article.get("title", ""),
                 "authors": authors,
                 "source": article.get("source", ""),
                 "pubdate": article.get("pubdate", ""),
-            })
-        return results
+            }
+        if self.cache is not None:
+            await self.cache.set_many(SUMMARY_NAMESPACE, fetched, self.summary_ttl)
+        return {**found, **fetched}
+
+    async def iter_abstracts(
+        self, pmids: list[str], max_tokens: int = DEFAULT_ABSTRACT_TOKENS
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream abstracts for PMIDs via efetch, yielding each as it is parsed.
+
+        Yields pubmed_efetch.parse_article() records (pmid, title, authors,
+        source, pubdate, abstract, mesh_terms, truncated); each abstract is
+        cut to about max_tokens. Sets larger than
+        EFETCH_MAX_IDS are posted to the E-utilities history server once
+        (WebEnv/query_key) and fetched in pages of EFETCH_MAX_IDS. With a
+        local index, abstracts come from it in "local" mode, and in
+        "fallback" mode for the PMIDs not yet streamed when E-utilities
+        fails; PMIDs outside the index then have no abstract.
+        """
+        pmids = list(dict.fromkeys(pmids))
+        if not pmids:
+            return
+        if self.local_index is not None and self.local_mode == "local":
+            for article in self.local_index.abstracts(pmids, max_tokens):
+                yield article
+            return
+        streamed: set[str] = set()
+        try:
+            async for article in self._efetch_abstracts(pmids, max_tokens):
+                streamed.add(article["pmid"])
+                yield article
+        except (httpx.HTTPError, UpstreamUnavailableError) as e:
+            if self.local_index is None:
+                raise
+            logger.warning("PubMed unavailable (%s); reading abstracts from local index", e)
+            rest = [pmid for pmid in pmids if pmid not in streamed]
+            for article in self.local_index.abstracts(rest, max_tokens):
+                yield article
+
+    async def _efetch_abstracts(
+        self, pmids: list[str], max_tokens: int
+    ) -> AsyncIterator[dict[str, Any]]:
+        if len(pmids) <= EFETCH_MAX_IDS:
+            pages = [{"id": ",".join(pmids)}]
+        else:
+            history = await self._epost(pmids)
+            pages = [
+                {**history, "retstart": str(start), "retmax": str(EFETCH_MAX_IDS)}
+                for start in range(0, len(pmids), EFETCH_MAX_IDS)
+            ]
+        for page in pages:
+            params = {
+                **self._base_params(),
+                "db": "pubmed",
+                "rettype": "abstract",
+                "retmode": "xml",
+                **page,
+            }
+            stream = ArticleStream(max_tokens)
+            async with self.http.stream(
+                "GET", f"{EUTILS_BASE}/efetch.fcgi", params=params
+            ) as resp:
+                resp.raise_for_status()
+                async for chunk in resp.aiter_bytes():
+                    for article in stream.feed(chunk):
+                        yield article
+            for article in stream.close():
+                yield article
+
+    async def _epost(self, pmids: list[str]) -> dict[str, str]:
+        """Upload PMIDs to the history server; returns {"WebEnv", "query_key"}."""
+        resp = await self.http.post(
+            f"{EUTILS_BASE}/epost.fcgi",
+            data={**self._base_params(), "db": "pubmed", "id": ",".join(pmids)},
+        )
+        resp.raise_for_status()
+        root = ET.fromstring(resp.content)
+        web_env = root.findtext("WebEnv")
+        query_key = root.findtext("QueryKey")
+        if not web_env or not query_key:
+            raise ValueError(f"epost returned no history handle: {root.findtext('ERROR')}")
+        return {"WebEnv": web_env, "query_key": query_key}
+
+    def scheduler_stats(self) -> dict[str, Any]:
+        """Queue depth and wait times of the shared E-utilities scheduler."""
+        return {**self.scheduler.stats(), "coalesced": self._flight.coalesced}
 
     async def close(self) -> None:
         await self.http.aclose()
@@ -0,0 +1,124 @@
+"""Incremental parsing of PubMed efetch XML into abstract records.
+
+efetch returns one PubmedArticleSet document per request, which for a few
+hundred articles runs to megabytes. ArticleStream is fed the response body
+chunk by chunk (an XMLPullParser, the push-style counterpart of iterparse)
+and hands back each PubmedArticle as soon as its closing tag arrives. Parsed
+articles are cleared from the tree, so memory is bounded by one article
+rather than the whole response.
+"""
+
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+from collections.abc import Iterator
+from typing import Any
+
+# Rough English-text ratio; good enough to keep abstracts inside a budget.
+CHARS_PER_TOKEN = 4
+DEFAULT_ABSTRACT_TOKENS = 400
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> tuple[str, bool]:
+    """Cut text to about max_tokens at a word boundary. Returns (text, truncated)."""
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text, False
+    cut = text[:limit]
+    space = cut.rfind(" ")
+    if space > limit // 2:
+        cut = cut[:space]
+    return cut.rstrip() + " …", True
+
+
+def _text(elem: ET.Element | None) -> str:
+    return "".join(elem.itertext()).strip() if elem is not None else ""
+
+
+def _author(elem: ET.Element) -> str:
+    """esummary-style author name: "Smith J", or the collective name."""
+    last = elem.findtext("LastName")
+    if last:
+        initials = elem.findtext("Initials")
+        return f"{last} {initials}" if initials else last
+    return _text(elem.find("CollectiveName"))
+
+
+def _pubdate(journal: ET.Element | None) -> str:
+    """esummary-style publication date ("2024 Jan 15") from JournalIssue/PubDate."""
+    date = journal.find("JournalIssue/PubDate") if journal is not None else None
+    if date is None:
+        return ""
+    medline = date.findtext("MedlineDate")
+    if medline:
+        return medline
+    parts = (date.findtext(part) for part in ("Year", "Month", "Day"))
+    return " ".join(p for p in parts if p)
+
+
+def parse_article(elem: ET.Element, max_tokens: int) -> dict[str, Any]:
+    """Record for one PubmedArticle.
+
+    Keys: pmid, title, authors (first three), source, pubdate, abstract,
+    mesh_terms, truncated.
+    """
+    citation = elem.find("MedlineCitation")
+    if citation is None:
+        citation = elem
+    journal = citation.find("Article/Journal")
+    sections = []
+    for part in citation.iterfind("Article/Abstract/AbstractText"):
+        text = _text(part)
+        label = part.get("Label")
+        if text:
+            sections.append(f"{label}: {text}" if label else text)
+    abstract, truncated = truncate_to_tokens("\n".join(sections), max_tokens)
+    return {
+        "pmid": _text(citation.find("PMID")),
+        "title": _text(citation.find("Article/ArticleTitle")),
+        "authors": [
+            _author(a) for a in citation.iterfind("Article/AuthorList/Author")
+        ][:3],
+        "source": (
+            journal.findtext("ISOAbbreviation") or journal.findtext("Title") or ""
+            if journal is not None else ""
+        ),
+        "pubdate": _pubdate(journal),
+        "abstract": abstract,
+        "mesh_terms": [
+            _text(h) for h in citation.iterfind("MeshHeadingList/MeshHeading/DescriptorName")
+        ],
+        "truncated": truncated,
+    }
+
+
+class ArticleStream:
+    """Push parser turning efetch XML chunks into article records."""
+
+    def __init__(self, max_tokens: int = DEFAULT_ABSTRACT_TOKENS) -> None:
+        self.max_tokens = max_tokens
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root: ET.Element | None = None
+
+    def feed(self, chunk: bytes) -> Iterator[dict[str, Any]]:
+        """Parse a chunk and yield every article it completes."""
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> Iterator[dict[str, Any]]:
+        """Finish the document and yield any remaining articles."""
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> Iterator[dict[str, Any]]:
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = elem
+                continue
+            if elem.tag == "PubmedArticle":
+                yield parse_article(elem, self.max_tokens)
+                # Drop everything parsed so far; the root only ever holds
+                # the article currently being read.
+                if self._root is not None:
+                    self._root.clear()
@@ -0,0 +1,203 @@
+"""Patient-scoped LRU cache for OpenEMR GET responses.
+
+Entries are keyed by request path plus normalized query params, expire after
+a per-resource-type TTL, and are evicted least-recently-used once the stored
+bodies exceed a byte budget. Every entry is indexed by the patient UUID it
+belongs to so a patient's data can be dropped in one call.
+
+Expired entries that carry an ETag or Last-Modified validator are kept (still
+subject to LRU eviction) so the next fetch can be a conditional GET; a 304
+then renews the entry without downloading the body again.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached response stays fresh, by FHIR resource type. Demographics
+# and allergies change rarely; orders, results and schedules change more often.
+DEFAULT_TTLS: dict[str, float] = {
+    "Patient": 300.0,
+    "AllergyIntolerance": 300.0,
+    "Condition": 120.0,
+    "MedicationRequest": 60.0,
+    "Observation": 60.0,
+    "Appointment": 30.0,
+}
+DEFAULT_TTL = 60.0
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+@dataclass
+class CacheEntry:
+    """A cached response body and its bookkeeping."""
+
+    body: bytes
+    expires_at: float
+    resource_type: str = ""
+    patient_uuid: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def revalidatable(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+class ResponseCache:
+    """In-process LRU cache of raw response bodies with per-type TTLs.
+
+    Bodies are stored as bytes so each hit is decoded into a fresh object and
+    callers can never mutate a shared cached value.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttls: Mapping[str, float] | None = None,
+        default_ttl: float = DEFAULT_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._by_patient: dict[str, set[str]] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revalidations = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def make_key(path: str, params: Mapping[str, Any] | None = None) -> str:
+        """Build a cache key from a path and params, independent of param order."""
+        if not params:
+            return path
+        items = sorted((k, v) for k, v in params.items() if v is not None)
+        normalized = [
+            (k, sorted(str(x) for x in v) if isinstance(v, (list, tuple)) else str(v))
+            for k, v in items
+        ]
+        return f"{path}?{urlencode(normalized, doseq=True)}"
+
+    def ttl_for(self, resource_type: str) -> float:
+        return self.ttls.get(resource_type, self.default_ttl)
+
+    def get(self, key: str) -> bytes | None:
+        """Return the cached body for key, or None on a miss or expired entry."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= self._clock():
+            if not entry.revalidatable:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.body
+
+    def set(
+        self,
+        key: str,
+        body: bytes,
+        resource_type: str,
+        patient_uuid: str | None = None,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """Store a response body, evicting least-recently-used entries as needed."""
+        if len(body) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = CacheEntry(
+            body=body,
+            expires_at=self._clock() + self.ttl_for(resource_type),
+            resource_type=resource_type,
+            patient_uuid=patient_uuid,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        self._bytes += len(body)
+        if patient_uuid:
+            self._by_patient.setdefault(patient_uuid, set()).add(key)
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def validators(self, key: str) -> dict[str, str]:
+        """Conditional request headers for an expired-but-revalidatable entry."""
+        entry = self._entries.get(key)
+        headers: dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def revalidate(self, key: str) -> bytes | None:
+        """Renew an entry after a 304 Not Modified and return its body."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        entry.expires_at = self._clock() + self.ttl_for(entry.resource_type)
+        self._entries.move_to_end(key)
+        self.revalidations += 1
+        self.bytes_saved += len(entry.body)
+        return entry.body
+
+    def invalidate_patient(self, patient_uuid: str) -> int:
+        """Drop every cached response belonging to a patient. Returns the count."""
+        keys = self._by_patient.pop(patient_uuid, set())
+        for key in keys:
+            self._remove(key)
+        if keys:
+            logger.info("Invalidated %d cached responses for patient", len(keys))
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_patient.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss/revalidation counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "revalidations": self.revalidations,
+            "bytes_saved": self.bytes_saved,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= len(entry.body)
+        if entry.patient_uuid:
+            keys = self._by_patient.get(entry.patient_uuid)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_patient[entry.patient_uuid]
@@ -0,0 +1,154 @@
+"""Retry policy for idempotent upstream GETs.
+
+RetryTransport wraps a client's transport and retries GET/HEAD requests that
+fail with 429, a retryable 5xx, or a transport error. Delays use exponential
+backoff with full jitter, a Retry-After header takes precedence, and the total
+time spent on a request (every attempt plus the waits between them) is capped
+by a per-request budget, so slow timeouts cannot stack up past it. Each retry
+is recorded in the current RequestMetrics for the cost log.
+
+It wraps the GuardedTransport, so every attempt still counts against the
+upstream's circuit breaker, and an open circuit is never retried.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field, fields
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import httpx
+
+from app.clients.metrics import record_retry
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD"})
+
+
+@dataclass
+class RetryPolicy:
+    """How often and how long to retry a failed idempotent request."""
+
+    max_attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 5.0
+    budget_seconds: float = 10.0
+    retry_statuses: frozenset[int] = field(
+        default_factory=lambda: frozenset({429, 500, 502, 503, 504})
+    )
+
+    @classmethod
+    def from_settings(cls, settings: Any, client: str) -> RetryPolicy:
+        """Build the policy for one client, applying settings.retry_overrides."""
+        policy = cls(
+            max_attempts=settings.retry_max_attempts,
+            base_delay=settings.retry_base_delay_seconds,
+            max_delay=settings.retry_max_delay_seconds,
+            budget_seconds=settings.retry_budget_seconds,
+        )
+        overrides = settings.retry_overrides.get(client, {})
+        known = {f.name for f in fields(cls)} - {"retry_statuses"}
+        for name, value in overrides.items():
+            if name not in known:
+                raise ValueError(f"Unknown retry setting for {client}: {name}")
+            setattr(policy, name, type(getattr(policy, name))(value))
+        return policy
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number ``attempt`` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP date)."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    remaining: float = when.timestamp() - time.time()
+    return max(0.0, remaining)
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """httpx transport that retries transient failures of idempotent requests."""
+
+    def __init__(
+        self,
+        inner: httpx.AsyncBaseTransport,
+        policy: RetryPolicy | None = None,
+        client: str = "",
+        sleep: Callable[[float], Any] = asyncio.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._inner = inner
+        self.policy = policy or RetryPolicy()
+        self.client = client
+        self._sleep = sleep
+        self._clock = clock
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method not in IDEMPOTENT_METHODS:
+            return await self._inner.handle_async_request(request)
+
+        # Attempt durations and backoff sleeps both count against the budget.
+        spent = 0.0
+        attempt = 1
+        while True:
+            started = self._clock()
+            try:
+                response = await self._inner.handle_async_request(request)
+            except httpx.TransportError as e:
+                spent += self._clock() - started
+                delay = self._next_delay(attempt, spent, None)
+                if delay is None:
+                    raise
+                reason = type(e).__name__
+            else:
+                spent += self._clock() - started
+                if response.status_code not in self.policy.retry_statuses:
+                    return response
+                delay = self._next_delay(attempt, spent, retry_after_seconds(response))
+                if delay is None:
+                    return response
+                reason = str(response.status_code)
+                await response.aclose()
+
+            logger.info(
+                "Retrying %s %s after %s (attempt %d, %.2fs)",
+                request.method,
+                request.url.host,
+                reason,
+                attempt + 1,
+                delay,
+            )
+            record_retry(self.client or request.url.host, delay)
+            await self._sleep(delay)
+            spent += delay
+            attempt += 1
+
+    def _next_delay(
+        self, attempt: int, spent: float, retry_after: float | None
+    ) -> float | None:
+        """Delay before the next attempt, or None when out of attempts/budget."""
+        if attempt >= self.policy.max_attempts:
+            return None
+        delay = retry_after if retry_after is not None else self.policy.backoff(attempt)
+        if spent + delay > self.policy.budget_seconds:
+            return None
+        return delay
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
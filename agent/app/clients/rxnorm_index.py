@@ -0,0 +1,263 @@
+"""Offline RxNorm index for local drug-name resolution.
+
+build_index() ingests the RxNorm RRF release files (RXNCONSO.RRF and
+RXNREL.RRF) into a compact SQLite file with two indexed tables:
+
+- names: normalized concept string -> RxCUI, term type and preferred name
+- ingredients: RxCUI -> its ingredient-level (TTY=IN) concepts, precomputed
+  by walking RXNREL from products down to ingredients
+
+RxNormIndex answers exact-name, brand/synonym and ingredient-normalization
+lookups against that file in microseconds, returning the same dict shape as
+DrugInteractionClient.resolve_drug_name. vocabulary() feeds the local
+FuzzyMatcher, which handles approximate matching without RxNav.
+"""
+
+from __future__ import annotations
+
+import csv
+import logging
+import os
+import sqlite3
+from typing import Any
+
+from app.persistence.sqlite_build import building_sqlite
+
+logger = logging.getLogger(__name__)
+
+# Term types resolved by exact match (tier 1). Brand names (BN) are exact
+# RxNorm concept names, so they resolve here too, just like rxcui.json.
+EXACT_TTYS = (
+    "IN", "PIN", "MIN", "BN", "SCD", "SBD", "SCDC", "SBDC",
+    "SCDF", "SBDF", "SCDG", "SBDG", "GPCK", "BPCK",
+)
+# Synonyms and tall-man spellings are matched as tier 3 (brand/synonym).
+SYNONYM_TTYS = ("SY", "TMSY", "PSN")
+# Vocabulary for local approximate matching: ingredient and brand level
+# names plus their synonyms (product strings are matched after stripping
+# dose/form, so they would only add noise).
+FUZZY_TTYS = ("IN", "PIN", "MIN", "BN", "SY", "TMSY")
+
+# Specificity of each term type. Ingredient normalization only walks a
+# relationship from a more specific concept to a less specific one, which
+# makes the walk independent of RXNREL's relationship direction.
+_LEVELS = {
+    "BPCK": 5, "GPCK": 5, "SBD": 5,
+    "SCD": 4, "SBDC": 4, "SBDF": 4, "SBDG": 4,
+    "SCDC": 3, "SCDF": 3, "SCDG": 3, "BN": 3,
+    "PIN": 2, "MIN": 2,
+    "IN": 1,
+}
+# Relationships that lead from a product towards its ingredients.
+_INGREDIENT_RELAS = (
+    "has_ingredient", "ingredient_of", "has_ingredients", "ingredients_of",
+    "tradename_of", "has_tradename", "consists_of", "constitutes",
+    "form_of", "has_form", "has_precise_ingredient", "precise_ingredient_of",
+    "has_part", "part_of", "contains", "contained_in",
+)
+
+# RRF column positions (see the RxNorm technical documentation).
+_CONSO_RXCUI, _CONSO_LAT, _CONSO_SAB, _CONSO_TTY, _CONSO_STR, _CONSO_SUPPRESS = (
+    0, 1, 11, 12, 14, 16,
+)
+_REL_RXCUI1, _REL_RXCUI2, _REL_RELA, _REL_SAB = 0, 4, 7, 10
+
+
+def normalize_name(name: str) -> str:
+    """Lookup key for a drug name: lowercased with whitespace collapsed."""
+    return " ".join(name.lower().split())
+
+
+def _read_rrf(path: str) -> Any:
+    with open(path, encoding="utf-8", newline="") as f:
+        yield from csv.reader(f, delimiter="|", quoting=csv.QUOTE_NONE)
+
+
+def build_index(rrf_dir: str, db_path: str) -> dict[str, int]:
+    """Build the SQLite index from an RxNorm release's rrf/ directory.
+
+    Loads RXNCONSO and RXNREL, precomputes each concept's ingredients and
+    drops the relationship table, then swaps the file in over any previous
+    index. Returns row counts.
+    """
+    with building_sqlite(db_path) as conn:
+        conn.executescript(
+            """
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE concepts (rxcui TEXT PRIMARY KEY, tty TEXT NOT NULL, name TEXT NOT NULL);
+            CREATE TABLE names (
+                norm TEXT NOT NULL, rxcui TEXT NOT NULL, tty TEXT NOT NULL, name TEXT NOT NULL
+            );
+            CREATE TEMP TABLE rel (rxcui1 TEXT, rxcui2 TEXT);
+            """
+        )
+        _load_conso(conn, os.path.join(rrf_dir, "RXNCONSO.RRF"))
+        _load_rel(conn, os.path.join(rrf_dir, "RXNREL.RRF"))
+        _build_ingredients(conn)
+        conn.executescript(
+            """
+            CREATE INDEX names_norm ON names (norm);
+            CREATE INDEX ingredients_rxcui ON ingredients (rxcui);
+            DROP TABLE rel;
+            """
+        )
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("concepts", "names", "ingredients")
+        }
+        conn.commit()
+        conn.execute("VACUUM")
+    logger.info("Built RxNorm index at %s: %s", db_path, counts)
+    return counts
+
+
+def _load_conso(conn: sqlite3.Connection, path: str) -> None:
+    concepts: dict[str, tuple[str, str]] = {}
+    names: dict[tuple[str, str, str], str] = {}
+    for row in _read_rrf(path):
+        if (
+            row[_CONSO_SAB] != "RXNORM"
+            or row[_CONSO_LAT] != "ENG"
+            or row[_CONSO_SUPPRESS] in ("O", "Y", "E")
+        ):
+            continue
+        rxcui, tty, name = row[_CONSO_RXCUI], row[_CONSO_TTY], row[_CONSO_STR]
+        if tty in _LEVELS:
+            concepts[rxcui] = (tty, name)
+        if tty in _LEVELS or tty in SYNONYM_TTYS:
+            names.setdefault((normalize_name(name), rxcui, tty), name)
+    conn.executemany(
+        "INSERT INTO concepts VALUES (?, ?, ?)",
+        ((rxcui, tty, name) for rxcui, (tty, name) in concepts.items()),
+    )
+    conn.executemany(
+        "INSERT INTO names VALUES (?, ?, ?, ?)",
+        ((*key, name) for key, name in names.items()),
+    )
+
+
+def _load_rel(conn: sqlite3.Connection, path: str) -> None:
+    relas = set(_INGREDIENT_RELAS)
+    conn.executemany(
+        "INSERT INTO rel VALUES (?, ?)",
+        (
+            (row[_REL_RXCUI1], row[_REL_RXCUI2])
+            for row in _read_rrf(path)
+            if row[_REL_SAB] == "RXNORM" and row[_REL_RELA] in relas
+        ),
+    )
+
+
+def _build_ingredients(conn: sqlite3.Connection) -> None:
+    """Precompute RxCUI -> ingredient(s) by walking towards less specific TTYs."""
+    level_case = "CASE tty " + " ".join(
+        f"WHEN '{tty}' THEN {level}" for tty, level in _LEVELS.items()
+    ) + " END"
+    conn.executescript(
+        f"""
+        CREATE TEMP TABLE level AS SELECT rxcui, {level_case} AS lvl FROM concepts;
+        CREATE INDEX temp.level_rxcui ON level (rxcui);
+        CREATE TEMP TABLE edge AS
+            SELECT a.rxcui AS src, b.rxcui AS dst
+            FROM rel JOIN level a ON a.rxcui = rel.rxcui1 JOIN level b ON b.rxcui = rel.rxcui2
+            WHERE a.lvl > b.lvl
+            UNION
+            SELECT b.rxcui, a.rxcui
+            FROM rel JOIN level a ON a.rxcui = rel.rxcui1 JOIN level b ON b.rxcui = rel.rxcui2
+            WHERE b.lvl > a.lvl;
+        CREATE INDEX temp.edge_src ON edge (src);
+        CREATE TABLE ingredients AS
+            WITH RECURSIVE walk(start, node) AS (
+                SELECT rxcui, rxcui FROM concepts
+                UNION
+                SELECT walk.start, edge.dst FROM walk JOIN edge ON edge.src = walk.node
+            )
+            SELECT walk.start AS rxcui, c.rxcui AS in_rxcui, c.name AS in_name
+            FROM walk JOIN concepts c ON c.rxcui = walk.node
+            WHERE c.tty = 'IN';
+        """
+    )
+
+
+class RxNormIndex:
+    """Read-only lookups against an index built by build_index()."""
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self._conn = sqlite3.connect(
+            f"file:{db_path}?mode=ro", uri=True, check_same_thread=False
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, name: str, ttys: tuple[str, ...]) -> list[dict[str, str]]:
+        """Concepts whose name (or synonym) matches exactly, ordered by RxCUI."""
+        placeholders = ",".join("?" * len(ttys))
+        rows = self._conn.execute(
+            f"SELECT n.rxcui, c.name, n.tty FROM names n "
+            f"JOIN concepts c ON c.rxcui = n.rxcui "
+            f"WHERE n.norm = ? AND n.tty IN ({placeholders}) "
+            f"ORDER BY n.rxcui",
+            (normalize_name(name), *ttys),
+        ).fetchall()
+        return [{"rxcui": r[0], "name": r[1], "tty": r[2]} for r in rows]
+
+    def vocabulary(self, ttys: tuple[str, ...] = FUZZY_TTYS) -> list[tuple[str, str]]:
+        """(name, rxcui) pairs for building a FuzzyMatcher."""
+        placeholders = ",".join("?" * len(ttys))
+        rows = self._conn.execute(
+            f"SELECT name, rxcui FROM names WHERE tty IN ({placeholders})", ttys
+        ).fetchall()
+        return [(r[0], r[1]) for r in rows]
+
+    def ingredients(self, rxcui: str) -> list[dict[str, str]]:
+        """Ingredient-level concepts for an RxCUI (itself if it is an IN)."""
+        rows = self._conn.execute(
+            "SELECT in_rxcui, in_name FROM ingredients WHERE rxcui = ? "
+            "ORDER BY CAST(in_rxcui AS INTEGER)",
+            (rxcui,),
+        ).fetchall()
+        return [{"rxcui": r[0], "name": r[1]} for r in rows]
+
+    def get_ingredient(self, rxcui: str) -> dict[str, str]:
+        """First ingredient for an RxCUI, like RxNav related.json?tty=IN."""
+        found = self.ingredients(rxcui)
+        return found[0] if found else {}
+
+    def resolve(self, drug_name: str) -> dict[str, Any] | None:
+        """Resolve locally by exact name (tier 1) or synonym (tier 3).
+
+        Returns the resolve_drug_name() dict, or None to fall back to RxNav.
+        """
+        base = {"original_name": drug_name, "candidates": [], "ambiguous": False}
+        exact = self.lookup(drug_name, EXACT_TTYS)
+        if exact:
+            ingredient = self.get_ingredient(exact[0]["rxcui"])
+            self.hits += 1
+            return {
+                **base,
+                "rxcui": ingredient.get("rxcui", exact[0]["rxcui"]),
+                "name": ingredient.get("name", drug_name),
+                "resolution_tier": 1,
+                "confidence": 1.0,
+            }
+        synonyms = self.lookup(drug_name, SYNONYM_TTYS)
+        if synonyms:
+            ingredient = self.get_ingredient(synonyms[0]["rxcui"])
+            self.hits += 1
+            return {
+                **base,
+                "rxcui": ingredient.get("rxcui", synonyms[0]["rxcui"]),
+                "name": ingredient.get("name", synonyms[0]["name"]),
+                "resolution_tier": 3,
+                "confidence": 0.6,
+                "candidates": [
+                    {"rxcui": s["rxcui"], "name": s["name"]} for s in synonyms[:3]
+                ],
+            }
+        self.misses += 1
+        return None
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,103 @@
+"""OAuth2 access-token lifecycle: expiry tracking and serialized refresh."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class TokenManager:
+    """Holds the current access token and refreshes it one caller at a time.
+
+    ``acquire`` performs the actual token request and returns the token
+    endpoint's JSON (``access_token`` and optionally ``expires_in``).
+
+    - A missing or expired token is refreshed before it is handed out.
+    - Within ``refresh_margin`` seconds of expiry the current token is still
+      handed out while a single background task fetches the next one.
+    - Refreshes are serialized behind one lock. Callers that saw a 401 pass
+      the token generation they used; if another caller already refreshed
+      since then, they reuse the new token instead of requesting another.
+    """
+
+    def __init__(
+        self,
+        acquire: Callable[[], Awaitable[dict[str, Any]]],
+        refresh_margin: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._acquire = acquire
+        self.refresh_margin = refresh_margin
+        self._clock = clock
+        self._lock = asyncio.Lock()
+        self._background: asyncio.Task[None] | None = None
+        self.access_token: str | None = None
+        self.expires_at: float | None = None
+        self.generation = 0
+        self.refreshes = 0
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and self._clock() >= self.expires_at
+
+    def _refresh_due(self) -> bool:
+        return (
+            self.expires_at is not None
+            and self._clock() >= self.expires_at - self.refresh_margin
+        )
+
+    async def get_token(self) -> str:
+        """Return a usable access token, refreshing first if needed."""
+        if self.access_token is None or self.expired:
+            await self.refresh(stale_generation=self.generation)
+        elif self._refresh_due() and (
+            self._background is None or self._background.done()
+        ):
+            self._background = asyncio.create_task(
+                self._refresh_in_background(self.generation)
+            )
+        assert self.access_token is not None
+        return self.access_token
+
+    async def refresh(self, stale_generation: int | None = None) -> None:
+        """Obtain a new token.
+
+        With ``stale_generation``, the refresh is skipped when a newer token
+        was obtained after that generation (someone else already refreshed).
+        """
+        async with self._lock:
+            if (
+                stale_generation is not None
+                and stale_generation != self.generation
+                and self.access_token is not None
+                and not self.expired
+            ):
+                return
+            data = await self._acquire()
+            self.access_token = data["access_token"]
+            expires_in = data.get("expires_in")
+            self.expires_at = (
+                self._clock() + float(expires_in) if expires_in else None
+            )
+            self.generation += 1
+            self.refreshes += 1
+
+    async def _refresh_in_background(self, generation: int) -> None:
+        try:
+            await self.refresh(stale_generation=generation)
+        except Exception as e:
+            # The current token is still valid; the next caller retries.
+            logger.warning("Background token refresh failed: %s", e)
+
+    async def close(self) -> None:
+        if self._background is not None and not self._background.done():
+            self._background.cancel()
+            try:
+                await self._background
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,244 @@
+"""Per-upstream concurrency limit and circuit breaker for outbound HTTP.
+
+Every external client (OpenEMR, RxNav, Clinical Tables, E-utilities) sends
+through a GuardedTransport, which looks up the UpstreamGuard for the request's
+host in a process-wide registry. Each guard combines:
+
+- an AIMD concurrency limit: +1 slot per window of healthy responses, halved
+  on a failure or a slow response. Callers that cannot get a slot within
+  ``queue_timeout`` fail fast instead of queueing behind a degraded service.
+- a circuit breaker: opens after ``failure_threshold`` consecutive failures
+  or slow responses, rejects calls for ``open_seconds``, then lets a single
+  probe through (half-open) to decide whether to close again.
+
+Rejections raise UpstreamUnavailableError, which tool_error_handler turns
+into a structured, retryable tool error for the LLM.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UpstreamUnavailableError(Exception):
+    """An upstream is rejecting calls (circuit open or concurrency saturated)."""
+
+    def __init__(self, host: str, reason: str, retry_after: float = 0.0) -> None:
+        self.host = host
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"{host} unavailable ({reason})")
+
+
+@dataclass
+class GuardConfig:
+    """Tuning shared by every upstream guard."""
+
+    max_concurrency: int = 16
+    min_concurrency: int = 1
+    queue_timeout: float = 2.0
+    failure_threshold: int = 5
+    latency_threshold: float = 10.0
+    open_seconds: float = 30.0
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> GuardConfig:
+        return cls(
+            max_concurrency=settings.upstream_max_concurrency,
+            min_concurrency=settings.upstream_min_concurrency,
+            queue_timeout=settings.upstream_queue_timeout_seconds,
+            failure_threshold=settings.upstream_failure_threshold,
+            latency_threshold=settings.upstream_latency_threshold_seconds,
+            open_seconds=settings.upstream_open_seconds,
+        )
+
+
+class UpstreamGuard:
+    """AIMD concurrency limit plus circuit breaker for one upstream host."""
+
+    def __init__(
+        self,
+        host: str,
+        config: GuardConfig | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.host = host
+        self.config = config or GuardConfig()
+        self._clock = clock
+        self._cond = asyncio.Condition()
+        self.limit = float(self.config.max_concurrency)
+        self.in_flight = 0
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self.rejected = 0
+        self.failures = 0
+        self.successes = 0
+
+    async def acquire(self) -> None:
+        """Take a slot, or raise UpstreamUnavailableError without waiting long."""
+        self._check_breaker()
+        try:
+            async with self._cond:
+                await asyncio.wait_for(
+                    self._cond.wait_for(lambda: self.in_flight < int(self.limit)),
+                    timeout=self.config.queue_timeout,
+                )
+                self.in_flight += 1
+        except TimeoutError:
+            self._release_probe()
+            self.rejected += 1
+            raise UpstreamUnavailableError(
+                self.host, "concurrency limit reached", self.config.queue_timeout
+            ) from None
+        except asyncio.CancelledError:
+            self._release_probe()
+            raise
+
+    async def release(self, ok: bool, latency: float) -> None:
+        """Return a slot and record the call's outcome."""
+        slow = latency >= self.config.latency_threshold
+        if ok and not slow:
+            self._on_success()
+        else:
+            self._on_failure("slow response" if ok else "error")
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def _check_breaker(self) -> None:
+        if self.state == CLOSED:
+            return
+        if self.state == OPEN:
+            remaining = self.opened_at + self.config.open_seconds - self._clock()
+            if remaining > 0:
+                self.rejected += 1
+                raise UpstreamUnavailableError(self.host, "circuit open", remaining)
+            self.state = HALF_OPEN
+            logger.info("Circuit for %s half-open, sending probe", self.host)
+        if self._probing:
+            self.rejected += 1
+            raise UpstreamUnavailableError(
+                self.host, "circuit half-open", self.config.open_seconds
+            )
+        self._probing = True
+
+    def _release_probe(self) -> None:
+        self._probing = False
+
+    def _on_success(self) -> None:
+        self.successes += 1
+        self.consecutive_failures = 0
+        if self.state == HALF_OPEN:
+            logger.info("Circuit for %s closed", self.host)
+        self.state = CLOSED
+        self._release_probe()
+        # Additive increase: about one extra slot per window of `limit` calls.
+        self.limit = min(
+            float(self.config.max_concurrency), self.limit + 1.0 / self.limit
+        )
+
+    def _on_failure(self, reason: str) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        # Multiplicative decrease.
+        self.limit = max(float(self.config.min_concurrency), self.limit / 2)
+        self._release_probe()
+        if (
+            self.state == HALF_OPEN
+            or self.consecutive_failures >= self.config.failure_threshold
+        ):
+            if self.state != OPEN:
+                logger.warning(
+                    "Circuit for %s opened after %d consecutive failures (last: %s)",
+                    self.host,
+                    self.consecutive_failures,
+                    reason,
+                )
+            self.state = OPEN
+            self.opened_at = self._clock()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "consecutive_failures": self.consecutive_failures,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+        }
+
+
+class GuardRegistry:
+    """Process-wide map of host -> UpstreamGuard."""
+
+    def __init__(self, config: GuardConfig | None = None) -> None:
+        self.config = config or GuardConfig()
+        self._guards: dict[str, UpstreamGuard] = {}
+
+    def get(self, host: str) -> UpstreamGuard:
+        guard = self._guards.get(host)
+        if guard is None:
+            guard = self._guards[host] = UpstreamGuard(host, self.config)
+        return guard
+
+    def configure(self, config: GuardConfig) -> None:
+        """Replace the tuning; existing guards are rebuilt on next use."""
+        self.config = config
+        self._guards.clear()
+
+    def reset(self) -> None:
+        self._guards.clear()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {host: g.stats() for host, g in self._guards.items()}
+
+
+registry = GuardRegistry()
+
+
+def _is_failure(response: httpx.Response) -> bool:
+    return response.status_code >= 500 or response.status_code == 429
+
+
+class GuardedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that routes every request through its host's guard."""
+
+    def __init__(
+        self,
+        inner: httpx.AsyncBaseTransport | None = None,
+        guards: GuardRegistry | None = None,
+        verify: bool = True,
+    ) -> None:
+        self._inner = inner or httpx.AsyncHTTPTransport(verify=verify)
+        self._guards = guards
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        guard = (self._guards or registry).get(request.url.host)
+        await guard.acquire()
+        start = time.monotonic()
+        ok = False
+        try:
+            response = await self._inner.handle_async_request(request)
+            ok = not _is_failure(response)
+            return response
+        finally:
+            await guard.release(ok, time.monotonic() - start)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
@@ -24,6 +24,84 @@ class Settings(BaseSettings):
     # OAuth2 client credentials (optional — skip dynamic registration if provided)
     openemr_client_id: str = ""
     openemr_client_secret: str = ""
+    # Refresh the access token this many seconds before it expires
+    openemr_token_refresh_margin_seconds: float = 60.0
+
+    # Max concurrent OpenEMR requests when fanning out chart sections
+    openemr_max_concurrency: int = 5
+    # Fetch chart sections in one FHIR batch Bundle instead of concurrent
+    # GETs. Only faster when client-side concurrency is constrained (see
+    # scripts/bench_fhir_batch.py); falls back to single GETs if rejected.
+    openemr_fhir_batch: bool = False
+
+    # Approximate token budget for get_patient_summary's compacted output;
+    # the longest sections are trimmed to fit (0 = no trimming)
+    patient_summary_token_budget: int = 1500
+
+    # FHIR search paging: _count per page, and a cap on entries merged into
+    # one Bundle by the get_* helpers (iter_bundle() streams without a cap)
+    openemr_page_size: int = 100
+    openemr_max_bundle_entries: int = 2000
+
+    # OpenEMR response cache (TTL overrides keyed by FHIR resource type)
+    openemr_cache_enabled: bool = True
+    openemr_cache_max_bytes: int = 32 * 1024 * 1024
+    openemr_cache_ttls: dict[str, float] = {}
+
+    # Per-upstream-host guard (app/clients/upstream_guard.py): AIMD
+    # concurrency limit, and a circuit breaker that opens after consecutive
+    # failures or responses slower than the latency threshold
+    upstream_max_concurrency: int = 16
+    upstream_min_concurrency: int = 1
+    upstream_queue_timeout_seconds: float = 2.0
+    upstream_failure_threshold: int = 5
+    upstream_latency_threshold_seconds: float = 10.0
+    upstream_open_seconds: float = 30.0
+
+    # Retries for idempotent upstream GETs (429/5xx/transport errors):
+    # exponential backoff with full jitter, Retry-After honored, total time
+    # (attempts plus waits) capped by the budget. retry_overrides is keyed by client name
+    # ("openemr", "rxnav", "icd10", "pubmed"), e.g. {"rxnav": {"max_attempts": 2}}
+    retry_max_attempts: int = 3
+    retry_base_delay_seconds: float = 0.2
+    retry_max_delay_seconds: float = 5.0
+    retry_budget_seconds: float = 10.0
+    retry_overrides: dict[str, dict[str, float]] = {}
+
+    # Max concurrent RxNav calls while resolving a medication list
+    rxnav_max_concurrency: int = 8
+    # Hedged resolution: start the exact/approximate/brand tiers this many
+    # seconds apart instead of one after another (results keep tier order).
+    # Costs extra RxNav requests: tiers that turn out unneeded still run
+    rxnav_hedged_tiers: bool = False
+    rxnav_hedge_delay_seconds: float = 0.05
+
+    # Offline RxNorm index built by scripts/load_rxnorm.py; empty = RxNav only
+    rxnorm_index_path: str = ""
+    # Minimum 0-100 score for a local approximate (tier 2) match
+    rxnorm_fuzzy_min_score: int = 70
+
+    # CMS ICD-10-CM order or codes file (icd10cm_order_YYYY.txt); when set,
+    # icd10_lookup is answered in-process instead of by Clinical Tables
+    icd10_index_path: str = ""
+    # Typeahead-aware LRU cache of Clinical Tables results (entries; 0 = off)
+    icd10_cache_size: int = 1024
+
+    # Persistent drug-name resolution cache (SQLite, shared across workers)
+    drug_resolution_ttl_seconds: float = 7 * 24 * 3600.0
+    drug_resolution_negative_ttl_seconds: float = 3600.0
+    # Per-pair interaction results (same SQLite file); empty pairs included
+    drug_interaction_ttl_seconds: float = 7 * 24 * 3600.0
+
+    # Persistent PubMed cache (same SQLite file): query -> PMID list, and
+    # PMID -> article summary shared across queries
+    pubmed_query_ttl_seconds: float = 6 * 3600.0
+    pubmed_summary_ttl_seconds: float = 30 * 24 * 3600.0
+
+    # Offline literature index built by scripts/load_pubmed_baseline.py.
+    # "fallback" searches it only when E-utilities fails; "local" always
+    pubmed_index_path: str = ""
+    pubmed_index_mode: str = "fallback"
 
     # Models
     primary_model: str = "claude-sonnet-4-20250514"
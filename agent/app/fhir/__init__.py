@@ -0,0 +1,43 @@
+"""Shared FHIR extraction layer: compact records and their extractors."""
+
+from app.fhir.extractors import (
+    allergy,
+    appointment,
+    concept_code,
+    concept_text,
+    condition,
+    extract,
+    medication,
+    medication_fields,
+    observation,
+    patient,
+)
+from app.fhir.records import (
+    AllergyRecord,
+    AppointmentRecord,
+    ConditionRecord,
+    MedicationRecord,
+    ObservationRecord,
+    PatientRecord,
+    Reaction,
+)
+
+__all__ = [
+    "AllergyRecord",
+    "AppointmentRecord",
+    "ConditionRecord",
+    "MedicationRecord",
+    "ObservationRecord",
+    "PatientRecord",
+    "Reaction",
+    "allergy",
+    "appointment",
+    "concept_code",
+    "concept_text",
+    "condition",
+    "extract",
+    "medication",
+    "medication_fields",
+    "observation",
+    "patient",
+]
@@ -0,0 +1,198 @@
+"""Extractors from FHIR R4 resource dicts to compact records.
+
+Each extractor reads one resource in a single pass: lookups fall back to
+shared immutable empties instead of allocating a fresh {} or [{}] default
+per .get(), the narrative-stripping regex is compiled once, and an
+absent or empty coding list never raises. extract() applies an extractor
+to every entry of a search Bundle.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Mapping
+from types import MappingProxyType
+from typing import Any, TypeVar
+
+from app.fhir.records import (
+    AllergyRecord,
+    AppointmentRecord,
+    ConditionRecord,
+    MedicationRecord,
+    ObservationRecord,
+    PatientRecord,
+    Reaction,
+)
+
+R = TypeVar("R")
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+_NONE: tuple[Any, ...] = ()
+_TAG_RE = re.compile(r"<[^>]+>")
+# OpenEMR codes "no coded value" as a data-absent-reason coding with
+# display "Unknown"; it is never a real name or code.
+_ABSENT = "data-absent-reason"
+
+
+def concept_text(concept: Mapping[str, Any]) -> str:
+    """CodeableConcept display: text, else the first usable coding display/code."""
+    text = concept.get("text")
+    if text:
+        return str(text)
+    for coding in concept.get("coding") or _NONE:
+        if _ABSENT in (coding.get("system") or ""):
+            continue
+        display = coding.get("display") or coding.get("code")
+        if display:
+            return str(display)
+    return ""
+
+
+def concept_code(concept: Mapping[str, Any]) -> str:
+    """First real coding code of a CodeableConcept."""
+    for coding in concept.get("coding") or _NONE:
+        code = coding.get("code")
+        if code and _ABSENT not in (coding.get("system") or ""):
+            return str(code)
+    return ""
+
+
+def _status_code(concept: Mapping[str, Any] | None) -> str:
+    """Code of the first coding (clinicalStatus/verificationStatus)."""
+    codings = (concept or _EMPTY).get("coding") or _NONE
+    return str(codings[0].get("code") or "") if codings else ""
+
+
+# Records are built positionally: a slotted dataclass __init__ called with
+# keywords costs about twice as much, which dominates at 10k entries.
+
+def observation(resource: Mapping[str, Any]) -> ObservationRecord:
+    code = resource.get("code") or _EMPTY
+    quantity = resource.get("valueQuantity")
+    if quantity:
+        value = quantity.get("value", resource.get("valueString", ""))
+        unit = quantity.get("unit") or ""
+    else:
+        value = resource.get("valueString", "")
+        unit = ""
+    return ObservationRecord(
+        code.get("text") or concept_text(code),
+        value,
+        unit,
+        resource.get("effectiveDateTime") or "",
+        resource.get("status") or "",
+    )
+
+
+def allergy(resource: Mapping[str, Any]) -> AllergyRecord:
+    # OpenEMR fills different fields depending on whether a coded allergen
+    # was selected: code.text, else the text.div narrative built from
+    # lists.title (always present), else a coding, else a note.
+    code = resource.get("code") or _EMPTY
+    substance = code.get("text") or ""
+    if not substance:
+        div = (resource.get("text") or _EMPTY).get("div")
+        if div:
+            substance = _TAG_RE.sub("", div).strip()
+    if not substance:
+        substance = concept_text(code)
+    if not substance:
+        notes = resource.get("note")
+        substance = (notes[0].get("text") or "") if notes else ""
+    reactions = []
+    for reaction in resource.get("reaction") or _NONE:
+        manifestations = reaction.get("manifestation")
+        reactions.append(Reaction(
+            concept_text(manifestations[0]) if manifestations else "",
+            reaction.get("severity") or "",
+        ))
+    return AllergyRecord(
+        substance or "Not specified",
+        resource.get("type") or "",
+        resource.get("criticality") or "",
+        resource.get("onsetDateTime") or "",
+        _status_code(resource.get("clinicalStatus")),
+        reactions,
+    )
+
+
+def medication(resource: Mapping[str, Any]) -> MedicationRecord:
+    concept = resource.get("medicationCodeableConcept") or _EMPTY
+    dosages = resource.get("dosageInstruction")
+    return MedicationRecord(
+        concept.get("text") or concept_text(concept),
+        resource.get("status") or "",
+        resource.get("intent") or "",
+        (dosages[0].get("text") or "") if dosages else "",
+        resource.get("authoredOn") or "",
+    )
+
+
+def medication_fields(resource: Mapping[str, Any]) -> dict[str, str]:
+    """get_medications' output fields, built without a MedicationRecord.
+
+    The tool only serialises name/status/intent, so going through the record
+    would build two objects per entry and cost about twice the dict walk it
+    replaced. The name comes from the same concept_text fallback.
+    """
+    concept = resource.get("medicationCodeableConcept") or _EMPTY
+    return {
+        "medication": concept.get("text") or concept_text(concept),
+        "status": resource.get("status") or "",
+        "intent": resource.get("intent") or "",
+    }
+
+
+def condition(resource: Mapping[str, Any]) -> ConditionRecord:
+    code = resource.get("code") or _EMPTY
+    return ConditionRecord(
+        concept_text(code),
+        concept_code(code),
+        _status_code(resource.get("clinicalStatus")),
+        resource.get("onsetDateTime") or "",
+    )
+
+
+def appointment(resource: Mapping[str, Any]) -> AppointmentRecord:
+    start = resource.get("start") or ""
+    date, _, time = start.partition("T")
+    provider = ""
+    for participant in resource.get("participant") or _NONE:
+        actor = participant.get("actor") or _EMPTY
+        if (actor.get("reference") or "").startswith("Practitioner"):
+            provider = actor.get("display") or ""
+            break
+    reasons = resource.get("reasonCode")
+    return AppointmentRecord(
+        date,
+        time,
+        provider,
+        (reasons[0].get("text") or "") if reasons else "",
+        resource.get("status") or "",
+    )
+
+
+def patient(resource: Mapping[str, Any]) -> PatientRecord:
+    names = resource.get("name")
+    name = ""
+    if names:
+        given = " ".join(names[0].get("given") or _NONE)
+        name = f"{given} {names[0].get('family') or ''}".strip()
+    return PatientRecord(
+        resource.get("id") or "",
+        name,
+        resource.get("birthDate") or "",
+        resource.get("gender") or "",
+    )
+
+
+def extract(
+    bundle: Mapping[str, Any] | None, extractor: Callable[[Mapping[str, Any]], R]
+) -> list[R]:
+    """Apply an extractor to every entry's resource in a search Bundle."""
+    if not bundle:
+        return []
+    return [
+        extractor(entry.get("resource") or _EMPTY)
+        for entry in bundle.get("entry") or _NONE
+    ]
@@ -0,0 +1,72 @@
+"""Compact typed records for the FHIR resources the tools read.
+
+Slotted dataclasses: no per-instance __dict__, so a record costs a fraction
+of the equivalent dict and attribute access is a fixed-offset load. Fields
+hold display-ready strings; missing data is "" rather than None.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass(slots=True)
+class ObservationRecord:
+    """A lab result or vital sign."""
+
+    name: str
+    value: Any
+    unit: str
+    date: str
+    status: str
+
+
+@dataclass(slots=True)
+class Reaction:
+    manifestation: str
+    severity: str
+
+
+@dataclass(slots=True)
+class AllergyRecord:
+    substance: str
+    type: str
+    criticality: str
+    onset: str
+    clinical_status: str
+    reactions: list[Reaction] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class MedicationRecord:
+    medication: str
+    status: str
+    intent: str
+    dosage: str
+    authored_on: str
+
+
+@dataclass(slots=True)
+class ConditionRecord:
+    condition: str
+    code: str
+    clinical_status: str
+    onset: str
+
+
+@dataclass(slots=True)
+class AppointmentRecord:
+    date: str
+    time: str
+    provider: str
+    reason: str
+    status: str
+
+
+@dataclass(slots=True)
+class PatientRecord:
+    id: str
+    name: str
+    birth_date: str
+    gender: str
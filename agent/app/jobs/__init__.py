@@ -0,0 +1 @@
+"""Batch jobs run outside the request path (e.g. nightly screening)."""
@@ -0,0 +1,193 @@
+"""Overnight drug-interaction screening of every active patient.
+
+Patients are streamed from a paginated FHIR Patient search into a bounded
+queue; a fixed pool of workers fetches each patient's MedicationRequests and
+runs DrugInteractionClient.check_interactions_by_names. Drug strings are
+resolved once per run across the whole panel (concurrent patients on the same
+drug share one in-flight resolution), and results are written per patient to
+the ScreeningStore, which doubles as the checkpoint: rerunning a run_id skips
+patients that already have a result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.clients.openemr import OpenEMRClient
+from app.clients.openfda import DrugInteractionClient
+from app.clients.rxnorm_index import normalize_name
+from app.fhir import extract, medication
+from app.persistence.screening import ScreeningRun, ScreeningStore
+
+logger = logging.getLogger(__name__)
+
+# MedicationRequest statuses that count as a current medication.
+ACTIVE_STATUSES = frozenset({"active", "on-hold", ""})
+
+
+def medication_names(bundle: dict[str, Any]) -> list[str]:
+    """Distinct current medication strings from a MedicationRequest Bundle.
+
+    Names come from the same extractor as the get_medications tool, so the
+    job screens exactly the medications the agent would list.
+    """
+    names: dict[str, str] = {}
+    for record in extract(bundle, medication):
+        name = record.medication.strip()
+        if name and record.status in ACTIVE_STATUSES:
+            names.setdefault(normalize_name(name), name)
+    return list(names.values())
+
+
+class PanelResolver:
+    """resolve_drug_name memoized for one run, keyed by normalized name."""
+
+    def __init__(self, resolve: Callable[[str], Awaitable[dict[str, Any]]]) -> None:
+        self._resolve = resolve
+        self._tasks: dict[str, asyncio.Task[dict[str, Any]]] = {}
+        self.lookups = 0
+
+    async def __call__(self, drug_name: str) -> dict[str, Any]:
+        self.lookups += 1
+        key = normalize_name(drug_name)
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(self._resolve(drug_name))
+        try:
+            # Shielded: a cancelled patient must not cancel a shared lookup.
+            resolution = await asyncio.shield(task)
+        except Exception:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+            raise
+        return {**resolution, "original_name": drug_name}
+
+    @property
+    def distinct(self) -> int:
+        return len(self._tasks)
+
+
+class PanelScreeningJob:
+    """Screens the medication lists of all patients matching a FHIR search."""
+
+    def __init__(
+        self,
+        openemr: OpenEMRClient,
+        drug: DrugInteractionClient,
+        store: ScreeningStore,
+        concurrency: int = 4,
+        patient_params: dict[str, Any] | None = None,
+        progress_every: int = 100,
+    ) -> None:
+        self.openemr = openemr
+        self.drug = drug
+        self.store = store
+        self.concurrency = concurrency
+        self.patient_params = (
+            {"active": "true"} if patient_params is None else patient_params
+        )
+        self.progress_every = progress_every
+
+    async def run(self, run_id: str | None = None) -> ScreeningRun:
+        """Screen the panel. Pass a previous run_id to resume it."""
+        run = await self.store.start_run(run_id or uuid.uuid4().hex)
+        done = await self.store.screened_patients(run.run_id)
+        run.patients_failed = 0  # failed patients are retried on resume
+        if done:
+            logger.info(
+                "Resuming screening run %s (%d patients already screened)",
+                run.run_id,
+                len(done),
+            )
+        resolver = PanelResolver(self.drug.resolve_drug_name)
+        queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=self.concurrency * 2)
+        start = time.monotonic()
+        screened = 0
+        interactions = 0
+
+        async def worker() -> None:
+            nonlocal screened, interactions
+            while (patient_uuid := await queue.get()) is not None:
+                try:
+                    result = await self._screen_patient(patient_uuid, resolver)
+                    await self.store.save_result(run.run_id, patient_uuid, result)
+                except Exception as e:
+                    run.patients_failed += 1
+                    logger.warning("Screening failed for %s: %s", patient_uuid, e)
+                    continue
+                run.patients_done += 1
+                screened += 1
+                interactions += len(result["interactions"])
+                if run.patients_done % self.progress_every == 0:
+                    run.stats = _stats(screened, interactions, resolver, start)
+                    await self.store.update_run(run)
+                    logger.info("Screening run %s: %s", run.run_id, run.stats)
+
+        async def feed() -> None:
+            async for entry in self.openemr.iter_bundle(
+                "Patient", params=self.patient_params
+            ):
+                patient_uuid = entry.get("resource", {}).get("id")
+                if patient_uuid and patient_uuid not in done:
+                    await queue.put(patient_uuid)
+            for _ in range(self.concurrency):
+                await queue.put(None)
+
+        tasks = [asyncio.create_task(feed())] + [
+            asyncio.create_task(worker()) for _ in range(self.concurrency)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Saved results are the checkpoint; keep the counters in step.
+            for task in tasks:
+                task.cancel()
+            run.stats = _stats(screened, interactions, resolver, start)
+            await asyncio.shield(self.store.update_run(run))
+            raise
+
+        run.stats = _stats(screened, interactions, resolver, start)
+        # Failed patients leave the run open, so a rerun retries just those.
+        await self.store.update_run(run, finished=run.patients_failed == 0)
+        logger.info("Screening run %s finished: %s", run.run_id, run.stats)
+        return run
+
+    async def _screen_patient(
+        self, patient_uuid: str, resolver: PanelResolver
+    ) -> dict[str, Any]:
+        names = medication_names(await self.openemr.get_medications(patient_uuid))
+        if len(names) < 2:
+            return {
+                "medications": names,
+                "interactions": [],
+                "unresolved": [],
+                "check_complete": True,
+                "warning": None,
+            }
+        result = await self.drug.check_interactions_by_names(names, resolve=resolver)
+        return {
+            "medications": names,
+            "interactions": result["interactions"],
+            "unresolved": result["unresolved"],
+            "check_complete": result["check_complete"],
+            "warning": result["warning"],
+        }
+
+
+def _stats(
+    screened: int, interactions: int, resolver: PanelResolver, start: float
+) -> dict[str, Any]:
+    elapsed = time.monotonic() - start
+    return {
+        "patients_screened": screened,
+        "patients_per_min": round(screened / elapsed * 60, 1) if elapsed else 0.0,
+        "interactions_found": interactions,
+        "drug_lookups": resolver.lookups,
+        "distinct_drugs": resolver.distinct,
+        "elapsed_seconds": round(elapsed, 1),
+    }
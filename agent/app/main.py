@@ -9,14 +9,24 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.agent.graph import build_graph
 from app.agent.models import get_primary_model, get_verification_model
+from app.clients.fuzzy_matcher import FuzzyMatcher
 from app.clients.icd10_client import ICD10Client
+from app.clients.icd10_index import ICD10Index
+from app.clients.interaction_store import InteractionPairStore
+from app.clients.literature_index import LiteratureIndex
 from app.clients.openemr import OpenEMRClient
 from app.clients.openfda import DrugInteractionClient
 from app.clients.pubmed_client import PubMedClient
+from app.clients.retry import RetryPolicy
+from app.clients.rxnorm_index import RxNormIndex
+from app.clients.upstream_guard import GuardConfig
+from app.clients.upstream_guard import registry as upstream_guards
 from app.config import settings
 from app.middleware.audit_logger import AuditLogMiddleware
 from app.middleware.cost_tracker import CostTrackerMiddleware
+from app.persistence.screening import ScreeningStore
 from app.persistence.store import SessionStore, get_checkpointer
+from app.persistence.ttl_cache import SqliteTTLCache
 from app.routes.approve import router as approve_router
 from app.routes.chat import router as chat_router
 from app.routes.feedback import router as feedback_router
@@ -28,6 +38,7 @@ from app.tools import labs as labs_tool
 from app.tools import medications as med_tool
 from app.tools import patient as patient_tool
 from app.tools import pubmed as pubmed_tool
+from app.tools import screening as screening_tool
 from app.tools import vitals as vitals_tool
 
 logging.basicConfig(level=logging.INFO)
@@ -37,22 +48,110 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize clients, inject into tools, build agent graph."""
-    # Create clients
+    db_path = os.environ.get("AGENT_DB_PATH", "/app/data/agent_state.db")
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    # Upstream lookups (drug resolutions etc.) live in their own file so cache
+    # writes never contend with session/checkpoint writes.
+    upstream_cache = SqliteTTLCache(
+        os.path.join(os.path.dirname(db_path), "upstream_cache.db")
+    )
+    await upstream_cache.init_db()
+    purged = await upstream_cache.purge_expired()
+    if purged:
+        logger.info("Purged %d expired upstream cache entries", purged)
+
+    rxnorm_index = None
+    fuzzy_matcher = None
+    if settings.rxnorm_index_path:
+        if os.path.exists(settings.rxnorm_index_path):
+            rxnorm_index = RxNormIndex(settings.rxnorm_index_path)
+            fuzzy_matcher = FuzzyMatcher(
+                rxnorm_index.vocabulary(), min_score=settings.rxnorm_fuzzy_min_score
+            )
+            logger.info(
+                "Using offline RxNorm index at %s (%d fuzzy-match names)",
+                settings.rxnorm_index_path,
+                len(fuzzy_matcher),
+            )
+        else:
+            logger.warning(
+                "RxNorm index %s not found; resolving drugs via RxNav only",
+                settings.rxnorm_index_path,
+            )
+
+    # Create clients (all share the per-host upstream guards)
+    upstream_guards.configure(GuardConfig.from_settings(settings))
     openemr = OpenEMRClient(settings)
-    drug = DrugInteractionClient(timeout=settings.tool_timeout_seconds)
-    icd10 = ICD10Client(timeout=settings.tool_timeout_seconds)
+    drug = DrugInteractionClient(
+        timeout=settings.tool_timeout_seconds,
+        retry=RetryPolicy.from_settings(settings, "rxnav"),
+        resolution_cache=upstream_cache,
+        resolution_ttl=settings.drug_resolution_ttl_seconds,
+        negative_ttl=settings.drug_resolution_negative_ttl_seconds,
+        max_concurrency=settings.rxnav_max_concurrency,
+        hedge_delay=(
+            settings.rxnav_hedge_delay_seconds if settings.rxnav_hedged_tiers else None
+        ),
+        rxnorm_index=rxnorm_index,
+        fuzzy_matcher=fuzzy_matcher,
+        interaction_store=InteractionPairStore(
+            upstream_cache, ttl=settings.drug_interaction_ttl_seconds
+        ),
+    )
+    icd10_index = None
+    if settings.icd10_index_path:
+        if os.path.exists(settings.icd10_index_path):
+            icd10_index = ICD10Index.from_file(settings.icd10_index_path)
+            logger.info(
+                "Using offline ICD-10-CM index from %s (%d codes)",
+                settings.icd10_index_path,
+                len(icd10_index),
+            )
+        else:
+            logger.warning(
+                "ICD-10-CM file %s not found; using Clinical Tables API",
+                settings.icd10_index_path,
+            )
+    icd10 = ICD10Client(
+        timeout=settings.tool_timeout_seconds,
+        retry=RetryPolicy.from_settings(settings, "icd10"),
+        index=icd10_index,
+        cache_size=settings.icd10_cache_size,
+    )
+    literature_index = None
+    if settings.pubmed_index_path:
+        if os.path.exists(settings.pubmed_index_path):
+            literature_index = LiteratureIndex(settings.pubmed_index_path)
+            logger.info(
+                "Using offline literature index at %s (%d articles, %s mode)",
+                settings.pubmed_index_path,
+                len(literature_index),
+                settings.pubmed_index_mode,
+            )
+        else:
+            logger.warning(
+                "Literature index %s not found; searching PubMed only",
+                settings.pubmed_index_path,
+            )
     pubmed = PubMedClient(
         api_key=settings.pubmed_api_key,
         timeout=settings.tool_timeout_seconds,
+        retry=RetryPolicy.from_settings(settings, "pubmed"),
+        cache=upstream_cache,
+        query_ttl=settings.pubmed_query_ttl_seconds,
+        summary_ttl=settings.pubmed_summary_ttl_seconds,
+        local_index=literature_index,
+        local_mode=settings.pubmed_index_mode,
     )
 
     # Initialize persistence (SQLite for sessions + LangGraph state)
-    db_path = os.environ.get("AGENT_DB_PATH", "/app/data/agent_state.db")
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
     session_store = SessionStore(db_path)
     await session_store.init_db()
     checkpointer = await get_checkpointer(db_path)
     app.state.session_store = session_store
+    # Written by scripts/screen_panel.py; read by get_interaction_screening.
+    screening_store = ScreeningStore(db_path)
+    await screening_store.init_db()
     logger.info("SQLite persistence initialized at %s", db_path)
 
     # Authenticate with OpenEMR (OAuth2 registration + token)
@@ -63,7 +162,9 @@ async def lifespan(app: FastAPI):
         logger.warning("OpenEMR auth failed (tools will retry): %s", e)
 
     # Inject clients into tool modules
-    patient_tool.set_client(openemr)
+    patient_tool.set_client(
+        openemr, token_budget=settings.patient_summary_token_budget
+    )
     labs_tool.set_client(openemr)
     med_tool.set_clients(openemr, drug)
     icd10_tool.set_client(icd10)
@@ -71,6 +172,7 @@ async def lifespan(app: FastAPI):
     appointments_tool.set_client(openemr)
     vitals_tool.set_client(openemr)
     allergies_tool.set_client(openemr)
+    screening_tool.set_store(screening_store)
 
     # Build agent graph with verification model and checkpointer
     model = get_primary_model(settings)
@@ -85,6 +187,12 @@ async def lifespan(app: FastAPI):
 
     # Cleanup
     await session_store.close()
+    await screening_store.close()
+    await upstream_cache.close()
+    if rxnorm_index is not None:
+        rxnorm_index.close()
+    if literature_index is not None:
+        literature_index.close()
     await openemr.close()
     await drug.close()
     await icd10.close()
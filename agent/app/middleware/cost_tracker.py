@@ -9,6 +9,8 @@ from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoin
 from starlette.requests import Request
 from starlette.responses import Response
 
+from app.clients.metrics import RequestMetrics, current_metrics
+
 logger = logging.getLogger(__name__)
 
 LOG_DIR = Path("/app/logs")
@@ -16,7 +18,7 @@ LOG_FILE = LOG_DIR / "cost_log.jsonl"
 
 
 class CostTrackerMiddleware(BaseHTTPMiddleware):
-    """Logs timing info for /chat requests to a JSONL file."""
+    """Logs timing info and upstream retry counts for /chat requests to a JSONL file."""
 
     async def dispatch(
         self, request: Request, call_next: RequestResponseEndpoint
@@ -25,8 +27,13 @@ class CostTrackerMiddleware(BaseHTTPMiddleware):
             response: Response = await call_next(request)
             return response
 
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
         start = time.monotonic()
-        response = await call_next(request)
+        try:
+            response = await call_next(request)
+        finally:
+            current_metrics.reset(token)
         elapsed = time.monotonic() - start
 
         entry = {
@@ -35,6 +42,7 @@ class CostTrackerMiddleware(BaseHTTPMiddleware):
             "method": request.method,
             "elapsed_seconds": round(elapsed, 3),
             "status_code": response.status_code,
+            **metrics.to_dict(),
         }
 
         try:
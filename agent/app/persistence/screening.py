@@ -0,0 +1,207 @@
+"""SQLite tables for panel-wide medication interaction screening.
+
+- screening_runs: one row per batch run, with progress counters so an
+  interrupted run can be resumed
+- screening_results: one row per (run, patient) with the interaction check,
+  read back by the agent through get_latest()
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScreeningRun:
+    """A persisted screening run row."""
+
+    run_id: str
+    started_at: str
+    finished_at: str | None = None
+    patients_done: int = 0
+    patients_failed: int = 0
+    stats: dict[str, Any] = field(default_factory=dict)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class ScreeningStore:
+    """Async SQLite store for screening runs and per-patient results."""
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self._conn: aiosqlite.Connection | None = None
+
+    async def init_db(self) -> None:
+        """Create tables if they don't exist."""
+        self._conn = await aiosqlite.connect(self.db_path)
+        await self._conn.execute("PRAGMA journal_mode=WAL")
+        await self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS screening_runs (
+                run_id TEXT PRIMARY KEY,
+                started_at TEXT NOT NULL,
+                finished_at TEXT,
+                patients_done INTEGER DEFAULT 0,
+                patients_failed INTEGER DEFAULT 0,
+                stats TEXT NOT NULL DEFAULT '{}'
+            );
+            CREATE TABLE IF NOT EXISTS screening_results (
+                run_id TEXT NOT NULL,
+                patient_uuid TEXT NOT NULL,
+                screened_at TEXT NOT NULL,
+                medications TEXT NOT NULL,
+                interactions TEXT NOT NULL,
+                unresolved TEXT NOT NULL,
+                check_complete INTEGER NOT NULL,
+                warning TEXT,
+                PRIMARY KEY (run_id, patient_uuid)
+            );
+            CREATE INDEX IF NOT EXISTS screening_results_patient
+                ON screening_results (patient_uuid, screened_at);
+            """
+        )
+        await self._conn.commit()
+
+    async def _ensure_conn(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            await self.init_db()
+        assert self._conn is not None
+        return self._conn
+
+    async def start_run(self, run_id: str) -> ScreeningRun:
+        """Create a run, or return the existing one to resume it."""
+        existing = await self.get_run(run_id)
+        if existing is not None:
+            return existing
+        run = ScreeningRun(run_id=run_id, started_at=_now())
+        conn = await self._ensure_conn()
+        await conn.execute(
+            "INSERT INTO screening_runs (run_id, started_at) VALUES (?, ?)",
+            (run.run_id, run.started_at),
+        )
+        await conn.commit()
+        return run
+
+    async def get_run(self, run_id: str) -> ScreeningRun | None:
+        conn = await self._ensure_conn()
+        cursor = await conn.execute(
+            "SELECT run_id, started_at, finished_at, patients_done, "
+            "patients_failed, stats FROM screening_runs WHERE run_id = ?",
+            (run_id,),
+        )
+        row = await cursor.fetchone()
+        return _run_from_row(row) if row else None
+
+    async def latest_unfinished_run(self) -> ScreeningRun | None:
+        """The most recently started run that never finished (to resume)."""
+        conn = await self._ensure_conn()
+        cursor = await conn.execute(
+            "SELECT run_id, started_at, finished_at, patients_done, "
+            "patients_failed, stats FROM screening_runs "
+            "WHERE finished_at IS NULL ORDER BY started_at DESC LIMIT 1"
+        )
+        row = await cursor.fetchone()
+        return _run_from_row(row) if row else None
+
+    async def update_run(
+        self, run: ScreeningRun, finished: bool = False
+    ) -> None:
+        """Persist the run's counters (and finish time)."""
+        if finished:
+            run.finished_at = _now()
+        conn = await self._ensure_conn()
+        await conn.execute(
+            "UPDATE screening_runs SET finished_at = ?, patients_done = ?, "
+            "patients_failed = ?, stats = ? WHERE run_id = ?",
+            (
+                run.finished_at,
+                run.patients_done,
+                run.patients_failed,
+                json.dumps(run.stats),
+                run.run_id,
+            ),
+        )
+        await conn.commit()
+
+    async def screened_patients(self, run_id: str) -> set[str]:
+        """Patients that already have a result in this run."""
+        conn = await self._ensure_conn()
+        cursor = await conn.execute(
+            "SELECT patient_uuid FROM screening_results WHERE run_id = ?", (run_id,)
+        )
+        return {row[0] for row in await cursor.fetchall()}
+
+    async def save_result(
+        self, run_id: str, patient_uuid: str, result: dict[str, Any]
+    ) -> None:
+        """Insert or replace one patient's screening result."""
+        conn = await self._ensure_conn()
+        await conn.execute(
+            """
+            INSERT OR REPLACE INTO screening_results
+                (run_id, patient_uuid, screened_at, medications, interactions,
+                 unresolved, check_complete, warning)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                run_id,
+                patient_uuid,
+                _now(),
+                json.dumps(result["medications"]),
+                json.dumps(result["interactions"]),
+                json.dumps(result["unresolved"]),
+                int(result["check_complete"]),
+                result["warning"],
+            ),
+        )
+        await conn.commit()
+
+    async def get_latest(self, patient_uuid: str) -> dict[str, Any] | None:
+        """The most recent screening result for a patient, or None."""
+        conn = await self._ensure_conn()
+        cursor = await conn.execute(
+            "SELECT run_id, screened_at, medications, interactions, unresolved, "
+            "check_complete, warning FROM screening_results "
+            "WHERE patient_uuid = ? ORDER BY screened_at DESC LIMIT 1",
+            (patient_uuid,),
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            return None
+        return {
+            "run_id": row[0],
+            "screened_at": row[1],
+            "medications": json.loads(row[2]),
+            "interactions": json.loads(row[3]),
+            "unresolved": json.loads(row[4]),
+            "check_complete": bool(row[5]),
+            "warning": row[6],
+        }
+
+    async def close(self) -> None:
+        """Close the database connection."""
+        if self._conn:
+            await self._conn.close()
+            self._conn = None
+
+
+def _run_from_row(row: Any) -> ScreeningRun:
+    return ScreeningRun(
+        run_id=row[0],
+        started_at=row[1],
+        finished_at=row[2],
+        patients_done=row[3],
+        patients_failed=row[4],
+        stats=json.loads(row[5]),
+    )
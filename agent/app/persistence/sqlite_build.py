@@ -0,0 +1,36 @@
+"""Build a read-only SQLite file off to the side and swap it in atomically.
+
+The offline indexes (RxNorm, literature) are rebuilt by scripts while the
+agent may have the previous file open. building_sqlite() hands the builder a
+connection to a sibling ".tmp" file and only os.replace()s it over the
+target once the builder returns; on error the partial file is removed and
+the old index is left untouched.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+@contextmanager
+def building_sqlite(db_path: str) -> Iterator[sqlite3.Connection]:
+    """Yield a connection to a fresh temp database that replaces db_path on exit.
+
+    The builder is responsible for committing; the connection is closed
+    before the rename.
+    """
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.unlink(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        yield conn
+    except BaseException:
+        conn.close()
+        os.unlink(tmp_path)
+        raise
+    conn.close()
+    os.replace(tmp_path, db_path)
@@ -0,0 +1,166 @@
+"""SQLite-backed key/value cache with per-entry TTLs.
+
+Shared by every worker process and kept across restarts: values are JSON
+documents in a WAL-mode SQLite file, grouped by namespace (e.g. "drug_resolution").
+Expiry uses wall-clock time so all processes agree on it. Cache failures are
+logged and treated as misses; callers always fall back to the live API.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections.abc import Callable
+from typing import Any
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+# Keys per get_many() statement, well under SQLite's bound-variable limit
+# (999 in builds before 3.32).
+_MAX_KEYS_PER_QUERY = 500
+
+
+class SqliteTTLCache:
+    """Async SQLite TTL cache of JSON-serializable values."""
+
+    def __init__(
+        self, db_path: str, clock: Callable[[], float] = time.time
+    ) -> None:
+        self.db_path = db_path
+        self._clock = clock
+        self._conn: aiosqlite.Connection | None = None
+        self.hits = 0
+        self.misses = 0
+
+    async def init_db(self) -> None:
+        """Open the database and create the table if it doesn't exist."""
+        self._conn = await aiosqlite.connect(self.db_path)
+        await self._conn.execute("PRAGMA journal_mode=WAL")
+        await self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ttl_cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        await self._conn.commit()
+
+    async def _ensure_conn(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            await self.init_db()
+        assert self._conn is not None
+        return self._conn
+
+    async def get(self, namespace: str, key: str) -> Any | None:
+        """Return the cached value, or None when missing, expired or unreadable."""
+        try:
+            conn = await self._ensure_conn()
+            cursor = await conn.execute(
+                "SELECT value FROM ttl_cache "
+                "WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, self._clock()),
+            )
+            row = await cursor.fetchone()
+        except aiosqlite.Error as e:
+            logger.warning("TTL cache read failed (%s): %s", namespace, e)
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    async def get_many(self, namespace: str, keys: list[str]) -> dict[str, Any]:
+        """Return {key: value} for the keys that are cached and fresh."""
+        if not keys:
+            return {}
+        found: dict[str, Any] = {}
+        unique = list(dict.fromkeys(keys))
+        try:
+            conn = await self._ensure_conn()
+            now = self._clock()
+            for start in range(0, len(unique), _MAX_KEYS_PER_QUERY):
+                chunk = unique[start:start + _MAX_KEYS_PER_QUERY]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = await conn.execute(
+                    f"SELECT key, value FROM ttl_cache WHERE namespace = ? "
+                    f"AND key IN ({placeholders}) AND expires_at > ?",
+                    (namespace, *chunk, now),
+                )
+                for key, value in await cursor.fetchall():
+                    found[key] = json.loads(value)
+        except aiosqlite.Error as e:
+            logger.warning("TTL cache read failed (%s): %s", namespace, e)
+        self.hits += len(found)
+        self.misses += len(unique) - len(found)
+        return found
+
+    async def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        """Store a value for ttl seconds."""
+        await self.set_many(namespace, {key: value}, ttl)
+
+    async def set_many(
+        self, namespace: str, values: dict[str, Any], ttl: float
+    ) -> None:
+        """Store several values with the same ttl in one transaction."""
+        if not values:
+            return
+        expires_at = self._clock() + ttl
+        try:
+            conn = await self._ensure_conn()
+            await conn.executemany(
+                "INSERT OR REPLACE INTO ttl_cache (namespace, key, value, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (namespace, key, json.dumps(value), expires_at)
+                    for key, value in values.items()
+                ],
+            )
+            await conn.commit()
+        except aiosqlite.Error as e:
+            logger.warning("TTL cache write failed (%s): %s", namespace, e)
+
+    async def delete(self, namespace: str, key: str) -> None:
+        conn = await self._ensure_conn()
+        await conn.execute(
+            "DELETE FROM ttl_cache WHERE namespace = ? AND key = ?", (namespace, key)
+        )
+        await conn.commit()
+
+    async def purge_expired(self) -> int:
+        """Delete expired rows. Returns the number removed.
+
+        Expired rows are never read but stay on disk until purged; callers
+        run this when they open the cache.
+        """
+        try:
+            conn = await self._ensure_conn()
+            cursor = await conn.execute(
+                "DELETE FROM ttl_cache WHERE expires_at <= ?", (self._clock(),)
+            )
+            await conn.commit()
+        except aiosqlite.Error as e:
+            logger.warning("TTL cache purge failed: %s", e)
+            return 0
+        return cursor.rowcount
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    async def close(self) -> None:
+        """Close the database connection."""
+        if self._conn:
+            await self._conn.close()
+            self._conn = None
@@ -8,6 +8,7 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, HTTPException, Request
 from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 
+from app.clients.eutils_scheduler import current_conversation
 from app.persistence.store import SessionRecord, SessionStore
 from app.schemas.chat import ChatRequest, ChatResponse, ToolCall
 
@@ -113,7 +114,12 @@ async def chat(req: ChatRequest, request: Request):
 
     # Pass thread_id for LangGraph state persistence
     config = {"configurable": {"thread_id": session.thread_id}}
-    result = await graph.ainvoke(input_state, config=config)
+    # Tag upstream calls with the conversation for fair E-utilities queueing
+    token = current_conversation.set(conversation_id)
+    try:
+        result = await graph.ainvoke(input_state, config=config)
+    finally:
+        current_conversation.reset(token)
 
     # --- HITL: detect if graph interrupted at approval_gate ---
     pending_approval = False
@@ -1,5 +1,8 @@
 from fastapi import APIRouter
 
+from app.clients.eutils_scheduler import registry as eutils_schedulers
+from app.clients.upstream_guard import registry as upstream_guards
+
 router = APIRouter()
 
 
@@ -11,3 +14,15 @@ async def health():
 @router.get("/ready")
 async def ready():
     return {"status": "ready"}
+
+
+@router.get("/health/upstreams")
+async def upstreams():
+    """Circuit state and concurrency limit per upstream host."""
+    return upstream_guards.stats()
+
+
+@router.get("/health/eutils")
+async def eutils():
+    """NCBI E-utilities request queue depth and wait times per API key."""
+    return eutils_schedulers.stats()
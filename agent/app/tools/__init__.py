@@ -8,6 +8,7 @@ from app.tools.labs import get_lab_results
 from app.tools.medications import drug_interaction_check, get_medications
 from app.tools.patient import get_patient_summary, search_patients
 from app.tools.pubmed import pubmed_search
+from app.tools.screening import get_interaction_screening
 from app.tools.vitals import get_vitals
 
 MVP_TOOLS = [
@@ -25,6 +26,7 @@ ALL_TOOLS = MVP_TOOLS + [
     get_vitals,
     get_allergies_detailed,
     create_clinical_note,
+    get_interaction_screening,
 ]
 
 __all__ = ["MVP_TOOLS", "ALL_TOOLS"]
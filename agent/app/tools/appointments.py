@@ -5,6 +5,7 @@ from typing import Any
 from langchain_core.tools import tool
 
 from app.clients.openemr import OpenEMRClient
+from app.fhir import appointment, extract
 from app.tools.base import tool_error_handler
 
 _client: OpenEMRClient | None = None
@@ -32,27 +33,14 @@ async def get_appointments(patient_uuid: str, date_range: str = "upcoming") -> d
     """
     client = _get_client()
     results = await client.get_appointments(patient_uuid)
-    entries = results.get("entry", [])
-    appointments = []
-    for entry in entries:
-        resource = entry.get("resource", {})
-        # Parse participant for provider name
-        provider = ""
-        for participant in resource.get("participant", []):
-            actor = participant.get("actor", {})
-            if actor.get("reference", "").startswith("Practitioner"):
-                provider = actor.get("display", "")
-                break
-
-        appointments.append({
-            "date": resource.get("start", "").split("T")[0] if resource.get("start") else "",
-            "time": resource.get("start", "").split("T")[1]
-            if "T" in resource.get("start", "")
-            else "",
-            "provider": provider,
-            "reason": resource.get("reasonCode", [{}])[0].get("text", "")
-            if resource.get("reasonCode")
-            else "",
-            "status": resource.get("status", ""),
-        })
+    appointments = [
+        {
+            "date": r.date,
+            "time": r.time,
+            "provider": r.provider,
+            "reason": r.reason,
+            "status": r.status,
+        }
+        for r in extract(results, appointment)
+    ]
     return {"status": "success", "data": {"appointments": appointments, "total": len(appointments)}}
@@ -4,6 +4,8 @@ import functools
 import logging
 from typing import Any, Callable
 
+from app.clients.upstream_guard import UpstreamUnavailableError
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,6 +17,19 @@ def tool_error_handler(func: Callable) -> Callable:
         try:
             result: dict[str, Any] = await func(*args, **kwargs)
             return result
+        except UpstreamUnavailableError as e:
+            logger.warning("Tool %s skipped: %s", func.__name__, e)
+            return {
+                "status": "error",
+                "error": (
+                    f"Tool '{func.__name__}' unavailable: {e.host} is not responding "
+                    f"({e.reason}). Try again in {e.retry_after:.0f}s or answer "
+                    "without this data."
+                ),
+                "retryable": True,
+                "upstream": e.host,
+                "retry_after_seconds": round(e.retry_after, 1),
+            }
         except TimeoutError:
             logger.warning("Tool %s timed out", func.__name__)
             return {
@@ -0,0 +1,185 @@
+"""Compaction of get_patient_summary chart sections for the LLM context.
+
+Raw FHIR bundles carry meta, narrative HTML (text.div), full coding arrays
+and Bundle links, none of which the model needs, and whatever a tool returns
+is re-sent on every later reason step and stored in every checkpoint.
+compact_chart() projects each section down to its clinically relevant
+fields, drops duplicate entries, and trims the longest lists from the end
+(oldest vitals first, since they are sorted newest first) until the result
+fits a token budget. Allergies and conditions are never trimmed. Trimmed
+sections are reported with a note pointing at the detailed tool for the
+full list.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from app import fhir
+
+# Rough JSON-text ratio, as used for the model's context accounting.
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = 1500
+
+# Sections that may be shortened to meet the budget, each with a detail
+# tool that returns the rest. A missed allergy or active diagnosis is a
+# safety issue and no tool lists conditions, so those always go out whole.
+_TRIMMABLE = ("medications", "vitals")
+# Tool that returns the full list for each trimmable section.
+_DETAIL_TOOLS = {
+    "medications": "get_medications",
+    "vitals": "get_vitals",
+}
+
+
+def estimate_tokens(value: Any) -> int:
+    """Approximate token count of a value once serialized into a tool message."""
+    return _json_len(value) // CHARS_PER_TOKEN + 1
+
+
+def _dedupe(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    seen: set[str] = set()
+    unique = []
+    for item in items:
+        key = json.dumps(item, sort_keys=True, default=str)
+        if key not in seen:
+            seen.add(key)
+            unique.append(item)
+    return unique
+
+
+def _drop_empty(item: dict[str, Any]) -> dict[str, Any]:
+    return {k: v for k, v in item.items() if v not in ("", None, [])}
+
+
+def compact_patient(resource: dict[str, Any]) -> dict[str, Any]:
+    r = fhir.patient(resource)
+    return _drop_empty({
+        "id": r.id, "name": r.name, "birthDate": r.birth_date, "gender": r.gender,
+    })
+
+
+def compact_conditions(bundle: dict[str, Any]) -> list[dict[str, Any]]:
+    return _dedupe([
+        _drop_empty({
+            "condition": r.condition,
+            "code": r.code,
+            "status": r.clinical_status,
+            "onset": r.onset,
+        })
+        for r in fhir.extract(bundle, fhir.condition)
+    ])
+
+
+def compact_medications(bundle: dict[str, Any]) -> list[dict[str, Any]]:
+    return _dedupe([
+        _drop_empty({
+            "medication": r.medication,
+            "status": r.status,
+            "dosage": r.dosage,
+            "authored": r.authored_on,
+        })
+        for r in fhir.extract(bundle, fhir.medication)
+    ])
+
+
+def compact_allergies(bundle: dict[str, Any]) -> list[dict[str, Any]]:
+    return _dedupe([
+        _drop_empty({
+            "substance": r.substance,
+            "criticality": r.criticality,
+            "reactions": [rx.manifestation for rx in r.reactions if rx.manifestation],
+            "severity": next((rx.severity for rx in r.reactions if rx.severity), ""),
+            "status": r.clinical_status,
+        })
+        for r in fhir.extract(bundle, fhir.allergy)
+    ])
+
+
+def compact_vitals(bundle: dict[str, Any]) -> list[dict[str, Any]]:
+    items = [
+        _drop_empty({"type": r.name, "value": r.value, "unit": r.unit, "date": r.date})
+        for r in fhir.extract(bundle, fhir.observation)
+    ]
+    # Newest first, so budget trimming drops the oldest readings.
+    items.sort(key=lambda v: str(v.get("date", "")), reverse=True)
+    return _dedupe(items)
+
+
+def _json_len(value: Any) -> int:
+    return len(json.dumps(value, separators=(",", ":"), default=str))
+
+
+def _note(omitted: dict[str, int]) -> str:
+    return (
+        "Summary shortened to fit the context budget: "
+        + ", ".join(
+            f"{count} more {name}"
+            + (f" (use {_DETAIL_TOOLS[name]})" if name in _DETAIL_TOOLS else "")
+            for name, count in omitted.items()
+        )
+        + "."
+    )
+
+
+def _note_len(omitted: dict[str, int]) -> int:
+    """Upper bound on the characters the omitted/note keys will add."""
+    padded = {name: omitted.get(name, 0) + 1000 for name in _TRIMMABLE}
+    return _json_len({"omitted": padded, "note": _note(padded)})
+
+
+_COMPACTORS = {
+    "conditions": compact_conditions,
+    "medications": compact_medications,
+    "allergies": compact_allergies,
+    "vitals": compact_vitals,
+}
+
+
+def compact_chart(
+    sections: dict[str, Any], token_budget: int = DEFAULT_TOKEN_BUDGET
+) -> dict[str, Any]:
+    """Compact chart sections ({name: FHIR resource/bundle or None}).
+
+    Failed sections stay None. A budget of 0 or less disables trimming.
+    When entries are trimmed, the result carries "omitted" ({section: count})
+    and a "note" for the model.
+    """
+    data: dict[str, Any] = {}
+    for name, raw in sections.items():
+        if raw is None:
+            data[name] = None
+        elif name == "patient":
+            data[name] = compact_patient(raw)
+        elif name in _COMPACTORS:
+            data[name] = _COMPACTORS[name](raw)
+        else:
+            data[name] = raw
+    if token_budget <= 0:
+        return data
+
+    size = _json_len(data)
+    if size <= token_budget * CHARS_PER_TOKEN:
+        return data
+
+    # Sizes are tracked in serialized characters (each list item costs its
+    # JSON plus a separating comma), so trimming needs no re-serializing.
+    costs = {
+        name: [_json_len(item) + 1 for item in items]
+        for name, items in data.items()
+        if name in _TRIMMABLE and isinstance(items, list)
+    }
+    omitted: dict[str, int] = {}
+    while True:
+        limit = token_budget * CHARS_PER_TOKEN - _note_len(omitted)
+        longest = max(costs, key=lambda n: len(costs[n]), default=None)
+        if size <= limit or longest is None or not costs[longest]:
+            break
+        size -= costs[longest].pop()
+        data[longest].pop()
+        omitted[longest] = omitted.get(longest, 0) + 1
+    if omitted:
+        data["omitted"] = omitted
+        data["note"] = _note(omitted)
+    return data
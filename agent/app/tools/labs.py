@@ -5,6 +5,7 @@ from typing import Any
 from langchain_core.tools import tool
 
 from app.clients.openemr import OpenEMRClient
+from app.fhir import extract, observation
 from app.tools.base import tool_error_handler
 
 _client: OpenEMRClient | None = None
@@ -21,27 +22,48 @@ def _get_client() -> OpenEMRClient:
     return _client
 
 
+# Fields read below — requested via _elements to keep payloads small.
+_LAB_ELEMENTS = ["code", "valueQuantity", "valueString", "effectiveDateTime", "status"]
+
+
 @tool
 @tool_error_handler
-async def get_lab_results(patient_uuid: str) -> dict[str, Any]:
-    """Get laboratory results (Observation resources) for a patient from OpenEMR.
+async def get_lab_results(
+    patient_uuid: str,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    loinc_codes: list[str] | None = None,
+    max_results: int = 50,
+) -> dict[str, Any]:
+    """Get laboratory results (Observation resources) for a patient from OpenEMR,
+    most recent first.
 
     Args:
         patient_uuid: The UUID of the patient in OpenEMR.
+        date_from: Only results on or after this date (YYYY-MM-DD).
+        date_to: Only results on or before this date (YYYY-MM-DD).
+        loinc_codes: Only these tests, by LOINC code (e.g. ["4548-4"] for HbA1c).
+        max_results: Maximum number of results to return (default 50).
     """
     client = _get_client()
-    results = await client.get_observations(patient_uuid, category="laboratory")
-    entries = results.get("entry", [])
-    labs = []
-    for entry in entries:
-        resource = entry.get("resource", {})
-        code_obj = resource.get("code", {})
-        value_quantity = resource.get("valueQuantity", {})
-        labs.append({
-            "test": code_obj.get("text", code_obj.get("coding", [{}])[0].get("display", "")),
-            "value": value_quantity.get("value", resource.get("valueString", "")),
-            "unit": value_quantity.get("unit", ""),
-            "date": resource.get("effectiveDateTime", ""),
-            "status": resource.get("status", ""),
-        })
+    results = await client.get_observations(
+        patient_uuid,
+        category="laboratory",
+        date_from=date_from,
+        date_to=date_to,
+        codes=loinc_codes,
+        sort="-date",
+        count=max_results,
+        elements=_LAB_ELEMENTS,
+    )
+    labs = [
+        {
+            "test": r.name,
+            "value": r.value,
+            "unit": r.unit,
+            "date": r.date,
+            "status": r.status,
+        }
+        for r in extract(results, observation)
+    ]
     return {"status": "success", "data": {"lab_results": labs}}
@@ -6,6 +6,7 @@ from langchain_core.tools import tool
 
 from app.clients.openemr import OpenEMRClient
 from app.clients.openfda import DrugInteractionClient
+from app.fhir import extract, medication_fields
 from app.tools.base import tool_error_handler
 
 _openemr_client: OpenEMRClient | None = None
@@ -42,16 +43,7 @@ async def get_medications(patient_uuid: str) -> dict[str, Any]:
     """
     client = _get_openemr()
     results = await client.get_medications(patient_uuid)
-    entries = results.get("entry", [])
-    medications = []
-    for entry in entries:
-        resource = entry.get("resource", {})
-        med_ref = resource.get("medicationCodeableConcept", {})
-        medications.append({
-            "medication": med_ref.get("text", med_ref.get("coding", [{}])[0].get("display", "")),
-            "status": resource.get("status", ""),
-            "intent": resource.get("intent", ""),
-        })
+    medications = extract(results, medication_fields)
     return {"status": "success", "data": {"medications": medications}}
 
 
@@ -1,18 +1,26 @@
 """Patient-related LangChain tools."""
 
+import logging
 from typing import Any
 
 from langchain_core.tools import tool
 
-from app.clients.openemr import OpenEMRClient
+from app.clients.openemr import CHART_SECTIONS, OpenEMRClient
+from app.fhir import extract, patient
 from app.tools.base import tool_error_handler
+from app.tools.compaction import DEFAULT_TOKEN_BUDGET, compact_chart, estimate_tokens
+
+logger = logging.getLogger(__name__)
 
 _client: OpenEMRClient | None = None
+_token_budget = DEFAULT_TOKEN_BUDGET
 
 
-def set_client(client: OpenEMRClient) -> None:
-    global _client
+def set_client(client: OpenEMRClient, token_budget: int | None = None) -> None:
+    global _client, _token_budget
     _client = client
+    if token_budget is not None:
+        _token_budget = token_budget
 
 
 def _get_client() -> OpenEMRClient:
@@ -31,22 +39,28 @@ async def get_patient_summary(patient_uuid: str) -> dict[str, Any]:
         patient_uuid: The UUID of the patient in OpenEMR.
     """
     client = _get_client()
-    patient = await client.get_patient(patient_uuid)
-    conditions = await client.get_conditions(patient_uuid)
-    medications = await client.get_medications(patient_uuid)
-    allergies = await client.get_allergies(patient_uuid)
-    vitals = await client.get_vitals(patient_uuid)
-
-    return {
-        "status": "success",
-        "data": {
-            "patient": patient,
-            "conditions": conditions,
-            "medications": medications,
-            "allergies": allergies,
-            "vitals": vitals,
-        },
-    }
+    chart = await client.get_chart(patient_uuid)
+    errors: dict[str, str] = chart["errors"]
+    if errors and not chart["sections"]:
+        return {
+            "status": "error",
+            "error": "Tool 'get_patient_summary' failed: "
+            + "; ".join(f"{name}: {err}" for name, err in errors.items()),
+        }
+
+    # Sections that failed are returned as None alongside their error so the
+    # LLM can still answer from the rest of the chart.
+    sections = {name: chart["sections"].get(name) for name in CHART_SECTIONS}
+    data = compact_chart(sections, _token_budget)
+    logger.info(
+        "get_patient_summary compacted ~%d -> ~%d tokens",
+        estimate_tokens(sections),
+        estimate_tokens(data),
+    )
+    if errors:
+        data["partial"] = True
+        data["section_errors"] = errors
+    return {"status": "success", "data": data}
 
 
 @tool
@@ -59,20 +73,8 @@ async def search_patients(name: str) -> dict[str, Any]:
     """
     client = _get_client()
     results = await client.search_patients(name=name)
-    entries = results.get("entry", [])
-    patients = []
-    for entry in entries:
-        resource = entry.get("resource", {})
-        names = resource.get("name", [{}])
-        display_name = ""
-        if names:
-            given = " ".join(names[0].get("given", []))
-            family = names[0].get("family", "")
-            display_name = f"{given} {family}".strip()
-        patients.append({
-            "uuid": resource.get("id", ""),
-            "name": display_name,
-            "birthDate": resource.get("birthDate", ""),
-            "gender": resource.get("gender", ""),
-        })
+    patients = [
+        {"uuid": r.id, "name": r.name, "birthDate": r.birth_date, "gender": r.gender}
+        for r in extract(results, patient)
+    ]
     return {"status": "success", "data": {"patients": patients, "total": len(patients)}}
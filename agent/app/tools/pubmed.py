@@ -1,12 +1,17 @@
 """PubMed search LangChain tool."""
 
+import logging
 from typing import Any
 
+import httpx
 from langchain_core.tools import tool
 
 from app.clients.pubmed_client import PubMedClient
+from app.clients.upstream_guard import UpstreamUnavailableError
 from app.tools.base import tool_error_handler
 
+logger = logging.getLogger(__name__)
+
 _client: PubMedClient | None = None
 
 
@@ -23,13 +28,36 @@ def _get_client() -> PubMedClient:
 
 @tool
 @tool_error_handler
-async def pubmed_search(query: str, max_results: int = 5) -> dict[str, Any]:
+async def pubmed_search(
+    query: str, max_results: int = 5, include_abstracts: bool = False
+) -> dict[str, Any]:
     """Search PubMed for medical literature relevant to a clinical question.
 
     Args:
         query: A medical/clinical search query (e.g. "aspirin cardiovascular prevention").
         max_results: Maximum number of articles to return (default 5).
+        include_abstracts: Also return each article's abstract (shortened if
+            long). Use when titles alone are not enough to answer the question.
+            When PubMed is unreachable, abstracts come from the offline
+            literature index if one is loaded; otherwise the articles are
+            returned without them.
     """
     client = _get_client()
     results = await client.search(query, max_results=max_results)
-    return {"status": "success", "data": {"articles": results}}
+    data: dict[str, Any] = {"articles": results}
+    if include_abstracts and results:
+        abstracts: dict[str, dict[str, Any]] = {}
+        try:
+            async for a in client.iter_abstracts([r["pmid"] for r in results]):
+                abstracts[a["pmid"]] = a
+        except (httpx.HTTPError, UpstreamUnavailableError) as e:
+            # The search already succeeded (possibly from the local index);
+            # keep its results and whatever abstracts arrived.
+            logger.warning("PubMed abstracts unavailable: %s", e)
+            data["note"] = "Abstracts could not be retrieved; titles only where missing."
+        for article in results:
+            found = abstracts.get(article["pmid"])
+            if found is not None:
+                article["abstract"] = found["abstract"]
+                article["abstract_truncated"] = found["truncated"]
+    return {"status": "success", "data": data}
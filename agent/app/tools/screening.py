@@ -0,0 +1,41 @@
+"""Panel interaction screening results LangChain tool."""
+
+from typing import Any
+
+from langchain_core.tools import tool
+
+from app.persistence.screening import ScreeningStore
+from app.tools.base import tool_error_handler
+
+_store: ScreeningStore | None = None
+
+
+def set_store(store: ScreeningStore) -> None:
+    global _store
+    _store = store
+
+
+def _get_store() -> ScreeningStore:
+    if _store is None:
+        raise RuntimeError("Screening store not initialized")
+    return _store
+
+
+@tool
+@tool_error_handler
+async def get_interaction_screening(patient_uuid: str) -> dict[str, Any]:
+    """Get the latest overnight drug-interaction screening result for a patient.
+
+    The screening job checks every active patient's medication list in batch.
+    Results may be up to a day old; run drug_interaction_check for a live check.
+
+    Args:
+        patient_uuid: The UUID of the patient in OpenEMR.
+    """
+    result = await _get_store().get_latest(patient_uuid)
+    if result is None:
+        return {
+            "status": "success",
+            "data": {"screened": False, "note": "Patient has not been screened yet."},
+        }
+    return {"status": "success", "data": {"screened": True, **result}}
@@ -5,6 +5,7 @@ from typing import Any
 from langchain_core.tools import tool
 
 from app.clients.openemr import OpenEMRClient
+from app.fhir import extract, observation
 from app.tools.base import tool_error_handler
 
 _client: OpenEMRClient | None = None
@@ -21,27 +22,41 @@ def _get_client() -> OpenEMRClient:
     return _client
 
 
+# Only the fields parsed below are requested (_elements).
+_VITAL_ELEMENTS = ["code", "valueQuantity", "valueString", "effectiveDateTime"]
+
+
 @tool
 @tool_error_handler
-async def get_vitals(patient_uuid: str) -> dict[str, Any]:
+async def get_vitals(
+    patient_uuid: str,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    loinc_codes: list[str] | None = None,
+    max_results: int = 25,
+) -> dict[str, Any]:
     """Get the most recent vital signs for a patient including blood pressure,
     heart rate, temperature, weight, and BMI.
 
     Args:
         patient_uuid: The UUID of the patient in OpenEMR.
+        date_from: Only vitals on or after this date (YYYY-MM-DD).
+        date_to: Only vitals on or before this date (YYYY-MM-DD).
+        loinc_codes: Only these vitals, by LOINC code (e.g. ["8867-4"] for heart rate).
+        max_results: Maximum number of readings to return (default 25).
     """
     client = _get_client()
-    results = await client.get_vitals(patient_uuid)
-    entries = results.get("entry", [])
-    vitals = []
-    for entry in entries:
-        resource = entry.get("resource", {})
-        code_obj = resource.get("code", {})
-        value_quantity = resource.get("valueQuantity", {})
-        vitals.append({
-            "type": code_obj.get("text", code_obj.get("coding", [{}])[0].get("display", "")),
-            "value": value_quantity.get("value", resource.get("valueString", "")),
-            "unit": value_quantity.get("unit", ""),
-            "date": resource.get("effectiveDateTime", ""),
-        })
+    results = await client.get_vitals(
+        patient_uuid,
+        date_from=date_from,
+        date_to=date_to,
+        codes=loinc_codes,
+        sort="-date",
+        count=max_results,
+        elements=_VITAL_ELEMENTS,
+    )
+    vitals = [
+        {"type": r.name, "value": r.value, "unit": r.unit, "date": r.date}
+        for r in extract(results, observation)
+    ]
     return {"status": "success", "data": {"vitals": vitals, "total": len(vitals)}}
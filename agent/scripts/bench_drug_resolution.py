@@ -0,0 +1,92 @@
+"""Benchmark check_interactions_by_names(): serial vs concurrent drug resolution.
+
+Usage:
+    python scripts/bench_drug_resolution.py [--rtt-ms 60] [--concurrency 8]
+
+Runs DrugInteractionClient against an in-process RxNav stand-in (an httpx
+MockTransport) that adds a fixed round trip per request. Half the drugs
+resolve by exact match (2 calls), the rest by approximate match with five
+candidates (7 calls). max_concurrency=1 reproduces the old serial loop.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from app.clients.openfda import DrugInteractionClient
+
+
+def make_standin(rtt_ms: float) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(rtt_ms / 1000)
+        path = request.url.path
+        params = request.url.params
+        if path.endswith("/rxcui.json"):
+            name = params["name"]
+            ids = [f"rx-{name}"] if name.startswith("exact") else []
+            return httpx.Response(200, json={"idGroup": {"rxnormId": ids}})
+        if path.endswith("/approximateTerm.json"):
+            term = params["term"]
+            candidates = [
+                {"rxcui": f"{term}-{i}", "name": term, "score": "90"} for i in range(5)
+            ]
+            return httpx.Response(200, json={"approximateGroup": {"candidate": candidates}})
+        if path.endswith("/related.json"):
+            rxcui = path.split("/")[-2].split("-")[1]
+            props = [{"rxcui": f"in-{rxcui}", "name": rxcui}]
+            return httpx.Response(
+                200, json={"relatedGroup": {"conceptGroup": [{"conceptProperties": props}]}}
+            )
+        if path.endswith("/list.json"):
+            return httpx.Response(200, json={"fullInteractionTypeGroup": []})
+        return httpx.Response(404)
+
+    return httpx.MockTransport(handler)
+
+
+def _drug_list(n: int) -> list[str]:
+    return [f"{'exact' if i % 2 == 0 else 'approx'}{i}" for i in range(n)]
+
+
+async def run(n: int, concurrency: int, args: argparse.Namespace) -> list[float]:
+    client = DrugInteractionClient(max_concurrency=concurrency)
+    client.http = httpx.AsyncClient(transport=make_standin(args.rtt_ms))
+    samples = []
+    try:
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            result = await client.check_interactions_by_names(_drug_list(n))
+            samples.append((time.perf_counter() - start) * 1000)
+            assert result["check_complete"], result["unresolved"]
+    finally:
+        await client.close()
+    return samples
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rtt-ms", type=float, default=60.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 5, 10, 20])
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"RxNav stand-in: rtt={args.rtt_ms}ms per request")
+    print(f"{'drugs':>5}  {'serial':>10}  {'concurrent':>10}  {'speedup':>7}")
+    for n in args.sizes:
+        serial = statistics.median(await run(n, 1, args))
+        concurrent = statistics.median(await run(n, args.concurrency, args))
+        print(
+            f"{n:>5}  {serial:>8.0f}ms  {concurrent:>8.0f}ms  {serial / concurrent:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
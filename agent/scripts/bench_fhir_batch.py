@@ -0,0 +1,125 @@
+"""Benchmark get_chart(): one FHIR batch Bundle vs concurrent single GETs.
+
+Usage:
+    python scripts/bench_fhir_batch.py [--rtt-ms 40] [--server-ms 15] [--workers 4]
+
+Runs OpenEMRClient against an in-process stand-in FHIR server (an httpx
+MockTransport) that adds a fixed network round trip per request, a fixed
+per-resource processing cost, and a limited worker pool like PHP-FPM. The
+response cache is disabled so every iteration goes to the "server".
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from app.clients.openemr import OpenEMRClient
+from app.config import Settings
+
+FHIR_URL = "http://standin/apis/default/fhir"
+
+
+def _bundle(resource_type: str, n: int) -> dict:
+    return {
+        "resourceType": "Bundle",
+        "type": "searchset",
+        "total": n,
+        "entry": [
+            {"resource": {"resourceType": resource_type, "id": f"{resource_type}-{i}"}}
+            for i in range(n)
+        ],
+    }
+
+
+def _read(path: str) -> dict:
+    if path.startswith("Patient/"):
+        return {"resourceType": "Patient", "id": path.split("/", 1)[1]}
+    return _bundle(path.split("?", 1)[0], 10)
+
+
+def make_standin(rtt_ms: float, server_ms: float, workers: int) -> httpx.MockTransport:
+    pool = asyncio.Semaphore(workers)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(rtt_ms / 1000)
+        path = request.url.path.split("/fhir", 1)[-1].lstrip("/")
+        async with pool:
+            if request.method == "POST" and not path:
+                batch = json.loads(request.content)
+                entries = []
+                for entry in batch["entry"]:
+                    await asyncio.sleep(server_ms / 1000)
+                    entries.append({
+                        "response": {"status": "200 OK"},
+                        "resource": _read(entry["request"]["url"]),
+                    })
+                return httpx.Response(
+                    200,
+                    json={"resourceType": "Bundle", "type": "batch-response", "entry": entries},
+                )
+            await asyncio.sleep(server_ms / 1000)
+            return httpx.Response(200, json=_read(path))
+
+    return httpx.MockTransport(handler)
+
+
+async def run(batch: bool, args: argparse.Namespace) -> list[float]:
+    settings = Settings(
+        openemr_fhir_url=FHIR_URL,
+        openemr_fhir_batch=batch,
+        openemr_max_concurrency=args.concurrency,
+    )
+    client = OpenEMRClient(settings)
+    client.cache = None
+    client._access_token = "bench-token"
+    client.http = httpx.AsyncClient(
+        transport=make_standin(args.rtt_ms, args.server_ms, args.workers)
+    )
+    samples = []
+    try:
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            chart = await client.get_chart("bench-patient")
+            samples.append((time.perf_counter() - start) * 1000)
+            assert not chart["errors"], chart["errors"]
+    finally:
+        await client.close()
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(
+        f"{label:<28} p50={statistics.median(samples):7.1f} ms  "
+        f"p95={p95:7.1f} ms  mean={statistics.mean(samples):7.1f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rtt-ms", type=float, default=40.0)
+    parser.add_argument("--server-ms", type=float, default=15.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=40)
+    args = parser.parse_args()
+
+    print(
+        f"Stand-in: rtt={args.rtt_ms}ms, server={args.server_ms}ms/resource, "
+        f"workers={args.workers}; 5 chart sections"
+    )
+    _report("concurrent single GETs", await run(False, args))
+    _report("batch Bundle", await run(True, args))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
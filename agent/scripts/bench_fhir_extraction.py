@@ -0,0 +1,288 @@
+"""Benchmark per-entry FHIR extraction cost on large search Bundles.
+
+Usage:
+    python scripts/bench_fhir_extraction.py [--entries 10000] [--repeats 7]
+
+Builds OpenEMR-shaped Bundles (meta, text.div narrative, coding arrays with
+data-absent-reason entries where OpenEMR emits them) of each resource type
+and times two ways of turning every entry into the tools' output fields:
+
+- dict walk: the chained .get() walk each tool used to do inline, building
+  a fresh dict per entry (re.sub on text.div for every allergy)
+- app.fhir: the shared extractors producing __slots__ records, or for
+  "MedicationReq fields" the dicts get_medications returns, which it
+  builds with medication_fields() instead of going through the record
+
+Reports per-entry µs (median over repeats) and the retained size of the
+extracted results per entry, measured with tracemalloc.
+"""
+
+import argparse
+import gc
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import fhir
+
+_META = {"versionId": "1", "lastUpdated": "2026-01-15T10:00:00+00:00"}
+_ABSENT = {
+    "system": "http://terminology.hl7.org/CodeSystem/data-absent-reason",
+    "code": "unknown",
+    "display": "Unknown",
+}
+
+
+def _coded(code: str, display: str, text: bool = True) -> dict:
+    concept: dict = {"coding": [{"system": "http://loinc.org", "code": code, "display": display}]}
+    if text:
+        concept["text"] = display
+    return concept
+
+
+def _observation(i: int) -> dict:
+    return {
+        "code": _coded(f"{1000 + i % 50}-{i % 10}", f"Test {i % 50}", text=i % 3 != 0),
+        "valueQuantity": {"value": 5.0 + i % 40, "unit": "mg/dL",
+                          "system": "http://unitsofmeasure.org", "code": "mg/dL"},
+        "effectiveDateTime": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+        "status": "final",
+    }
+
+
+def _allergy(i: int) -> dict:
+    coded = i % 2 == 0
+    return {
+        "code": _coded(str(90000 + i), f"Allergen {i}") if coded else {"coding": [_ABSENT]},
+        "type": "allergy",
+        "criticality": "high" if i % 4 == 0 else "low",
+        "onsetDateTime": "2020-05-01",
+        "clinicalStatus": {"coding": [{"system": "http://hl7.org/fhir", "code": "active"}]},
+        "reaction": [{"manifestation": [_coded("271807003", "Rash", text=False)],
+                      "severity": "moderate"}],
+    }
+
+
+def _medication(i: int) -> dict:
+    return {
+        "medicationCodeableConcept": _coded(str(200000 + i), f"Drug {i % 300} 10 MG",
+                                            text=i % 2 == 0),
+        "status": "active",
+        "intent": "order",
+        "dosageInstruction": [{"text": "1 tab daily"}],
+        "authoredOn": "2025-12-01",
+    }
+
+
+def _appointment(i: int) -> dict:
+    return {
+        "start": f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}T09:30:00",
+        "status": "booked",
+        "reasonCode": [{"text": "Follow-up"}],
+        "participant": [
+            {"actor": {"reference": f"Patient/{i}", "display": "John Doe"}},
+            {"actor": {"reference": "Practitioner/7", "display": "Dr. Smith"}},
+        ],
+    }
+
+
+def _patient(i: int) -> dict:
+    return {
+        "id": f"{i:08x}-0000-4000-8000-000000000000",
+        "name": [{"use": "official", "given": ["John", "Q"], "family": f"Doe{i}"}],
+        "birthDate": "1960-01-01",
+        "gender": "male",
+    }
+
+
+def _bundle(resource_type: str, make, n: int) -> dict:
+    return {
+        "resourceType": "Bundle",
+        "type": "searchset",
+        "entry": [
+            {
+                "fullUrl": f"http://openemr/fhir/{resource_type}/{i}",
+                "resource": {
+                    "resourceType": resource_type,
+                    "id": f"{i:08x}",
+                    "meta": _META,
+                    "text": {"status": "generated", "div": f"<div>{resource_type} {i}</div>"},
+                    **make(i),
+                },
+            }
+            for i in range(n)
+        ],
+    }
+
+
+# The per-tool dict walks app.fhir replaced, kept here as the baseline.
+
+def _walk_observations(bundle: dict) -> list[dict]:
+    out = []
+    for entry in bundle.get("entry", []):
+        resource = entry.get("resource", {})
+        code_obj = resource.get("code", {})
+        value_quantity = resource.get("valueQuantity", {})
+        out.append({
+            "test": code_obj.get("text", code_obj.get("coding", [{}])[0].get("display", "")),
+            "value": value_quantity.get("value", resource.get("valueString", "")),
+            "unit": value_quantity.get("unit", ""),
+            "date": resource.get("effectiveDateTime", ""),
+            "status": resource.get("status", ""),
+        })
+    return out
+
+
+def _walk_allergies(bundle: dict) -> list[dict]:
+    out = []
+    for entry in bundle.get("entry", []):
+        resource = entry.get("resource", {})
+        code_obj = resource.get("code", {})
+        substance = code_obj.get("text", "")
+        if not substance:
+            text_div = resource.get("text", {}).get("div", "")
+            if text_div:
+                substance = re.sub(r"<[^>]+>", "", text_div).strip()
+        if not substance:
+            substance = "Not specified"
+        reactions = []
+        for reaction in resource.get("reaction", []):
+            manifestations = reaction.get("manifestation", [])
+            text = ""
+            if manifestations:
+                text = manifestations[0].get("text", "")
+                if not text:
+                    for coding in manifestations[0].get("coding", []):
+                        text = coding.get("display", "") or coding.get("code", "")
+                        if text:
+                            break
+            reactions.append({"manifestation": text, "severity": reaction.get("severity", "")})
+        out.append({
+            "substance": substance,
+            "type": resource.get("type", ""),
+            "criticality": resource.get("criticality", ""),
+            "reactions": reactions,
+            "onset": resource.get("onsetDateTime", ""),
+            "clinical_status": resource.get("clinicalStatus", {})
+            .get("coding", [{}])[0].get("code", ""),
+        })
+    return out
+
+
+def _walk_medications(bundle: dict) -> list[dict]:
+    out = []
+    for entry in bundle.get("entry", []):
+        resource = entry.get("resource", {})
+        med_ref = resource.get("medicationCodeableConcept", {})
+        out.append({
+            "medication": med_ref.get("text", med_ref.get("coding", [{}])[0].get("display", "")),
+            "status": resource.get("status", ""),
+            "intent": resource.get("intent", ""),
+        })
+    return out
+
+
+def _walk_appointments(bundle: dict) -> list[dict]:
+    out = []
+    for entry in bundle.get("entry", []):
+        resource = entry.get("resource", {})
+        provider = ""
+        for participant in resource.get("participant", []):
+            actor = participant.get("actor", {})
+            if actor.get("reference", "").startswith("Practitioner"):
+                provider = actor.get("display", "")
+                break
+        out.append({
+            "date": resource.get("start", "").split("T")[0] if resource.get("start") else "",
+            "time": resource.get("start", "").split("T")[1]
+            if "T" in resource.get("start", "") else "",
+            "provider": provider,
+            "reason": resource.get("reasonCode", [{}])[0].get("text", "")
+            if resource.get("reasonCode") else "",
+            "status": resource.get("status", ""),
+        })
+    return out
+
+
+def _walk_patients(bundle: dict) -> list[dict]:
+    out = []
+    for entry in bundle.get("entry", []):
+        resource = entry.get("resource", {})
+        names = resource.get("name", [{}])
+        display_name = ""
+        if names:
+            given = " ".join(names[0].get("given", []))
+            display_name = f"{given} {names[0].get('family', '')}".strip()
+        out.append({
+            "uuid": resource.get("id", ""),
+            "name": display_name,
+            "birthDate": resource.get("birthDate", ""),
+            "gender": resource.get("gender", ""),
+        })
+    return out
+
+
+CASES = [
+    ("Observation", "Observation", _observation, _walk_observations, fhir.observation),
+    ("AllergyIntolerance", "AllergyIntolerance", _allergy, _walk_allergies, fhir.allergy),
+    ("MedicationRequest", "MedicationRequest", _medication, _walk_medications,
+     fhir.medication),
+    ("MedicationReq fields", "MedicationRequest", _medication, _walk_medications,
+     fhir.medication_fields),
+    ("Appointment", "Appointment", _appointment, _walk_appointments, fhir.appointment),
+    ("Patient", "Patient", _patient, _walk_patients, fhir.patient),
+]
+
+
+def _per_entry_us(fn, n: int, repeats: int) -> float:
+    # Collector off while timing, as timeit does: a cycle collection
+    # triggered by the result allocations would land in a random run.
+    times = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return statistics.median(times) / n * 1e6
+
+
+def _retained_bytes(fn, n: int) -> float:
+    tracemalloc.start()
+    result = fn()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size / n
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=7)
+    args = parser.parse_args()
+    n = args.entries
+
+    print(f"{n} entries per bundle, median of {args.repeats} runs")
+    print(f"{'resource':<20}{'dict walk µs':>14}{'app.fhir µs':>13}{'speedup':>9}"
+          f"{'dict B':>9}{'record B':>10}")
+    for label, resource_type, make, walk, extractor in CASES:
+        bundle = _bundle(resource_type, make, n)
+        legacy = _per_entry_us(lambda: walk(bundle), n, args.repeats)
+        shared = _per_entry_us(lambda: fhir.extract(bundle, extractor), n, args.repeats)
+        legacy_b = _retained_bytes(lambda: walk(bundle), n)
+        shared_b = _retained_bytes(lambda: fhir.extract(bundle, extractor), n)
+        print(f"{label:<20}{legacy:>14.2f}{shared:>13.2f}{legacy / shared:>8.2f}x"
+              f"{legacy_b:>9.0f}{shared_b:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Benchmark resolve_drug_name(): sequential vs hedged RxNav tiers.
+
+Usage:
+    python scripts/bench_hedged_resolution.py [--rtt-ms 40] [--slow-ms 400]
+        [--slow-rate 0.1] [--hedge-ms 50] [--lookups 200]
+
+Runs DrugInteractionClient against an in-process RxNav stand-in (an httpx
+MockTransport) where each request takes rtt-ms, or slow-ms for a slow-rate
+fraction of requests. Names are a mix of exact (tier 1), approximate-only
+(tier 2), brand-only (tier 3) and unknown (tier 4) drugs. Each lookup is a
+fresh name, so every resolution goes to the network. Reports per-lookup
+p50/p95 latency and RxNav requests per lookup for both modes.
+
+Hedging only helps names that fall through to the approximate or brand
+tier, so check the per-tier rows: with ~40% exact hits the "all" p95 is
+dominated by slow exact calls and may not move. The extra RxNav load is
+the price of hedging and is reported on the last line.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from app.clients.openfda import DrugInteractionClient
+
+# Share of lookups resolved by each tier (1, 2, 3, unresolved).
+MIX = (("exact", 0.4), ("approx", 0.3), ("brand", 0.2), ("unknown", 0.1))
+
+
+class StandIn:
+    def __init__(self, args: argparse.Namespace, seed: int) -> None:
+        self.args = args
+        self.rng = random.Random(seed)
+        self.requests = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        slow = self.rng.random() < self.args.slow_rate
+        await asyncio.sleep((self.args.slow_ms if slow else self.args.rtt_ms) / 1000)
+        path = request.url.path
+        params = request.url.params
+        if path.endswith("/rxcui.json"):
+            name = params["name"]
+            ids = [f"1{len(name)}"] if name.startswith("exact") else []
+            return httpx.Response(200, json={"idGroup": {"rxnormId": ids}})
+        if path.endswith("/approximateTerm.json"):
+            term = params["term"]
+            candidates = (
+                [{"rxcui": f"2{i}", "name": term, "score": "80"} for i in range(2)]
+                if term.startswith("approx")
+                else []
+            )
+            return httpx.Response(200, json={"approximateGroup": {"candidate": candidates}})
+        if path.endswith("/drugs.json"):
+            name = params["name"]
+            props = [{"rxcui": "3", "name": name}] if name.startswith("brand") else []
+            return httpx.Response(
+                200, json={"drugGroup": {"conceptGroup": [{"conceptProperties": props}]}}
+            )
+        if path.endswith("/related.json"):
+            props = [{"rxcui": "9", "name": "ingredient"}]
+            return httpx.Response(
+                200, json={"relatedGroup": {"conceptGroup": [{"conceptProperties": props}]}}
+            )
+        return httpx.Response(404)
+
+
+def _names(n: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    kinds = [k for k, _ in MIX]
+    weights = [w for _, w in MIX]
+    return [f"{rng.choices(kinds, weights)[0]}{i}" for i in range(n)]
+
+
+async def run(
+    hedge_delay: float | None, args: argparse.Namespace
+) -> tuple[dict[str, list[float]], float]:
+    standin = StandIn(args, seed=1)
+    client = DrugInteractionClient(hedge_delay=hedge_delay)
+    client.http = httpx.AsyncClient(transport=httpx.MockTransport(standin.handler))
+    samples: dict[str, list[float]] = {"all": []}
+    try:
+        for name in _names(args.lookups, seed=2):
+            start = time.perf_counter()
+            await client.resolve_drug_name(name)
+            elapsed = (time.perf_counter() - start) * 1000
+            samples["all"].append(elapsed)
+            samples.setdefault(name.rstrip("0123456789"), []).append(elapsed)
+    finally:
+        await client.close()
+    return samples, standin.requests / args.lookups
+
+
+def _pct(samples: list[float], q: int) -> float:
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rtt-ms", type=float, default=40.0)
+    parser.add_argument("--slow-ms", type=float, default=400.0)
+    parser.add_argument("--slow-rate", type=float, default=0.1)
+    parser.add_argument("--hedge-ms", type=float, default=50.0)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    print(
+        f"RxNav stand-in: rtt={args.rtt_ms}ms, {args.slow_rate:.0%} of requests "
+        f"take {args.slow_ms}ms; hedge delay {args.hedge_ms}ms"
+    )
+    sequential, seq_requests = await run(None, args)
+    hedged, hedged_requests = await run(args.hedge_ms / 1000, args)
+    print(f"{'lookups':<8}  {'sequential p50/p95':>20}  {'hedged p50/p95':>20}")
+    for kind in ["all"] + [k for k, _ in MIX]:
+        print(
+            f"{kind:<8}  {_pct(sequential[kind], 50):>9.0f} /{_pct(sequential[kind], 95):>5.0f}ms"
+            f"  {_pct(hedged[kind], 50):>9.0f} /{_pct(hedged[kind], 95):>5.0f}ms"
+        )
+    print(f"RxNav requests per lookup: {seq_requests:.2f} sequential, "
+          f"{hedged_requests:.2f} hedged ({hedged_requests / seq_requests - 1:+.0%})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,130 @@
+"""Benchmark the offline ICD-10-CM index: build time, memory and query latency.
+
+Usage:
+    python scripts/bench_icd10_index.py [--file icd10cm_order_2025.txt] [--queries 2000]
+
+Without --file, a synthetic code set the size of ICD-10-CM (~74k codes,
+~12k-word Zipf-distributed vocabulary) is generated. Memory is the traced
+Python allocation held by the index after building (tracemalloc).
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.clients.icd10_index import ICD10Index, read_cms_file, tokenize
+
+_WORDS = (
+    "acute chronic type diabetes mellitus with without complications hyperglycemia "
+    "hypertension essential primary secondary heart failure kidney disease stage "
+    "fracture closed open displaced nondisplaced initial subsequent encounter sequela "
+    "left right bilateral unspecified upper lower limb femur tibia radius humerus "
+    "infection bacterial viral pneumonia bronchitis asthma obstructive pulmonary "
+    "neoplasm malignant benign breast lung colon skin melanoma carcinoma lymphoma "
+    "injury poisoning accidental intentional adverse effect underdosing drug other "
+    "specified disorder syndrome deficiency anemia iron vitamin thyroid obesity "
+    "pregnancy trimester first second third delivery fetal maternal care newborn "
+    "depressive episode major recurrent moderate severe mild anxiety bipolar "
+    "retinopathy nephropathy neuropathy ulcer foot ankle knee hip shoulder joint "
+    "pain abdominal chest back headache migraine dementia alzheimer parkinson "
+    "sepsis shock respiratory arrest cardiac atrial fibrillation flutter angina "
+    "myocardial infarction stroke cerebral hemorrhage embolism thrombosis vein"
+).split()
+
+
+def _vocabulary(rng: random.Random, size: int) -> list[str]:
+    """Clinical words first (most frequent), then pseudo-words up to size."""
+    words = list(dict.fromkeys(_WORDS))
+    seen = set(words)
+    while len(words) < size:
+        word = "".join(
+            rng.choice("bcdfglmnprstv") + rng.choice("aeiou")
+            for _ in range(rng.randint(2, 5))
+        )
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def synthetic_entries(n: int, seed: int = 7) -> list[tuple[str, str]]:
+    """ICD-10-CM-sized code set: ~12k distinct words, Zipf frequencies."""
+    rng = random.Random(seed)
+    vocabulary = _vocabulary(rng, 12_000)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    codes: set[str] = set()
+    entries = []
+    alnum = "0123456789ABXYZ"
+    while len(entries) < n:
+        code = (
+            rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+            + f"{rng.randrange(100):02d}"
+            + "".join(rng.choice(alnum) for _ in range(rng.randrange(0, 5)))
+        )
+        if code in codes:
+            continue
+        codes.add(code)
+        words = rng.choices(vocabulary, weights, k=rng.randint(3, 14))
+        entries.append((code, " ".join(words).capitalize()))
+    return entries
+
+
+def _time_queries(index: ICD10Index, queries: list[str]) -> list[float]:
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        index.search(q)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", help="CMS icd10cm order or codes file")
+    parser.add_argument("--codes", type=int, default=74_000, help="Synthetic code count")
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    entries = read_cms_file(args.file) if args.file else synthetic_entries(args.codes)
+    start = time.perf_counter()
+    ICD10Index(entries)
+    build_s = time.perf_counter() - start
+    tracemalloc.start()
+    index = ICD10Index(entries)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"Built index over {len(index)} codes in {build_s:.2f}s, "
+        f"{held / 1024 / 1024:.1f} MB: {index.stats()}"
+    )
+
+    rng = random.Random(3)
+    codes = [code for code, _ in entries]
+    prefix_queries = [
+        (c := rng.choice(codes))[: rng.randint(1, len(c))] for _ in range(args.queries)
+    ]
+    keyword_queries = []
+    for _ in range(args.queries):
+        tokens = tokenize(rng.choice(entries)[1]) or ["pain"]
+        words = rng.sample(tokens, min(len(tokens), rng.randint(1, 3)))
+        if rng.random() < 0.3:
+            words[-1] = words[-1][: max(3, len(words[-1]) - 3)]
+        keyword_queries.append(" ".join(words))
+
+    for label, queries in (("code prefix", prefix_queries), ("keyword", keyword_queries)):
+        samples = _time_queries(index, queries)
+        q = statistics.quantiles(samples, n=100)
+        print(
+            f"{label:<12} p50={q[49]:7.1f} us  p95={q[94]:7.1f} us  "
+            f"{len(samples) / (sum(samples) / 1e6):9.0f} queries/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
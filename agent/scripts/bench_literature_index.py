@@ -0,0 +1,120 @@
+"""Benchmark the offline literature index: indexing throughput, size, query latency.
+
+Usage:
+    python scripts/bench_literature_index.py [--files pubmed25n0001.xml.gz ...]
+                                             [--articles 50000] [--queries 1000]
+
+Without --files, a synthetic corpus is generated: titles of ~10 words,
+abstracts of ~200 words and a few MeSH terms, drawn Zipf-style from a
+~30k-word vocabulary. Indexing throughput covers building from parsed
+records (XML parsing is measured separately when --files is given).
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.clients.literature_index import (
+    LiteratureIndex,
+    build_index,
+    read_baseline,
+    tokenize,
+)
+
+_CLINICAL = (
+    "metformin renal dosing chronic kidney disease diabetes mellitus insulin "
+    "glycemic control hba1c hypertension blood pressure statin cardiovascular "
+    "risk myocardial infarction stroke anticoagulation warfarin apixaban atrial "
+    "fibrillation heart failure ejection fraction randomized controlled trial "
+    "cohort outcomes mortality hospitalization adverse events safety efficacy "
+    "elderly patients children pregnancy asthma copd inhaled corticosteroids "
+    "sepsis antibiotics resistance pneumonia vaccination influenza depression "
+    "antidepressant anxiety cognitive dementia obesity bariatric surgery"
+).split()
+
+
+def _vocabulary(rng: random.Random, size: int) -> list[str]:
+    words = list(dict.fromkeys(_CLINICAL))
+    seen = set(words)
+    while len(words) < size:
+        word = "".join(
+            rng.choice("bcdfghklmnprstvz") + rng.choice("aeiouy")
+            for _ in range(rng.randint(2, 5))
+        )
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def synthetic_articles(n: int, seed: int = 11) -> list[dict]:
+    rng = random.Random(seed)
+    vocabulary = _vocabulary(rng, 30_000)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    articles = []
+    for i in range(n):
+        articles.append({
+            "pmid": str(30_000_000 + i),
+            "title": " ".join(rng.choices(vocabulary, weights, k=rng.randint(6, 16))),
+            "authors": ["Smith J", "Doe A"],
+            "source": "J Synth Med",
+            "pubdate": str(rng.randint(1990, 2025)),
+            "abstract": " ".join(rng.choices(vocabulary, weights, k=rng.randint(120, 300))),
+            "mesh_terms": rng.sample(_CLINICAL, 4),
+        })
+    return articles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", nargs="*", help="PubMed XML files (.xml or .xml.gz)")
+    parser.add_argument("--articles", type=int, default=50_000, help="Synthetic corpus size")
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.files:
+        start = time.perf_counter()
+        articles = [a for path in args.files for a in read_baseline(path)]
+        parse_s = time.perf_counter() - start
+        print(f"Parsed {len(articles)} articles in {parse_s:.1f}s "
+              f"({len(articles) / parse_s:,.0f} articles/s)")
+    else:
+        articles = synthetic_articles(args.articles)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "pubmed.db")
+        start = time.perf_counter()
+        counts = build_index(articles, db_path)
+        build_s = time.perf_counter() - start
+        size_mb = os.path.getsize(db_path) / 1024 / 1024
+        print(
+            f"Indexed {counts['articles']} articles ({counts['terms']} terms) in "
+            f"{build_s:.1f}s ({counts['articles'] / build_s:,.0f} articles/s), "
+            f"{size_mb:.1f} MB on disk ({size_mb * 1024 / counts['articles']:.2f} KB/article)"
+        )
+
+        index = LiteratureIndex(db_path)
+        rng = random.Random(5)
+        queries = []
+        for _ in range(args.queries):
+            tokens = tokenize(rng.choice(articles)["title"]) or ["metformin"]
+            queries.append(" ".join(rng.sample(tokens, min(len(tokens), rng.randint(2, 4)))))
+        for label, k in (("top 5", 5), ("top 20", 20)):
+            samples = []
+            for q in queries:
+                start = time.perf_counter()
+                index.search(q, k)
+                samples.append((time.perf_counter() - start) * 1e3)
+            q = statistics.quantiles(samples, n=100)
+            print(f"{label:<7} p50={q[49]:6.2f} ms  p95={q[94]:6.2f} ms  p99={q[98]:6.2f} ms")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark drug-name lookups against the offline RxNorm index.
+
+Usage:
+    python scripts/bench_rxnorm_index.py [--ingredients 15000] [--lookups 20000]
+    python scripts/bench_rxnorm_index.py --db data/rxnorm.db --names metformin lisinopril
+
+Without --db, builds a synthetic release roughly the size of RxNorm's
+prescribable subset (each ingredient with a PIN, SCDC, SCD, BN and SBD) and
+times exact-name, synonym, miss and ingredient-normalization lookups.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.clients.rxnorm_index import RxNormIndex, build_index
+
+
+def _conso(rxcui: int, tty: str, name: str) -> str:
+    return f"{rxcui}|ENG||||||||||RXNORM|{tty}|{rxcui}|{name}||N|4096|\n"
+
+
+def _rel(rxcui1: int, rela: str, rxcui2: int) -> str:
+    return f"{rxcui1}||CUI|RO|{rxcui2}||CUI|{rela}|||RXNORM|RXNORM|||N||\n"
+
+
+def write_synthetic_release(rrf_dir: str, ingredients: int) -> None:
+    with (
+        open(os.path.join(rrf_dir, "RXNCONSO.RRF"), "w") as conso,
+        open(os.path.join(rrf_dir, "RXNREL.RRF"), "w") as rel,
+    ):
+        for i in range(ingredients):
+            base = 10 * i + 1
+            name = f"drug{i}"
+            conso.write(_conso(base, "IN", name))
+            conso.write(_conso(base + 1, "PIN", f"{name} hydrochloride"))
+            conso.write(_conso(base + 1, "SY", f"{name} hcl"))
+            conso.write(_conso(base + 2, "SCDC", f"{name} 10 MG"))
+            conso.write(_conso(base + 3, "SCD", f"{name} 10 MG Oral Tablet"))
+            conso.write(_conso(base + 4, "BN", f"Brand{i}"))
+            conso.write(_conso(base + 5, "SBD", f"{name} 10 MG Oral Tablet [Brand{i}]"))
+            rel.write(_rel(base + 1, "form_of", base))
+            rel.write(_rel(base, "ingredient_of", base + 2))
+            rel.write(_rel(base + 2, "constitutes", base + 3))
+            rel.write(_rel(base + 3, "tradename_of", base + 5))
+            rel.write(_rel(base + 4, "tradename_of", base))
+
+
+def _time(fn, args_list: list) -> list[float]:
+    samples = []
+    for arg in args_list:
+        start = time.perf_counter()
+        fn(arg)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<26} p50={statistics.median(samples):6.1f} us  p95={p95:6.1f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="Existing index to benchmark")
+    parser.add_argument("--names", nargs="+", help="Names to look up (with --db)")
+    parser.add_argument("--ingredients", type=int, default=15000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if args.db:
+            db_path = args.db
+            names = args.names or ["metformin", "lisinopril", "atorvastatin"]
+            n = args.lookups // len(names)
+            exact = names * n
+            synonyms = misses = []
+        else:
+            db_path = os.path.join(tmpdir, "rxnorm.db")
+            write_synthetic_release(tmpdir, args.ingredients)
+            start = time.monotonic()
+            counts = build_index(tmpdir, db_path)
+            print(
+                f"Built synthetic index in {time.monotonic() - start:.1f}s "
+                f"({os.path.getsize(db_path) / 1024 / 1024:.1f} MB): {counts}"
+            )
+            pick = [random.randrange(args.ingredients) for _ in range(args.lookups)]
+            exact = [f"Brand{i}" for i in pick]
+            synonyms = [f"drug{i} HCl" for i in pick]
+            misses = [f"nodrug{i}" for i in pick]
+
+        index = RxNormIndex(db_path)
+        try:
+            _report("exact name (tier 1)", _time(index.resolve, exact))
+            if synonyms:
+                _report("synonym (tier 3)", _time(index.resolve, synonyms))
+                _report("miss (falls back)", _time(index.resolve, misses))
+                products = [str(10 * i + 6) for i in pick]
+                _report("ingredient of SBD", _time(index.get_ingredient, products))
+        finally:
+            index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Benchmark get_patient_summary compaction: tokens before/after and its cost.
+
+Usage:
+    python scripts/bench_summary_compaction.py [--budget 1500] [--reason-steps 3]
+                                               [--prefill-tokens-per-s 10000]
+
+Builds OpenEMR-shaped chart sections (meta, text.div narrative, coding
+arrays, Bundle links) for a small, typical and large chart and reports the
+raw and compacted token estimates, the compaction time, and the bytes saved
+per checkpoint. The reason-node effect is estimated, not measured: the
+tool result is re-sent on every later reason step, so each step's prompt
+shrinks by the saved tokens, at the given model prefill rate.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.tools.compaction import CHARS_PER_TOKEN, compact_chart, estimate_tokens
+
+_META = {"versionId": "1", "lastUpdated": "2026-01-15T10:00:00+00:00"}
+
+
+def _entry(resource_type: str, i: int, body: dict) -> dict:
+    return {
+        "fullUrl": f"http://openemr/apis/default/fhir/{resource_type}/{i:08x}-uuid",
+        "resource": {
+            "resourceType": resource_type,
+            "id": f"{i:08x}-0000-4000-8000-000000000000",
+            "meta": _META,
+            "text": {
+                "status": "generated",
+                "div": f"<div xmlns='http://www.w3.org/1999/xhtml'>{resource_type} {i}</div>",
+            },
+            **body,
+        },
+        "search": {"mode": "match"},
+    }
+
+
+def _bundle(resource_type: str, bodies: list[dict]) -> dict:
+    return {
+        "resourceType": "Bundle",
+        "id": "bundle-id",
+        "meta": _META,
+        "type": "searchset",
+        "total": len(bodies),
+        "link": [{"relation": "self", "url": f"http://openemr/fhir/{resource_type}?patient=x"}],
+        "entry": [_entry(resource_type, i, b) for i, b in enumerate(bodies)],
+    }
+
+
+def _coded(code: str, display: str, system: str) -> dict:
+    return {"coding": [{"system": system, "code": code, "display": display}], "text": display}
+
+
+def make_chart(conditions: int, medications: int, allergies: int, vitals: int) -> dict:
+    status = _coded("active", "Active",
+                    "http://terminology.hl7.org/CodeSystem/condition-clinical")
+    return {
+        "patient": {
+            "resourceType": "Patient", "id": "patient-uuid", "meta": _META,
+            "text": {"status": "generated", "div": "<div>Jane Doe</div>"},
+            "identifier": [{"system": "http://terminology.hl7.org/CodeSystem/v2-0203",
+                            "value": "12345"}],
+            "name": [{"use": "official", "family": "Doe", "given": ["Jane"]}],
+            "gender": "female", "birthDate": "1961-04-02",
+            "address": [{"line": ["1 Main St"], "city": "Springfield", "state": "IL"}],
+        },
+        "conditions": _bundle("Condition", [
+            {"clinicalStatus": status,
+             "category": [_coded("problem-list-item", "Problem List Item",
+                                 "http://terminology.hl7.org/CodeSystem/condition-category")],
+             "code": _coded(f"E11.{i % 10}", f"Condition number {i}",
+                            "http://hl7.org/fhir/sid/icd-10-cm"),
+             "onsetDateTime": "2019-05-01"}
+            for i in range(conditions)
+        ]),
+        "medications": _bundle("MedicationRequest", [
+            {"status": "active", "intent": "order",
+             "medicationCodeableConcept": _coded(str(6809 + i), f"Drug {i} 500 MG Oral Tablet",
+                                                 "http://www.nlm.nih.gov/research/umls/rxnorm"),
+             "authoredOn": "2025-11-02",
+             "dosageInstruction": [{"text": "1 tablet by mouth twice daily"}]}
+            for i in range(medications)
+        ]),
+        "allergies": _bundle("AllergyIntolerance", [
+            {"clinicalStatus": status, "type": "allergy", "criticality": "high",
+             "code": _coded(str(7980 + i), f"Allergen {i}",
+                            "http://www.nlm.nih.gov/research/umls/rxnorm"),
+             "reaction": [{"manifestation": [_coded("247472004", "Hives",
+                                                    "http://snomed.info/sct")],
+                           "severity": "moderate"}]}
+            for i in range(allergies)
+        ]),
+        "vitals": _bundle("Observation", [
+            {"status": "final",
+             "category": [_coded("vital-signs", "Vital Signs",
+                                 "http://terminology.hl7.org/CodeSystem/observation-category")],
+             "code": _coded("8867-4", "Heart rate", "http://loinc.org"),
+             "valueQuantity": {"value": 60 + i % 30, "unit": "/min",
+                               "system": "http://unitsofmeasure.org", "code": "/min"},
+             "effectiveDateTime": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}"}
+            for i in range(vitals)
+        ]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=int, default=1500)
+    parser.add_argument("--reason-steps", type=int, default=3,
+                        help="Reason steps that re-send the tool result")
+    parser.add_argument("--prefill-tokens-per-s", type=float, default=10000.0)
+    args = parser.parse_args()
+
+    charts = {
+        "small": make_chart(2, 3, 1, 5),
+        "typical": make_chart(8, 10, 3, 30),
+        "large": make_chart(25, 30, 8, 200),
+    }
+    for label, chart in charts.items():
+        raw = estimate_tokens(chart)
+        samples = []
+        for _ in range(50):
+            start = time.perf_counter()
+            data = compact_chart(chart, args.budget)
+            samples.append((time.perf_counter() - start) * 1e3)
+        compact = estimate_tokens(data)
+        saved = raw - compact
+        reason_ms = saved * args.reason_steps / args.prefill_tokens_per_s * 1000
+        print(
+            f"{label:<8} raw ~{raw:6d} tok  compact ~{compact:5d} tok "
+            f"({100 * compact / raw:4.1f}%)  compaction p50 {statistics.median(samples):5.2f} ms  "
+            f"checkpoint -{saved * CHARS_PER_TOKEN / 1024:5.1f} KB  "
+            f"reason prefill -{reason_ms:6.0f} ms over {args.reason_steps} steps"
+            + (f"  omitted {data['omitted']}" if "omitted" in data else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
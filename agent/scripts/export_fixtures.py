@@ -105,49 +105,52 @@ async def main():
         await client.authenticate()
         logger.info("Authenticated with OpenEMR")
 
-        # Discover all patients
-        bundle = await client.search_patients()
-        entries = bundle.get("entry", [])
+        os.makedirs(FIXTURE_DIR, exist_ok=True)
+        demo_path = os.path.join(FIXTURE_DIR, "demo_data.json")
+        tmp_path = demo_path + ".tmp"
+        uuid_mapping = {}
 
-        if not entries:
+        # Stream patients page by page and write each one as soon as it is
+        # exported, so memory stays bounded by a single patient's data.
+        with open(tmp_path, "w") as f:
+            f.write("{\n")
+            f.write(f'  "fixture_version": {FIXTURE_VERSION},\n')
+            exported_at = json.dumps(datetime.now(timezone.utc).isoformat())
+            f.write(f'  "exported_at": {exported_at},\n')
+            f.write('  "patients": [')
+
+            idx = 0
+            async for entry in client.iter_bundle("Patient"):
+                resource = entry.get("resource", {})
+                patient_uuid = resource.get("id", "")
+                names = resource.get("name", [{}])
+                name = ""
+                if names:
+                    given = " ".join(names[0].get("given", []))
+                    family = names[0].get("family", "")
+                    name = f"{given} {family}".strip()
+
+                logger.info("Exporting patient %d: %s (%s)", idx + 1, name, patient_uuid)
+                patient_data = await export_patient_data(client, patient_uuid)
+                patient_data["display_name"] = name
+                body = json.dumps(patient_data, indent=2).replace("\n", "\n    ")
+                f.write(("," if idx else "") + "\n    " + body)
+
+                # Create placeholder mapping (PATIENT_1, PATIENT_2, etc.)
+                placeholder = f"PATIENT_{idx + 1}"
+                uuid_mapping[placeholder] = patient_uuid
+                idx += 1
+
+            f.write("\n  ],\n")
+            f.write(f'  "patient_count": {idx}\n}}\n')
+
+        if not uuid_mapping:
+            os.unlink(tmp_path)
             logger.error("No patients found in OpenEMR. Run seed_patients.py first.")
             sys.exit(1)
 
-        patients = []
-        uuid_mapping = {}
-
-        for idx, entry in enumerate(entries):
-            resource = entry.get("resource", {})
-            patient_uuid = resource.get("id", "")
-            names = resource.get("name", [{}])
-            name = ""
-            if names:
-                given = " ".join(names[0].get("given", []))
-                family = names[0].get("family", "")
-                name = f"{given} {family}".strip()
-
-            logger.info("Exporting patient %d: %s (%s)", idx + 1, name, patient_uuid)
-            patient_data = await export_patient_data(client, patient_uuid)
-            patient_data["display_name"] = name
-            patients.append(patient_data)
-
-            # Create placeholder mapping (PATIENT_1, PATIENT_2, etc.)
-            placeholder = f"PATIENT_{idx + 1}"
-            uuid_mapping[placeholder] = patient_uuid
-
-        # Write demo_data.json
-        os.makedirs(FIXTURE_DIR, exist_ok=True)
-        demo_data = {
-            "fixture_version": FIXTURE_VERSION,
-            "exported_at": datetime.now(timezone.utc).isoformat(),
-            "patient_count": len(patients),
-            "patients": patients,
-        }
-
-        demo_path = os.path.join(FIXTURE_DIR, "demo_data.json")
-        with open(demo_path, "w") as f:
-            json.dump(demo_data, f, indent=2)
-        logger.info("Wrote %s (%d patients)", demo_path, len(patients))
+        os.replace(tmp_path, demo_path)
+        logger.info("Wrote %s (%d patients)", demo_path, len(uuid_mapping))
 
         # Write uuid_mapping.json
         mapping_path = os.path.join(FIXTURE_DIR, "uuid_mapping.json")
@@ -0,0 +1,55 @@
+"""Build the offline literature index from PubMed baseline files.
+
+Usage:
+    python scripts/load_pubmed_baseline.py pubmed25n0001.xml.gz [...] [--out data/pubmed.db]
+
+Takes any number of PubMed baseline or update files (pubmedYYnNNNN.xml.gz
+from ftp.ncbi.nlm.nih.gov/pubmed/, or saved efetch XML) and writes a BM25
+index over title, abstract and MeSH terms for PubMedClient. Files are read
+in order, so an update file listed after the baseline replaces older
+versions of its articles. Point PUBMED_INDEX_PATH at the output file and set
+PUBMED_INDEX_MODE to "fallback" (default) or "local". Rebuilding replaces
+the file atomically.
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.clients.literature_index import build_index, read_baseline
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="+", help="PubMed XML files (.xml or .xml.gz)")
+    parser.add_argument("--out", default="data/pubmed.db", help="Index file to write")
+    args = parser.parse_args()
+
+    for path in args.files:
+        if not os.path.exists(path):
+            logger.error("%s not found", path)
+            sys.exit(1)
+
+    out_dir = os.path.dirname(args.out)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    start = time.monotonic()
+    articles = itertools.chain.from_iterable(read_baseline(p) for p in args.files)
+    counts = build_index(articles, args.out)
+    size_mb = os.path.getsize(args.out) / 1024 / 1024
+    print(
+        f"Wrote {args.out} ({size_mb:.1f} MB) in {time.monotonic() - start:.1f}s: "
+        + ", ".join(f"{n} {kind}" for kind, n in counts.items())
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Build the offline RxNorm index from an RxNorm release.
+
+Usage:
+    python scripts/load_rxnorm.py /path/to/RxNorm_full_MMDDYYYY/rrf [--out data/rxnorm.db]
+
+Reads RXNCONSO.RRF and RXNREL.RRF from the release's rrf/ directory (the
+full release or the monthly prescribable subset) and writes a SQLite index
+for DrugInteractionClient. Point RXNORM_INDEX_PATH at the output file.
+Rebuilding replaces the file atomically, so running agents pick up the new
+index on restart without ever reading a partial one.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.clients.rxnorm_index import build_index
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("rrf_dir", help="Directory containing RXNCONSO.RRF and RXNREL.RRF")
+    parser.add_argument("--out", default="data/rxnorm.db", help="Index file to write")
+    args = parser.parse_args()
+
+    for name in ("RXNCONSO.RRF", "RXNREL.RRF"):
+        if not os.path.exists(os.path.join(args.rrf_dir, name)):
+            logger.error("%s not found in %s", name, args.rrf_dir)
+            sys.exit(1)
+
+    out_dir = os.path.dirname(args.out)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    start = time.monotonic()
+    counts = build_index(args.rrf_dir, args.out)
+    size_mb = os.path.getsize(args.out) / 1024 / 1024
+    print(
+        f"Wrote {args.out} ({size_mb:.1f} MB) in {time.monotonic() - start:.1f}s: "
+        + ", ".join(f"{n} {table}" for table, n in counts.items())
+    )
+
+
+if __name__ == "__main__":
+    main()
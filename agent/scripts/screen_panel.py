@@ -0,0 +1,120 @@
+"""Screen every active patient's medication list for drug interactions.
+
+Usage:
+    python scripts/screen_panel.py [--concurrency 4] [--resume | --run-id ID] [--all]
+
+Meant for a nightly cron/scheduler run against the same data directory as the
+agent (AGENT_DB_PATH): results land in the screening_results table, where the
+get_interaction_screening tool reads them. --resume continues the most recent
+unfinished run, skipping patients it already screened; --run-id resumes a
+specific run. Progress and throughput (patients/min) are logged as it goes.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.clients.fuzzy_matcher import FuzzyMatcher
+from app.clients.interaction_store import InteractionPairStore
+from app.clients.openemr import OpenEMRClient
+from app.clients.openfda import DrugInteractionClient
+from app.clients.retry import RetryPolicy
+from app.clients.rxnorm_index import RxNormIndex
+from app.clients.upstream_guard import GuardConfig
+from app.clients.upstream_guard import registry as upstream_guards
+from app.config import settings
+from app.jobs.panel_screening import PanelScreeningJob
+from app.persistence.screening import ScreeningStore
+from app.persistence.ttl_cache import SqliteTTLCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=4, help="Patients in flight")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--resume", action="store_true", help="Resume the last unfinished run")
+    group.add_argument("--run-id", help="Start or resume this run")
+    parser.add_argument("--all", action="store_true", help="Include inactive patients")
+    args = parser.parse_args()
+
+    db_path = os.environ.get("AGENT_DB_PATH", "/app/data/agent_state.db")
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    store = ScreeningStore(db_path)
+    await store.init_db()
+    upstream_cache = SqliteTTLCache(
+        os.path.join(os.path.dirname(db_path), "upstream_cache.db")
+    )
+    await upstream_cache.init_db()
+    await upstream_cache.purge_expired()
+
+    rxnorm_index = None
+    fuzzy_matcher = None
+    if settings.rxnorm_index_path and os.path.exists(settings.rxnorm_index_path):
+        rxnorm_index = RxNormIndex(settings.rxnorm_index_path)
+        fuzzy_matcher = FuzzyMatcher(
+            rxnorm_index.vocabulary(), min_score=settings.rxnorm_fuzzy_min_score
+        )
+
+    upstream_guards.configure(GuardConfig.from_settings(settings))
+    openemr = OpenEMRClient(settings)
+    drug = DrugInteractionClient(
+        timeout=settings.tool_timeout_seconds,
+        retry=RetryPolicy.from_settings(settings, "rxnav"),
+        resolution_cache=upstream_cache,
+        resolution_ttl=settings.drug_resolution_ttl_seconds,
+        negative_ttl=settings.drug_resolution_negative_ttl_seconds,
+        max_concurrency=settings.rxnav_max_concurrency,
+        hedge_delay=(
+            settings.rxnav_hedge_delay_seconds if settings.rxnav_hedged_tiers else None
+        ),
+        rxnorm_index=rxnorm_index,
+        fuzzy_matcher=fuzzy_matcher,
+        interaction_store=InteractionPairStore(
+            upstream_cache, ttl=settings.drug_interaction_ttl_seconds
+        ),
+    )
+
+    run_id = args.run_id
+    if args.resume:
+        unfinished = await store.latest_unfinished_run()
+        if unfinished is None:
+            logger.info("No unfinished run to resume; starting a new one")
+        else:
+            run_id = unfinished.run_id
+
+    job = PanelScreeningJob(
+        openemr,
+        drug,
+        store,
+        concurrency=args.concurrency,
+        patient_params={} if args.all else None,
+    )
+    try:
+        await openemr.authenticate()
+        run = await job.run(run_id)
+        print(json.dumps({
+            "run_id": run.run_id,
+            "finished": run.finished_at is not None,
+            "patients_done": run.patients_done,
+            "patients_failed": run.patients_failed,
+            **run.stats,
+        }, indent=2))
+    finally:
+        await openemr.close()
+        await drug.close()
+        await upstream_cache.close()
+        await store.close()
+        if rxnorm_index is not None:
+            rxnorm_index.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,9 +6,21 @@ from unittest.mock import AsyncMock
 
 import pytest
 
+from app.clients.eutils_scheduler import registry as eutils_schedulers
+from app.clients.upstream_guard import registry as upstream_guards
 from app.persistence.store import SessionStore
 
 
+@pytest.fixture(autouse=True)
+def _reset_upstream_guards():
+    """Guards are process-wide; start every test with closed circuits."""
+    upstream_guards.reset()
+    eutils_schedulers.reset()
+    yield
+    upstream_guards.reset()
+    eutils_schedulers.reset()
+
+
 @pytest.fixture
 def mock_openemr_client():
     """AsyncMock of OpenEMRClient with rich FHIR response data."""
@@ -160,6 +172,24 @@ def mock_openemr_client():
         ],
     }
 
+    client.get_chart.return_value = {
+        "sections": {
+            "patient": client.get_patient.return_value,
+            "conditions": client.get_conditions.return_value,
+            "medications": client.get_medications.return_value,
+            "allergies": client.get_allergies.return_value,
+            "vitals": client.get_vitals.return_value,
+        },
+        "errors": {},
+        "timings_ms": {
+            "patient": 1.0,
+            "conditions": 1.0,
+            "medications": 1.0,
+            "allergies": 1.0,
+            "vitals": 1.0,
+        },
+    }
+
     return client
 
 
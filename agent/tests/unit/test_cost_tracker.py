@@ -0,0 +1,42 @@
+"""Unit tests for the cost tracking middleware."""
+
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.clients.metrics import record_retry
+from app.middleware.cost_tracker import CostTrackerMiddleware
+
+
+@pytest.mark.asyncio
+async def test_cost_log_includes_upstream_retries():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        log_file = Path(tmpdir) / "cost_log.jsonl"
+        middleware = CostTrackerMiddleware(app=MagicMock())
+        request = MagicMock()
+        request.url.path = "/chat"
+        request.method = "POST"
+        response = MagicMock()
+        response.status_code = 200
+
+        async def call_next(_):
+            record_retry("rxnav", 0.25)
+            record_retry("rxnav", 0.5)
+            return response
+
+        with (
+            patch("app.middleware.cost_tracker.LOG_DIR", Path(tmpdir)),
+            patch("app.middleware.cost_tracker.LOG_FILE", log_file),
+        ):
+            await middleware.dispatch(request, call_next)
+
+        entry = json.loads(log_file.read_text().strip())
+        assert entry["upstream_retries"] == {"rxnav": 2}
+        assert entry["upstream_retry_wait_seconds"] == 0.75
+
+
+def test_record_retry_outside_request_is_noop():
+    record_retry("rxnav", 1.0)
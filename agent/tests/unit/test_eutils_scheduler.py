@@ -0,0 +1,105 @@
+"""Unit tests for the E-utilities rate limiter and request queue."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.clients.eutils_scheduler import (
+    ANONYMOUS_RATE,
+    API_KEY_RATE,
+    EUtilsScheduler,
+    SchedulerRegistry,
+    current_conversation,
+)
+from app.clients.pubmed_client import PubMedClient
+
+
+def test_rate_depends_on_api_key():
+    registry = SchedulerRegistry()
+
+    assert registry.get("").rate == ANONYMOUS_RATE
+    assert registry.get("secret-key-1234").rate == API_KEY_RATE
+    assert registry.get("") is registry.get("")
+    assert set(registry.stats()) == {"anonymous", "api_key:...1234"}
+
+
+@pytest.mark.asyncio
+async def test_requests_are_paced_at_the_rate():
+    scheduler = EUtilsScheduler(rate=50.0)
+    start = time.monotonic()
+
+    await asyncio.gather(*(scheduler.acquire() for _ in range(5)))
+
+    # First token is immediate, the other four are 20ms apart.
+    assert time.monotonic() - start >= 0.075
+    stats = scheduler.stats()
+    assert stats["granted"] == 5
+    assert stats["queued"] == 4
+    assert stats["queue_depth"] == 0
+    assert stats["max_wait_seconds"] > 0
+
+
+@pytest.mark.asyncio
+async def test_conversations_are_served_round_robin():
+    scheduler = EUtilsScheduler(rate=100.0)
+    order: list[str] = []
+
+    async def request(conversation: str, label: str) -> None:
+        await scheduler.acquire(conversation)
+        order.append(label)
+
+    await request("a", "a1")
+    tasks = [
+        asyncio.create_task(request("a", "a2")),
+        asyncio.create_task(request("a", "a3")),
+        asyncio.create_task(request("b", "b1")),
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.queue_depth() == 3
+
+    await asyncio.gather(*tasks)
+
+    assert order == ["a1", "a2", "b1", "a3"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_use_a_token():
+    scheduler = EUtilsScheduler(rate=100.0)
+    await scheduler.acquire()
+    cancelled = asyncio.create_task(scheduler.acquire())
+    waiting = asyncio.create_task(scheduler.acquire())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    await waiting
+
+    assert scheduler.stats()["granted"] == 2
+
+
+@pytest.mark.asyncio
+async def test_identical_pubmed_queries_share_one_request(httpx_mock):
+    calls = 0
+
+    async def respond(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200, json={"esearchresult": {"idlist": []}})
+
+    httpx_mock.add_callback(respond, is_reusable=True)
+    client = PubMedClient(scheduler=EUtilsScheduler(rate=100.0))
+    token = current_conversation.set("conv-1")
+    try:
+        # The second request waits for a token, the rest coalesce onto them.
+        results = await asyncio.gather(
+            *(client.search("metformin renal dosing") for _ in range(3)),
+            client.search("warfarin"),
+        )
+    finally:
+        current_conversation.reset(token)
+    await client.close()
+
+    assert results == [[], [], [], []]
+    assert calls == 2
+    assert client.scheduler_stats()["coalesced"] == 2
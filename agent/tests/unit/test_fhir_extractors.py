@@ -0,0 +1,169 @@
+"""Unit tests for the shared FHIR extraction layer (agent/app/fhir/)."""
+
+import pytest
+
+from app import fhir
+
+_ABSENT = {
+    "system": "http://terminology.hl7.org/CodeSystem/data-absent-reason",
+    "code": "unknown",
+    "display": "Unknown",
+}
+
+
+def _bundle(*resources: dict) -> dict:
+    return {"resourceType": "Bundle", "entry": [{"resource": r} for r in resources]}
+
+
+@pytest.mark.parametrize("record_type", [
+    fhir.ObservationRecord, fhir.AllergyRecord, fhir.Reaction, fhir.MedicationRecord,
+    fhir.ConditionRecord, fhir.AppointmentRecord, fhir.PatientRecord,
+])
+def test_records_are_slotted(record_type):
+    assert "__slots__" in record_type.__dict__
+    assert "__dict__" not in record_type.__dict__
+
+
+def test_extract_handles_empty_and_missing_entries():
+    assert fhir.extract(None, fhir.observation) == []
+    assert fhir.extract({"resourceType": "Bundle"}, fhir.observation) == []
+    [record] = fhir.extract({"entry": [{}]}, fhir.patient)
+    assert record == fhir.PatientRecord(id="", name="", birth_date="", gender="")
+
+
+def test_observation_quantity_and_string_values():
+    quantity, text, bare = fhir.extract(_bundle(
+        {
+            "code": {"coding": [{"code": "4548-4", "display": "HbA1c"}]},
+            "valueQuantity": {"value": 7.2, "unit": "%"},
+            "effectiveDateTime": "2026-01-10",
+            "status": "final",
+        },
+        {"code": {"text": "Urine color"}, "valueString": "Yellow"},
+        {"code": {"coding": []}},
+    ), fhir.observation)
+    assert quantity == fhir.ObservationRecord(
+        name="HbA1c", value=7.2, unit="%", date="2026-01-10", status="final"
+    )
+    assert (text.name, text.value, text.unit) == ("Urine color", "Yellow", "")
+    assert (bare.name, bare.value) == ("", "")
+
+
+def test_allergy_substance_fallback_order():
+    coded, narrative, absent, noted, empty = fhir.extract(_bundle(
+        {"code": {"text": "Penicillin"}, "text": {"div": "<div>Other</div>"}},
+        {"code": {"coding": [_ABSENT]}, "text": {"div": "<div xmlns='x'><b>Latex</b></div>"}},
+        {"code": {"coding": [_ABSENT, {"code": "91936005", "display": "Peanut"}]}},
+        {"code": {"coding": [_ABSENT]}, "note": [{"text": "Shellfish"}]},
+        {"code": {"coding": [_ABSENT]}},
+    ), fhir.allergy)
+    assert coded.substance == "Penicillin"
+    assert narrative.substance == "Latex"
+    assert absent.substance == "Peanut"
+    assert noted.substance == "Shellfish"
+    assert empty.substance == "Not specified"
+
+
+def test_allergy_reactions_and_status():
+    [record] = fhir.extract(_bundle({
+        "code": {"text": "Penicillin"},
+        "type": "allergy",
+        "criticality": "high",
+        "onsetDateTime": "2020-05-01",
+        "clinicalStatus": {"coding": [{"code": "active"}]},
+        "reaction": [
+            {"manifestation": [{"coding": [{"code": "271807003", "display": "Rash"}]}],
+             "severity": "moderate"},
+            {"severity": "mild"},
+        ],
+    }), fhir.allergy)
+    assert record.reactions == [
+        fhir.Reaction(manifestation="Rash", severity="moderate"),
+        fhir.Reaction(manifestation="", severity="mild"),
+    ]
+    assert (record.type, record.criticality, record.onset, record.clinical_status) == (
+        "allergy", "high", "2020-05-01", "active"
+    )
+
+
+def test_medication_without_concept_or_coding():
+    coded, uncoded, missing = fhir.extract(_bundle(
+        {
+            "medicationCodeableConcept": {"coding": [{"display": "Metformin 500 MG"}]},
+            "status": "active",
+            "intent": "order",
+            "dosageInstruction": [{"text": "1 tab BID"}],
+            "authoredOn": "2025-12-01",
+        },
+        {"medicationCodeableConcept": {"coding": []}, "status": "stopped"},
+        {},
+    ), fhir.medication)
+    assert coded == fhir.MedicationRecord(
+        medication="Metformin 500 MG", status="active", intent="order",
+        dosage="1 tab BID", authored_on="2025-12-01",
+    )
+    assert (uncoded.medication, uncoded.status) == ("", "stopped")
+    assert missing.medication == ""
+
+
+def test_medication_fields_match_record():
+    resources = [
+        {
+            "medicationCodeableConcept": {"coding": [_ABSENT, {"display": "Lisinopril"}]},
+            "status": "active",
+            "intent": "order",
+            "dosageInstruction": [{"text": "10 mg daily"}],
+        },
+        {"medicationCodeableConcept": {"text": "Aspirin 81 MG"}, "status": "on-hold"},
+        {},
+    ]
+    records = fhir.extract(_bundle(*resources), fhir.medication)
+    fields = fhir.extract(_bundle(*resources), fhir.medication_fields)
+    assert fields == [
+        {"medication": r.medication, "status": r.status, "intent": r.intent}
+        for r in records
+    ]
+    assert fields[0]["medication"] == "Lisinopril"
+
+
+def test_condition_skips_absent_codes():
+    [record] = fhir.extract(_bundle({
+        "code": {"coding": [_ABSENT, {"code": "E11.9", "display": "Type 2 diabetes"}]},
+        "clinicalStatus": {"coding": [{"code": "active"}]},
+        "onsetDateTime": "2019-03-01",
+    }), fhir.condition)
+    assert record == fhir.ConditionRecord(
+        condition="Type 2 diabetes", code="E11.9", clinical_status="active", onset="2019-03-01"
+    )
+
+
+def test_appointment_start_and_practitioner():
+    timed, undated = fhir.extract(_bundle(
+        {
+            "start": "2026-02-01T09:30:00",
+            "status": "booked",
+            "reasonCode": [{"text": "Follow-up"}],
+            "participant": [
+                {"actor": {"reference": "Patient/1", "display": "John Doe"}},
+                {"actor": {"reference": "Practitioner/2", "display": "Dr. Smith"}},
+            ],
+        },
+        {"start": "2026-03-01", "participant": [{}]},
+    ), fhir.appointment)
+    assert timed == fhir.AppointmentRecord(
+        date="2026-02-01", time="09:30:00", provider="Dr. Smith",
+        reason="Follow-up", status="booked",
+    )
+    assert (undated.date, undated.time, undated.provider) == ("2026-03-01", "", "")
+
+
+def test_patient_name_assembly():
+    full, family_only = fhir.extract(_bundle(
+        {"id": "p1", "name": [{"given": ["John", "Q"], "family": "Doe"}],
+         "birthDate": "1960-01-01", "gender": "male"},
+        {"id": "p2", "name": [{"family": "Roe"}]},
+    ), fhir.patient)
+    assert full == fhir.PatientRecord(
+        id="p1", name="John Q Doe", birth_date="1960-01-01", gender="male"
+    )
+    assert family_only.name == "Roe"
@@ -0,0 +1,100 @@
+"""Unit tests for the local fuzzy drug-name matcher."""
+
+import pytest
+
+from app.clients.fuzzy_matcher import (
+    FuzzyMatcher,
+    levenshtein,
+    similarity_score,
+    strip_dose_form,
+)
+
+VOCABULARY = [
+    ("metformin", "6809"),
+    ("metformin hydrochloride", "235743"),
+    ("Glucophage", "151827"),
+    ("lisinopril", "29046"),
+    ("losartan", "52175"),
+    ("atorvastatin", "83367"),
+    ("acetaminophen", "161"),
+    ("Tylenol", "202433"),
+]
+
+
+@pytest.fixture
+def matcher():
+    return FuzzyMatcher(VOCABULARY)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Metformin 500mg", "metformin"),
+        ("lisinoprl 10 mg PO daily", "lisinoprl"),
+        ("Atorvastatin 40 MG Oral Tablet", "atorvastatin"),
+        ("acetaminophen 325mg/5ml susp", "acetaminophen"),
+        ("Glucophage XR", "glucophage"),
+    ],
+)
+def test_strip_dose_form(text, expected):
+    assert strip_dose_form(text) == expected
+
+
+@pytest.mark.parametrize(
+    "a, b, expected",
+    [
+        ("", "", 0),
+        ("abc", "", 3),
+        ("kitten", "sitting", 3),
+        ("metfromin", "metformin", 2),
+        ("lisinoprl", "lisinopril", 1),
+        ("same", "same", 0),
+    ],
+)
+def test_levenshtein(a, b, expected):
+    assert levenshtein(a, b) == expected
+    assert levenshtein(b, a) == expected
+
+
+def test_levenshtein_max_dist_clamps():
+    assert levenshtein("kitten", "sitting", max_dist=1) == 2
+    assert levenshtein("a", "abcdefgh", max_dist=2) == 3
+    assert levenshtein("kitten", "sitting", max_dist=3) == 3
+
+
+def test_similarity_score():
+    assert similarity_score("lisinoprl", "lisinopril") == 90
+    assert similarity_score("same", "same") == 100
+    assert similarity_score("", "") == 0
+
+
+@pytest.mark.parametrize(
+    "term, rxcui, score",
+    [
+        ("metfromin", "6809", 78),
+        ("lisinoprl 10 mg", "29046", 90),
+        ("glucofage", "151827", 80),
+        ("Atorvastatin 40mg tab", "83367", 100),
+    ],
+)
+def test_match_best_candidate(matcher, term, rxcui, score):
+    best = matcher.match(term)[0]
+    assert best["rxcui"] == rxcui
+    assert best["score"] == score
+
+
+def test_no_match_below_threshold(matcher):
+    assert matcher.match("xyz") == []
+    assert matcher.match("500 mg") == []
+
+
+def test_leading_word_fallback_is_penalized(matcher):
+    results = matcher.match("tylenol extra strength")
+    assert results[0]["rxcui"] == "202433"
+    assert results[0]["score"] == 90
+
+
+def test_match_results_are_copies(matcher):
+    first = matcher.match("metfromin")
+    first[0]["score"] = 0
+    assert matcher.match("metfromin")[0]["score"] == 78
@@ -0,0 +1,116 @@
+"""Unit tests for the typeahead-aware ICD-10 query cache."""
+
+import httpx
+import pytest
+
+from app.clients.icd10_cache import ICD10QueryCache, matches
+from app.clients.icd10_client import ICD10_BASE, ICD10Client
+
+E11 = [
+    {"code": "E11.9", "description": "Type 2 diabetes mellitus without complications"},
+    {"code": "E11.65", "description": "Type 2 diabetes mellitus with hyperglycemia"},
+    {"code": "E11.21", "description": "Type 2 diabetes mellitus with diabetic nephropathy"},
+]
+
+
+def _api_response(results, total=None):
+    return [
+        len(results) if total is None else total,
+        [r["code"] for r in results],
+        None,
+        [[r["code"], r["description"]] for r in results],
+    ]
+
+
+def test_matches_word_prefixes_of_code_and_description():
+    result = E11[1]
+    assert matches(result, "e11.6")
+    assert matches(result, "e116")
+    assert matches(result, "diab type 2 hyper")
+    assert not matches(result, "e11.9")
+    assert not matches(result, "diabetes nephro")
+
+
+def test_exact_hit_and_incomplete_entry_limits():
+    cache = ICD10QueryCache()
+    cache.put("Diabetes", E11[:2], complete=False)
+
+    assert cache.get("diabetes ", 2) == E11[:2]
+    assert cache.get("diabetes", 5) is None  # more requested than cached
+    assert cache.stats()["hits"] == 1
+
+
+def test_refinement_filters_complete_prefix():
+    cache = ICD10QueryCache()
+    cache.put("E11", E11, complete=True)
+
+    assert cache.get("E11.6", 10) == [E11[1]]
+    assert cache.get("e11.2", 10) == [E11[2]]
+    assert cache.get("E11.8", 10) == []
+    assert cache.stats()["prefix_hits"] == 3
+    # The derived result is cached too.
+    assert cache.get("E11.6", 10) == [E11[1]]
+    assert cache.stats()["hits"] == 1
+
+
+def test_incomplete_prefix_is_not_used():
+    cache = ICD10QueryCache()
+    cache.put("E1", E11, complete=False)
+
+    assert cache.get("E11", 10) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction():
+    cache = ICD10QueryCache(max_entries=2)
+    cache.put("a", [], complete=True)
+    cache.put("b", [], complete=True)
+    cache.get("a", 10)
+    cache.put("c", [], complete=True)
+
+    assert cache.get("b", 10) is None
+    assert cache.get("a", 10) == []
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cached_results_are_copies():
+    cache = ICD10QueryCache()
+    cache.put("E11", E11, complete=True)
+    cache.get("E11", 10)[0]["code"] = "X"
+    assert cache.get("E11", 10)[0]["code"] == "E11.9"
+
+
+@pytest.mark.asyncio
+async def test_client_answers_refinements_without_requests(httpx_mock):
+    httpx_mock.add_response(
+        url=httpx.URL(ICD10_BASE, params={"sf": "code,name", "terms": "E11", "maxList": 10}),
+        json=_api_response(E11),
+    )
+    client = ICD10Client()
+
+    assert await client.search("E11") == E11
+    assert await client.search("E11.6") == [E11[1]]
+    assert await client.search("E11.65") == [E11[1]]
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert client.cache_stats()["hit_rate"] == round(2 / 3, 3)
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_client_refetches_after_truncated_result(httpx_mock):
+    httpx_mock.add_response(
+        url=httpx.URL(ICD10_BASE, params={"sf": "code,name", "terms": "E1", "maxList": 10}),
+        json=_api_response(E11, total=120),
+    )
+    httpx_mock.add_response(
+        url=httpx.URL(ICD10_BASE, params={"sf": "code,name", "terms": "E11", "maxList": 10}),
+        json=_api_response(E11),
+    )
+    client = ICD10Client()
+
+    await client.search("E1")
+    assert await client.search("E11") == E11
+
+    assert len(httpx_mock.get_requests()) == 2
+    await client.close()
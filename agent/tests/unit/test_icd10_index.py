@@ -0,0 +1,105 @@
+"""Unit tests for the offline ICD-10-CM index."""
+
+import os
+import tempfile
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.clients.icd10_client import ICD10Client
+from app.clients.icd10_index import ICD10Index, format_code, read_cms_file
+
+ENTRIES = [
+    ("E11", "Type 2 diabetes mellitus"),
+    ("E119", "Type 2 diabetes mellitus without complications"),
+    ("E1165", "Type 2 diabetes mellitus with hyperglycemia"),
+    ("E1121", "Type 2 diabetes mellitus with diabetic nephropathy"),
+    ("E10", "Type 1 diabetes mellitus"),
+    ("E109", "Type 1 diabetes mellitus without complications"),
+    ("E13", "Other specified diabetes mellitus"),
+    ("I10", "Essential (primary) hypertension"),
+    ("I110", "Hypertensive heart disease with heart failure"),
+    ("S72001A", "Fracture of unspecified part of neck of right femur, initial encounter"),
+]
+
+
+def _order_line(n, code, header, description):
+    return f"{n:05d} {code:<7} {header} {description[:60]:<60} {description}\n"
+
+
+@pytest.fixture(scope="module")
+def index():
+    return ICD10Index(ENTRIES)
+
+
+def test_format_code():
+    assert format_code("E1165") == "E11.65"
+    assert format_code("I10") == "I10"
+    assert format_code("s72001a") == "S72.001A"
+
+
+def test_reads_order_and_codes_files():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        order = os.path.join(tmpdir, "icd10cm_order_2025.txt")
+        with open(order, "w") as f:
+            f.write(_order_line(1, "E11", 0, "Type 2 diabetes mellitus"))
+            f.write(_order_line(2, "E119", 1, "Type 2 diabetes mellitus without complications"))
+        codes = os.path.join(tmpdir, "icd10cm_codes_2025.txt")
+        with open(codes, "w") as f:
+            f.write("E119    Type 2 diabetes mellitus without complications\n\n")
+
+        assert read_cms_file(order) == [
+            ("E11", "Type 2 diabetes mellitus"),
+            ("E119", "Type 2 diabetes mellitus without complications"),
+        ]
+        assert read_cms_file(codes) == [
+            ("E119", "Type 2 diabetes mellitus without complications")
+        ]
+
+
+@pytest.mark.parametrize("query", ["E11", "e11", "E11."])
+def test_code_prefix_lists_category_first(index, query):
+    codes = [r["code"] for r in index.search(query)]
+    assert codes == ["E11", "E11.21", "E11.65", "E11.9"]
+
+
+def test_code_prefix_with_dot_and_limit(index):
+    assert index.search("E11.6") == [
+        {"code": "E11.65", "description": "Type 2 diabetes mellitus with hyperglycemia"}
+    ]
+    assert len(index.search("E", max_results=2)) == 2
+    assert index.search("S72.001")[0]["code"] == "S72.001A"
+
+
+def test_keyword_requires_all_words_and_ranks_short_titles_first(index):
+    results = index.search("diabetes type 2")
+    assert results[0] == {"code": "E11", "description": "Type 2 diabetes mellitus"}
+    assert {r["code"] for r in results} == {"E11", "E11.9", "E11.65", "E11.21"}
+
+
+def test_keyword_last_word_matches_as_prefix(index):
+    assert [r["code"] for r in index.search("hypert")] == ["I10", "I11.0"]
+    assert index.search("femur fract")[0]["code"] == "S72.001A"
+
+
+def test_keyword_falls_back_to_any_word(index):
+    codes = [r["code"] for r in index.search("hypertension nephropathy")]
+    assert set(codes) == {"I10", "E11.21"}
+
+
+def test_code_like_word_without_code_uses_keywords(index):
+    assert index.search("b12") == []
+    assert index.search("xyznonexistent") == []
+    assert index.search("  ") == []
+
+
+@pytest.mark.asyncio
+async def test_client_uses_index_without_network(index):
+    client = ICD10Client(index=index)
+    client.http.get = AsyncMock()
+
+    results = await client.search("diabetes type 2", max_results=1)
+
+    assert results == [{"code": "E11", "description": "Type 2 diabetes mellitus"}]
+    client.http.get.assert_not_called()
+    await client.close()
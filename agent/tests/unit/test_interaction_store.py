@@ -0,0 +1,161 @@
+"""Unit tests for the per-pair drug interaction store."""
+
+import os
+import tempfile
+
+import httpx
+import pytest
+
+from app.clients.interaction_store import (
+    InteractionPairStore,
+    group_by_pair,
+    pair_key,
+    unique_pairs,
+)
+from app.clients.openfda import DrugInteractionClient
+from app.persistence.ttl_cache import SqliteTTLCache
+
+LIST_URL = "https://rxnav.nlm.nih.gov/REST/interaction/list.json"
+
+
+def _pair(a, b, severity="high", description="Bleeding risk"):
+    return {
+        "severity": severity,
+        "description": description,
+        "interactionConcept": [
+            {"minConceptItem": {"rxcui": a, "name": f"drug{a}"}},
+            {"minConceptItem": {"rxcui": b, "name": f"drug{b}"}},
+        ],
+    }
+
+
+def _list_response(*pairs):
+    return {
+        "fullInteractionTypeGroup": [
+            {"fullInteractionType": [{"interactionPair": list(pairs)}]}
+        ]
+    }
+
+
+@pytest.fixture
+async def store():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = SqliteTTLCache(os.path.join(tmpdir, "cache.db"))
+        await cache.init_db()
+        yield InteractionPairStore(cache)
+        await cache.close()
+
+
+@pytest.fixture
+async def client(store):
+    c = DrugInteractionClient(interaction_store=store)
+    yield c
+    await c.close()
+
+
+def test_pair_key_is_order_independent():
+    assert pair_key("2670", "1191") == pair_key("1191", "2670") == "1191+2670"
+    assert pair_key("11289", "999") == "999+11289"
+
+
+def test_unique_pairs_skips_duplicates_and_self_pairs():
+    assert unique_pairs(["1", "2", "1", "3"]) == [("1", "2"), ("1", "3"), ("2", "3")]
+    assert unique_pairs(["1", "1"]) == []
+
+
+def test_group_by_pair_collapses_mirrored_pairs():
+    finding = {"severity": "high", "description": "x", "drugs": ["a", "b"]}
+    by_pair, unkeyed = group_by_pair([
+        {**finding, "rxcuis": ["1", "2"]},
+        {**finding, "rxcuis": ["2", "1"]},
+        {**finding, "rxcuis": ["", ""]},
+    ])
+    assert list(by_pair) == ["1+2"]
+    assert len(by_pair["1+2"]) == 1
+    assert len(unkeyed) == 1
+
+
+@pytest.mark.asyncio
+async def test_repeated_check_is_served_from_store(client, httpx_mock):
+    httpx_mock.add_response(
+        url=httpx.URL(LIST_URL, params={"rxcuis": "1+2+3"}),
+        json=_list_response(_pair("1", "2"), _pair("2", "1")),
+    )
+
+    first = await client.check_multi_interactions(["1", "2", "3"])
+    second = await client.check_multi_interactions(["3", "2", "1"])
+
+    assert len(first) == 1
+    assert first[0]["drugs"] == ["drug1", "drug2"]
+    assert second == first
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_added_drug_only_queries_missing_pairs(client, httpx_mock):
+    httpx_mock.add_response(
+        url=httpx.URL(LIST_URL, params={"rxcuis": "1+2"}),
+        json=_list_response(_pair("1", "2")),
+    )
+    httpx_mock.add_response(
+        url=httpx.URL(LIST_URL, params={"rxcuis": "1+3+2"}),
+        json=_list_response(_pair("1", "2"), _pair("3", "2", "moderate", "QT")),
+    )
+
+    await client.check_multi_interactions(["1", "2"])
+    results = await client.check_multi_interactions(["1", "2", "3"])
+    # Every pair is now known: no further request.
+    again = await client.check_multi_interactions(["2", "3"])
+
+    assert [r["description"] for r in results] == ["Bleeding risk", "QT"]
+    assert [r["description"] for r in again] == ["QT"]
+    assert len(httpx_mock.get_requests()) == 2
+
+
+@pytest.mark.asyncio
+async def test_pairs_without_interaction_are_stored(client, store, httpx_mock):
+    httpx_mock.add_response(
+        url=httpx.URL(LIST_URL, params={"rxcuis": "1+2"}),
+        json={},
+    )
+
+    assert await client.check_multi_interactions(["1", "2"]) == []
+    assert await client.check_multi_interactions(["2", "1"]) == []
+    assert await store.get_many(["1+2"]) == {"1+2": []}
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_stores_nothing(client, store, httpx_mock):
+    httpx_mock.add_response(
+        url=httpx.URL(LIST_URL, params={"rxcuis": "1+2"}), status_code=404
+    )
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.check_multi_interactions(["1", "2"])
+    assert await store.get_many(["1+2"]) == {}
+
+
+@pytest.mark.asyncio
+async def test_unattributed_results_block_negative_caching(client, store, httpx_mock):
+    """Findings RxNav reports without (or under other) RxCUIs come back on
+    every check, and no queried pair is cached as interaction-free."""
+    unkeyed = {
+        "severity": "high",
+        "description": "Serotonin syndrome",
+        "interactionConcept": [{"minConceptItem": {"name": "drugA"}},
+                               {"minConceptItem": {"name": "drugB"}}],
+    }
+    body = _list_response(_pair("1", "2"), _pair("8", "9", "moderate", "QT"), unkeyed)
+    httpx_mock.add_response(url=httpx.URL(LIST_URL, params={"rxcuis": "1+2+3"}), json=body)
+    # Only 1+2 was stored, so the re-check asks about the pairs with 3 again.
+    httpx_mock.add_response(url=httpx.URL(LIST_URL, params={"rxcuis": "1+3+2"}), json=body)
+
+    first = await client.check_multi_interactions(["1", "2", "3"])
+    second = await client.check_multi_interactions(["1", "2", "3"])
+
+    assert sorted(r["description"] for r in first) == [
+        "Bleeding risk", "QT", "Serotonin syndrome",
+    ]
+    assert second == first
+    assert await store.get_many(["1+2", "1+3", "2+3"]) == {"1+2": first[:1]}
@@ -0,0 +1,194 @@
+"""Unit tests for the offline BM25 literature index."""
+
+import gzip
+import os
+import tempfile
+
+import httpx
+import pytest
+
+from app.clients.eutils_scheduler import EUtilsScheduler
+from app.clients.literature_index import LiteratureIndex, build_index, read_baseline
+from app.clients.pubmed_client import PubMedClient
+from app.clients.retry import RetryPolicy
+
+
+def _article(pmid: str, title: str, abstract: str = "", mesh=()) -> dict:
+    return {
+        "pmid": pmid,
+        "title": title,
+        "authors": ["Smith J"],
+        "source": "BMJ",
+        "pubdate": "2024",
+        "abstract": abstract,
+        "mesh_terms": list(mesh),
+    }
+
+
+ARTICLES = [
+    _article("1", "Metformin dosing in chronic kidney disease",
+             "Renal function guides metformin dose.", ["Metformin"]),
+    _article("2", "Statin therapy after stroke",
+             "We also note metformin use was common."),
+    _article("3", "Insulin titration in type 2 diabetes", "Basal insulin."),
+    _article("4", "Warfarin and apixaban in atrial fibrillation", ""),
+]
+
+
+@pytest.fixture
+def index_path():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "pubmed.db")
+        build_index(ARTICLES, path)
+        yield path
+
+
+@pytest.fixture
+def index(index_path):
+    idx = LiteratureIndex(index_path)
+    yield idx
+    idx.close()
+
+
+def test_search_ranks_title_match_above_abstract_mention(index):
+    results = index.search("metformin renal dosing")
+
+    assert [r["pmid"] for r in results][:2] == ["1", "2"]
+    assert results[0] == {
+        "pmid": "1",
+        "title": "Metformin dosing in chronic kidney disease",
+        "authors": ["Smith J"],
+        "source": "BMJ",
+        "pubdate": "2024",
+    }
+
+
+def test_search_limits_and_handles_no_match(index):
+    assert len(index.search("metformin", max_results=1)) == 1
+    assert index.search("zzzunknown") == []
+    assert index.search("the of") == []
+    assert index.stats()["articles"] == 4
+
+
+def test_later_record_replaces_earlier_pmid():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "pubmed.db")
+        counts = build_index(
+            [_article("1", "Old title aspirin"), _article("1", "Corrected title heparin")],
+            path,
+        )
+        idx = LiteratureIndex(path)
+        try:
+            assert counts["articles"] == 1
+            assert idx.search("aspirin") == []
+            assert idx.search("heparin")[0]["title"] == "Corrected title heparin"
+        finally:
+            idx.close()
+
+
+def test_read_baseline_parses_gzipped_xml():
+    xml = (
+        "<PubmedArticleSet><PubmedArticle><MedlineCitation>"
+        "<PMID>42</PMID><Article><Journal><ISOAbbreviation>N Engl J Med"
+        "</ISOAbbreviation><JournalIssue><PubDate><Year>2023</Year><Month>Mar"
+        "</Month></PubDate></JournalIssue></Journal>"
+        "<ArticleTitle>Heparin dosing</ArticleTitle>"
+        "<Abstract><AbstractText>" + "word " * 2000 + "</AbstractText></Abstract>"
+        "<AuthorList><Author><LastName>Lee</LastName><Initials>C</Initials></Author>"
+        "</AuthorList></Article></MedlineCitation></PubmedArticle></PubmedArticleSet>"
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "pubmed25n0001.xml.gz")
+        with gzip.open(path, "wt") as f:
+            f.write(xml)
+        (article,) = list(read_baseline(path))
+
+    assert article["pmid"] == "42"
+    assert article["authors"] == ["Lee C"]
+    assert article["source"] == "N Engl J Med"
+    assert article["pubdate"] == "2023 Mar"
+    # Abstracts are indexed in full.
+    assert article["truncated"] is False
+
+
+@pytest.mark.asyncio
+async def test_client_local_mode_makes_no_calls(index, httpx_mock):
+    client = PubMedClient(local_index=index, local_mode="local")
+
+    results = await client.search("atrial fibrillation warfarin")
+    await client.close()
+
+    assert results[0]["pmid"] == "4"
+    assert httpx_mock.get_requests() == []
+
+
+@pytest.mark.asyncio
+async def test_client_falls_back_to_local_index_on_upstream_failure(index, httpx_mock):
+    httpx_mock.add_response(status_code=503, is_reusable=True)
+    client = PubMedClient(
+        retry=RetryPolicy(max_attempts=1),
+        scheduler=EUtilsScheduler(rate=1000.0),
+        local_index=index,
+        local_mode="fallback",
+    )
+
+    results = await client.search("insulin titration")
+    await client.close()
+
+    assert results[0]["pmid"] == "3"
+
+
+@pytest.mark.asyncio
+async def test_client_without_index_still_raises(httpx_mock):
+    httpx_mock.add_exception(httpx.ConnectError("down"), is_reusable=True)
+    client = PubMedClient(
+        retry=RetryPolicy(max_attempts=1), scheduler=EUtilsScheduler(rate=1000.0)
+    )
+
+    with pytest.raises(httpx.ConnectError):
+        await client.search("insulin")
+    await client.close()
+
+
+def test_abstracts_served_from_index(index):
+    records = index.abstracts(["3", "missing", "1"], max_tokens=4)
+
+    assert [r["pmid"] for r in records] == ["3", "1"]
+    assert records[0]["abstract"] == "Basal insulin."
+    assert records[0]["truncated"] is False
+    assert records[1]["mesh_terms"] == ["Metformin"]
+    assert records[1]["truncated"] is True
+
+
+@pytest.mark.asyncio
+async def test_client_local_mode_serves_abstracts_without_calls(index, httpx_mock):
+    client = PubMedClient(local_index=index, local_mode="local")
+
+    records = [a async for a in client.iter_abstracts(["1", "3"])]
+    await client.close()
+
+    assert [r["abstract"] for r in records] == [
+        "Renal function guides metformin dose.", "Basal insulin.",
+    ]
+    assert httpx_mock.get_requests() == []
+
+
+@pytest.mark.asyncio
+async def test_client_falls_back_to_index_abstracts_on_upstream_failure(index, httpx_mock):
+    httpx_mock.add_exception(httpx.ConnectError("down"), is_reusable=True)
+    client = PubMedClient(
+        retry=RetryPolicy(max_attempts=1),
+        scheduler=EUtilsScheduler(rate=1000.0),
+        local_index=index,
+        local_mode="fallback",
+    )
+
+    records = [a async for a in client.iter_abstracts(["3"])]
+    await client.close()
+
+    assert records[0]["abstract"] == "Basal insulin."
+
+
+def test_invalid_local_mode_rejected():
+    with pytest.raises(ValueError):
+        PubMedClient(local_mode="sometimes")
@@ -0,0 +1,113 @@
+"""Unit tests for Observation search filters and their client-side fallback."""
+
+from app.clients.observation_query import ObservationQuery
+
+
+def _entry(date: str, code: str = "4548-4", **extra) -> dict:
+    return {
+        "resource": {
+            "resourceType": "Observation",
+            "id": f"{code}-{date}",
+            "code": {"coding": [{"system": "http://loinc.org", "code": code}]},
+            "effectiveDateTime": date,
+            **extra,
+        }
+    }
+
+
+def test_search_params():
+    query = ObservationQuery(
+        date_from="2025-01-01",
+        date_to="2025-06-30",
+        codes=["4548-4", "http://example.org|X1"],
+        sort="-date",
+        count=10,
+        elements=["code", "valueQuantity"],
+    )
+
+    assert query.search_params() == {
+        "date": ["ge2025-01-01", "le2025-06-30"],
+        "code": "http://loinc.org|4548-4,http://example.org|X1",
+        "_sort": "-date",
+        "_count": "10",
+        "_elements": "code,valueQuantity,effectiveDateTime,effectivePeriod,issued",
+    }
+
+
+def test_no_filters_no_params():
+    assert ObservationQuery().search_params() == {}
+
+
+def test_date_window_is_inclusive():
+    query = ObservationQuery(date_from="2025-01-01", date_to="2025-01-31")
+
+    kept = query.filter_page([
+        _entry("2024-12-31T23:00:00Z"),
+        _entry("2025-01-01"),
+        _entry("2025-01-31T08:00:00Z"),
+        _entry("2025-02-01"),
+    ])
+
+    assert [e["resource"]["effectiveDateTime"][:10] for e in kept] == [
+        "2025-01-01",
+        "2025-01-31",
+    ]
+
+
+def test_code_filter_ignores_system_prefix():
+    query = ObservationQuery(codes=["http://loinc.org|2160-0"])
+
+    kept = query.filter_page([_entry("2025-01-01", "4548-4"), _entry("2025-01-01", "2160-0")])
+
+    assert [e["resource"]["id"] for e in kept] == ["2160-0-2025-01-01"]
+
+
+def test_elements_projection_keeps_mandatory_fields():
+    query = ObservationQuery(elements=["valueQuantity"])
+
+    kept = query.finalize(query.filter_page([
+        _entry("2025-01-01", valueQuantity={"value": 6.5}, text={"div": "<div/>"})
+    ]))
+
+    assert kept[0]["resource"] == {
+        "resourceType": "Observation",
+        "id": "4548-4-2025-01-01",
+        "valueQuantity": {"value": 6.5},
+    }
+
+
+def test_finalize_sorts_and_truncates_when_server_ignored_sort():
+    query = ObservationQuery(sort="-date", count=2)
+    entries = [_entry("2025-01-01"), _entry("2025-03-01"), _entry("2025-02-01")]
+
+    assert not query.is_ordered(entries)
+    result = query.finalize(entries)
+
+    assert [e["resource"]["effectiveDateTime"] for e in result] == [
+        "2025-03-01",
+        "2025-02-01",
+    ]
+
+
+def test_finalize_sorts_before_projecting_away_dates():
+    query = ObservationQuery(sort="-date", count=1, elements=["valueQuantity"])
+    entries = query.filter_page([
+        _entry("2025-01-01", valueQuantity={"value": 1}),
+        _entry("2025-03-01", valueQuantity={"value": 3}),
+    ])
+
+    result = query.finalize(entries)
+
+    assert [e["resource"]["valueQuantity"]["value"] for e in result] == [3]
+    assert "effectiveDateTime" not in result[0]["resource"]
+
+
+def test_sort_confirmed_only_by_self_link_echo():
+    query = ObservationQuery(sort="-date")
+    base = "http://openemr/fhir/Observation?patient=p1"
+
+    assert query.sort_confirmed({"link": [{"relation": "self", "url": base + "&_sort=-date"}]})
+    assert not query.sort_confirmed({"link": [{"relation": "self", "url": base}]})
+    assert not query.sort_confirmed({"link": [{"relation": "self", "url": base + "&_sort=date"}]})
+    assert not query.sort_confirmed({})
+    assert ObservationQuery().sort_confirmed({})
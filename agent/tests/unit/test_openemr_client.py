@@ -1,5 +1,6 @@
 """Unit tests for OpenEMR client with mocked HTTP responses."""
 
+import asyncio
 from unittest.mock import AsyncMock
 
 import httpx
@@ -215,3 +216,617 @@ async def test_unauthenticated_client_auto_authenticates():
     result = await client.get_patient("any-uuid")
     assert result["resourceType"] == "Patient"
     assert client._access_token == "test-access-token"
+
+
+@pytest.mark.asyncio
+async def test_get_chart_fetches_sections_concurrently():
+    """Sections overlap in flight, bounded by openemr_max_concurrency."""
+    client = _make_client()
+    client._fanout = asyncio.Semaphore(2)
+    in_flight = 0
+    peak = 0
+
+    async def slow_section(patient_uuid: str) -> dict:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"resourceType": "Bundle", "entry": []}
+
+    for name in ("get_patient", "get_conditions", "get_medications",
+                 "get_allergies", "get_vitals"):
+        setattr(client, name, slow_section)
+
+    chart = await client.get_chart("uuid-1")
+
+    assert peak == 2
+    assert set(chart["sections"]) == {
+        "patient", "conditions", "medications", "allergies", "vitals"
+    }
+    assert chart["errors"] == {}
+    assert set(chart["timings_ms"]) == set(chart["sections"])
+
+
+@pytest.mark.asyncio
+async def test_get_chart_partial_result_on_section_failure():
+    client = _make_client()
+    client.get_patient = AsyncMock(return_value=PATIENT_RESOURCE)
+    client.get_conditions = AsyncMock(side_effect=httpx.ConnectError("refused"))
+
+    chart = await client.get_chart("uuid-1", sections=["patient", "conditions"])
+
+    assert chart["sections"] == {"patient": PATIENT_RESOURCE}
+    assert chart["errors"] == {"conditions": "ConnectError: refused"}
+    assert set(chart["timings_ms"]) == {"patient", "conditions"}
+
+
+@pytest.mark.asyncio
+async def test_get_chart_rejects_unknown_section():
+    client = _make_client()
+
+    with pytest.raises(ValueError, match="labs"):
+        await client.get_chart("uuid-1", sections=["patient", "labs"])
+
+
+@pytest.mark.asyncio
+async def test_repeat_fhir_get_served_from_cache():
+    client = _make_client()
+    client.http.post = AsyncMock(
+        side_effect=[
+            _mock_response(REGISTRATION_RESPONSE),
+            _mock_response(TOKEN_RESPONSE),
+        ]
+    )
+    client.http.get = AsyncMock(return_value=_mock_response(BUNDLE_RESPONSE))
+
+    first = await client.get_conditions("uuid-1")
+    first["entry"].clear()  # callers get independent copies
+    second = await client.get_conditions("uuid-1")
+
+    assert client.http.get.call_count == 1
+    assert second["total"] == 1
+    assert len(second["entry"]) == 1
+    stats = client.cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_patient_forces_refetch():
+    client = _make_client()
+    client.http.post = AsyncMock(
+        side_effect=[
+            _mock_response(REGISTRATION_RESPONSE),
+            _mock_response(TOKEN_RESPONSE),
+        ]
+    )
+    client.http.get = AsyncMock(return_value=_mock_response(PATIENT_RESOURCE))
+
+    await client.get_patient("test-uuid-123")
+    await client.get_allergies("test-uuid-123")
+    assert client.invalidate_patient("test-uuid-123") == 2
+    await client.get_patient("test-uuid-123")
+
+    assert client.http.get.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_can_be_disabled():
+    client = _make_client()
+    client.cache = None
+    client.http.post = AsyncMock(
+        side_effect=[
+            _mock_response(REGISTRATION_RESPONSE),
+            _mock_response(TOKEN_RESPONSE),
+        ]
+    )
+    client.http.get = AsyncMock(return_value=_mock_response(PATIENT_RESOURCE))
+
+    await client.get_patient("uuid-1")
+    await client.get_patient("uuid-1")
+
+    assert client.http.get.call_count == 2
+    assert client.cache_stats() == {}
+
+
+@pytest.mark.asyncio
+async def test_expired_cache_entry_revalidated_with_etag():
+    client = _make_client()
+    client._access_token = "tok"
+    now = [1000.0]
+    client.cache._clock = lambda: now[0]
+    fresh = httpx.Response(
+        200,
+        json=BUNDLE_RESPONSE,
+        headers={"ETag": 'W/"3"', "Last-Modified": "Wed, 21 Oct 2026 07:28:00 GMT"},
+        request=httpx.Request("GET", "http://test"),
+    )
+    not_modified = httpx.Response(304, request=httpx.Request("GET", "http://test"))
+    client.http.get = AsyncMock(side_effect=[fresh, not_modified])
+
+    await client.get_conditions("uuid-1")
+    now[0] += 3600
+    second = await client.get_conditions("uuid-1")
+
+    assert second["total"] == 1
+    sent = client.http.get.call_args_list[1].kwargs["headers"]
+    assert sent["If-None-Match"] == 'W/"3"'
+    assert sent["If-Modified-Since"] == "Wed, 21 Oct 2026 07:28:00 GMT"
+    assert sent["Authorization"] == "Bearer tok"
+    stats = client.cache_stats()
+    assert stats["revalidations"] == 1
+    assert stats["bytes_saved"] == len(fresh.content)
+
+    # Renewed entry is served without another request.
+    await client.get_conditions("uuid-1")
+    assert client.http.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_changed_resource_replaces_cached_body():
+    client = _make_client()
+    client._access_token = "tok"
+    now = [1000.0]
+    client.cache._clock = lambda: now[0]
+    updated = {**PATIENT_RESOURCE, "gender": "male"}
+    client.http.get = AsyncMock(
+        side_effect=[
+            httpx.Response(
+                200,
+                json=PATIENT_RESOURCE,
+                headers={"ETag": '"1"'},
+                request=httpx.Request("GET", "http://test"),
+            ),
+            httpx.Response(
+                200,
+                json=updated,
+                headers={"ETag": '"2"'},
+                request=httpx.Request("GET", "http://test"),
+            ),
+        ]
+    )
+
+    await client.get_patient("test-uuid-123")
+    now[0] += 3600
+    patient = await client.get_patient("test-uuid-123")
+
+    assert patient["gender"] == "male"
+    assert client.cache.validators(
+        "fhir:Patient/test-uuid-123"
+    ) == {"If-None-Match": '"2"'}
+    assert client.cache_stats()["revalidations"] == 0
+
+
+@pytest.mark.asyncio
+async def test_unconditional_304_still_raises():
+    client = _make_client()
+    client._access_token = "tok"
+    client.http.get = AsyncMock(
+        return_value=httpx.Response(304, request=httpx.Request("GET", "http://test"))
+    )
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.get_patient("uuid-1")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_gets_are_coalesced():
+    client = _make_client()
+    client.cache = None
+    client._access_token = "test-access-token"
+
+    async def slow_get(*args, **kwargs) -> httpx.Response:
+        await asyncio.sleep(0.01)
+        return _mock_response(BUNDLE_RESPONSE)
+
+    client.http.get = AsyncMock(side_effect=slow_get)
+
+    results = await asyncio.gather(
+        client.get_vitals("uuid-1"),
+        client.get_vitals("uuid-1"),
+        client.get_vitals("uuid-1"),
+    )
+
+    assert client.http.get.call_count == 1
+    assert all(r["total"] == 1 for r in results)
+    assert client.coalescing_stats()["coalesced"] == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_401s_share_one_reauthentication():
+    client = _make_client()
+    client.cache = None
+    client.http.post = AsyncMock(
+        side_effect=[
+            _mock_response(REGISTRATION_RESPONSE),
+            _mock_response(TOKEN_RESPONSE),
+            _mock_response({**TOKEN_RESPONSE, "access_token": "refreshed-token"}),
+        ]
+    )
+    await client.authenticate()
+
+    async def get(url, headers=None, params=None) -> httpx.Response:
+        await asyncio.sleep(0.01)
+        if headers["Authorization"] == "Bearer test-access-token":
+            return _mock_response({}, status_code=401)
+        return _mock_response(PATIENT_RESOURCE)
+
+    client.http.get = AsyncMock(side_effect=get)
+
+    results = await asyncio.gather(
+        client.get_patient("a"), client.get_patient("b"), client.get_patient("c")
+    )
+
+    assert all(r["resourceType"] == "Patient" for r in results)
+    # Registration + initial token + exactly one refresh
+    assert client.http.post.call_count == 3
+    assert client._access_token == "refreshed-token"
+
+
+def _obs_page(ids: list[str], next_url: str | None = None) -> dict:
+    page: dict = {
+        "resourceType": "Bundle",
+        "type": "searchset",
+        "entry": [{"resource": {"resourceType": "Observation", "id": i}} for i in ids],
+    }
+    if next_url:
+        page["link"] = [
+            {"relation": "self", "url": "ignored"},
+            {"relation": "next", "url": next_url},
+        ]
+    return page
+
+
+def _paged_client(pages: dict[str, dict]) -> OpenEMRClient:
+    """Client whose GETs return pages keyed by the _offset query param."""
+    client = _make_client()
+    client._access_token = "test-access-token"
+
+    async def get(url, headers=None, params=None) -> httpx.Response:
+        return _mock_response(pages[(params or {}).get("_offset", "0")])
+
+    client.http.get = AsyncMock(side_effect=get)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_iter_bundle_follows_next_links():
+    # Next links use OpenEMR's public address, not the configured FHIR URL
+    next_base = "https://emr.example.com/apis/default/fhir/Observation"
+    client = _paged_client({
+        "0": _obs_page(["o1", "o2"], f"{next_base}?patient=p1&_count=2&_offset=2"),
+        "2": _obs_page(["o3", "o4"], f"{next_base}?patient=p1&_count=2&_offset=4"),
+        "4": _obs_page(["o5"]),
+    })
+
+    ids = [
+        entry["resource"]["id"]
+        async for entry in client.iter_bundle("Observation", {"patient": "p1"}, page_size=2)
+    ]
+
+    assert ids == ["o1", "o2", "o3", "o4", "o5"]
+    assert client.http.get.call_count == 3
+    first_url, = client.http.get.call_args_list[0][0]
+    assert first_url == "http://openemr:80/apis/default/fhir/Observation"
+    assert client.http.get.call_args_list[0][1]["params"]["_count"] == "2"
+    second_url, = client.http.get.call_args_list[1][0]
+    assert second_url == "http://openemr:80/apis/default/fhir/Observation"
+    assert client.http.get.call_args_list[1][1]["params"]["_offset"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_iter_bundle_can_stop_early():
+    url = "http://openemr:80/apis/default/fhir/Observation?patient=p1&_offset=2"
+    client = _paged_client({"0": _obs_page(["o1", "o2"], url), "2": _obs_page(["o3"])})
+
+    async for entry in client.iter_bundle("Observation", {"patient": "p1"}):
+        assert entry["resource"]["id"] == "o1"
+        break
+
+    assert client.http.get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_observations_merges_all_pages():
+    url = "http://openemr:80/apis/default/fhir/Observation?patient=p1&_offset=2"
+    client = _paged_client({"0": _obs_page(["o1", "o2"], url), "2": _obs_page(["o3"])})
+
+    bundle = await client.get_observations("p1")
+
+    assert [e["resource"]["id"] for e in bundle["entry"]] == ["o1", "o2", "o3"]
+    assert "link" not in bundle
+    assert bundle["resourceType"] == "Bundle"
+
+
+@pytest.mark.asyncio
+async def test_merged_bundle_capped_at_max_entries():
+    url = "http://openemr:80/apis/default/fhir/Observation?patient=p1&_offset=2"
+    client = _paged_client({"0": _obs_page(["o1", "o2"], url), "2": _obs_page(["o3"])})
+    client.settings.openemr_max_bundle_entries = 2
+
+    bundle = await client.get_observations("p1")
+
+    assert [e["resource"]["id"] for e in bundle["entry"]] == ["o1", "o2"]
+    assert client.http.get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_self_referencing_next_link_does_not_loop():
+    url = "http://openemr:80/apis/default/fhir/Observation?patient=p1&_offset=2"
+    client = _paged_client({"0": _obs_page(["o1"], url), "2": _obs_page(["o2"], url)})
+
+    bundle = await client.get_observations("p1")
+
+    assert [e["resource"]["id"] for e in bundle["entry"]] == ["o1", "o2"]
+
+
+
+def _batch_response(*entries: tuple[str, dict | None]) -> dict:
+    return {
+        "resourceType": "Bundle",
+        "type": "batch-response",
+        "entry": [
+            {"response": {"status": status}, **({"resource": r} if r else {})}
+            for status, r in entries
+        ],
+    }
+
+
+def _authenticated_client() -> OpenEMRClient:
+    client = _make_client()
+    client._access_token = "test-access-token"
+    return client
+
+
+@pytest.mark.asyncio
+async def test_execute_batch_posts_one_bundle():
+    client = _authenticated_client()
+    client.http.post = AsyncMock(return_value=_mock_response(_batch_response(
+        ("200 OK", PATIENT_RESOURCE),
+        ("200 OK", BUNDLE_RESPONSE),
+    )))
+    client.http.get = AsyncMock()
+
+    results = await client.execute_batch([
+        ("Patient/test-uuid-123", None),
+        ("Condition", {"patient": "test-uuid-123"}),
+    ])
+
+    assert results == [PATIENT_RESOURCE, BUNDLE_RESPONSE]
+    client.http.get.assert_not_called()
+    url, = client.http.post.call_args[0]
+    assert url == "http://openemr:80/apis/default/fhir"
+    sent = client.http.post.call_args[1]["json"]
+    assert sent["type"] == "batch"
+    assert [e["request"]["url"] for e in sent["entry"]] == [
+        "Patient/test-uuid-123",
+        "Condition?patient=test-uuid-123",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_execute_batch_reports_failed_entries():
+    client = _authenticated_client()
+    client.http.post = AsyncMock(return_value=_mock_response(_batch_response(
+        ("200 OK", PATIENT_RESOURCE),
+        ("404 Not Found", None),
+    )))
+
+    results = await client.execute_batch([
+        ("Patient/test-uuid-123", None),
+        ("Patient/missing", None),
+    ])
+
+    assert results[0] == PATIENT_RESOURCE
+    assert isinstance(results[1], RuntimeError)
+    assert "404" in str(results[1])
+
+
+@pytest.mark.asyncio
+async def test_execute_batch_results_are_cached():
+    client = _authenticated_client()
+    client.http.post = AsyncMock(return_value=_mock_response(_batch_response(
+        ("200 OK", PATIENT_RESOURCE),
+        ("200 OK", BUNDLE_RESPONSE),
+    )))
+    client.http.get = AsyncMock()
+    requests = [
+        ("Patient/test-uuid-123", None),
+        ("Condition", {"patient": "test-uuid-123"}),
+    ]
+
+    await client.execute_batch(requests)
+    again = await client.execute_batch(requests)
+    conditions = await client._fhir_get("Condition", {"patient": "test-uuid-123"})
+
+    assert again == [PATIENT_RESOURCE, BUNDLE_RESPONSE]
+    assert conditions == BUNDLE_RESPONSE
+    assert client.http.post.call_count == 1
+    client.http.get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_execute_batch_falls_back_when_rejected():
+    client = _authenticated_client()
+    client.http.post = AsyncMock(return_value=_mock_response(
+        {"resourceType": "OperationOutcome"}, status_code=405
+    ))
+
+    async def get(url, headers=None, params=None) -> httpx.Response:
+        if url.endswith("Patient/test-uuid-123"):
+            return _mock_response(PATIENT_RESOURCE)
+        return _mock_response(BUNDLE_RESPONSE)
+
+    client.http.get = AsyncMock(side_effect=get)
+    requests = [
+        ("Patient/test-uuid-123", None),
+        ("Condition", {"patient": "test-uuid-123"}),
+    ]
+
+    results = await client.execute_batch(requests)
+
+    assert results == [PATIENT_RESOURCE, BUNDLE_RESPONSE]
+    assert client.http.get.call_count == 2
+    assert client._batch_supported is False
+
+    # Batching is not attempted again once rejected
+    client.cache.clear()
+    await client.execute_batch(requests)
+    assert client.http.post.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_chart_falls_back_when_batch_response_is_not_json():
+    """A 200 HTML page (e.g. a proxy interstitial) must not fail the chart."""
+    client = _authenticated_client()
+    client.settings.openemr_fhir_batch = True
+    client.http.post = AsyncMock(return_value=httpx.Response(
+        200,
+        text="<html><body>Please wait...</body></html>",
+        request=httpx.Request("POST", "http://test"),
+    ))
+
+    async def get(url, headers=None, params=None) -> httpx.Response:
+        if url.endswith("Patient/test-uuid-123"):
+            return _mock_response(PATIENT_RESOURCE)
+        return _mock_response(BUNDLE_RESPONSE)
+
+    client.http.get = AsyncMock(side_effect=get)
+
+    chart = await client.get_chart("test-uuid-123", sections=["patient", "conditions"])
+
+    assert chart["errors"] == {}
+    assert chart["sections"]["patient"] == PATIENT_RESOURCE
+    assert chart["sections"]["conditions"]["entry"] == BUNDLE_RESPONSE["entry"]
+    assert client.http.get.call_count == 2
+    # Likely transient, so batching is tried again next time
+    assert client._batch_supported is True
+
+
+@pytest.mark.asyncio
+async def test_get_chart_uses_batch_when_enabled():
+    client = _authenticated_client()
+    client.settings.openemr_fhir_batch = True
+    client.http.post = AsyncMock(return_value=_mock_response(_batch_response(
+        ("200 OK", PATIENT_RESOURCE),
+        ("200 OK", BUNDLE_RESPONSE),
+        ("500 Internal Server Error", None),
+    )))
+    client.http.get = AsyncMock()
+
+    chart = await client.get_chart(
+        "test-uuid-123", sections=["patient", "conditions", "vitals"]
+    )
+
+    assert client.http.post.call_count == 1
+    client.http.get.assert_not_called()
+    assert chart["sections"]["patient"] == PATIENT_RESOURCE
+    assert chart["sections"]["conditions"]["entry"] == BUNDLE_RESPONSE["entry"]
+    assert "500" in chart["errors"]["vitals"]
+    assert set(chart["timings_ms"]) == {"patient", "conditions", "vitals"}
+    sent = client.http.post.call_args[1]["json"]
+    assert sent["entry"][2]["request"]["url"] == (
+        "Observation?patient=test-uuid-123&category=vital-signs&_count=100"
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_observations_sends_filters_to_server():
+    client = _authenticated_client()
+    client.http.get = AsyncMock(return_value=_mock_response(_obs_page([])))
+
+    await client.get_observations(
+        "p1",
+        category="laboratory",
+        date_from="2025-01-01",
+        codes=["4548-4"],
+        sort="-date",
+        count=5,
+        elements=["code"],
+    )
+
+    params = client.http.get.call_args.kwargs["params"]
+    assert params == {
+        "patient": "p1",
+        "category": "laboratory",
+        "date": "ge2025-01-01",
+        "code": "http://loinc.org|4548-4",
+        "_sort": "-date",
+        "_count": "5",
+        "_elements": "code,effectiveDateTime,effectivePeriod,issued",
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_observations_filters_client_side_when_server_ignores_params():
+    """A server that ignores date/_sort/_count still yields the right answer."""
+    def obs(i: str, date: str) -> dict:
+        return {"resource": {"resourceType": "Observation", "id": i, "effectiveDateTime": date}}
+
+    url = "http://openemr:80/apis/default/fhir/Observation?patient=p1&_offset=2"
+    pages = {
+        "0": {"resourceType": "Bundle", "entry": [obs("old", "2020-01-01"), obs("a", "2025-02-01")],
+              "link": [{"relation": "next", "url": url}]},
+        "2": {"resourceType": "Bundle", "entry": [obs("b", "2025-05-01"), obs("c", "2025-03-01")]},
+    }
+    client = _paged_client(pages)
+
+    bundle = await client.get_observations("p1", date_from="2025-01-01", sort="-date", count=2)
+
+    assert [e["resource"]["id"] for e in bundle["entry"]] == ["b", "c"]
+    assert client.http.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_observations_stops_paging_when_server_sorted():
+    def obs(i: str, date: str) -> dict:
+        return {"resource": {"resourceType": "Observation", "id": i, "effectiveDateTime": date}}
+
+    url = "http://openemr:80/apis/default/fhir/Observation?patient=p1&_offset=2"
+    pages = {
+        "0": {"resourceType": "Bundle", "entry": [obs("a", "2025-05-01"), obs("b", "2025-04-01")],
+              "link": [
+                  {"relation": "self",
+                   "url": "http://openemr:80/apis/default/fhir/Observation?patient=p1&_sort=-date"},
+                  {"relation": "next", "url": url},
+              ]},
+        "2": {"resourceType": "Bundle", "entry": [obs("c", "2025-03-01")]},
+    }
+    client = _paged_client(pages)
+
+    bundle = await client.get_observations("p1", sort="-date", count=2)
+
+    assert [e["resource"]["id"] for e in bundle["entry"]] == ["a", "b"]
+    assert client.http.get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_observations_reads_all_pages_when_sort_not_confirmed():
+    """count=1 against a server that ignores _sort: a one-entry page looks
+    ordered, but only a self link echoing _sort may end paging early."""
+    def obs(i: str, date: str, **extra) -> dict:
+        return {"resource": {"resourceType": "Observation", "id": i, **extra,
+                             "effectiveDateTime": date}}
+
+    url = "http://openemr:80/apis/default/fhir/Observation?patient=p1&_offset=1"
+    pages = {
+        "0": {"resourceType": "Bundle", "entry": [obs("old", "2020-01-01")],
+              "link": [
+                  {"relation": "self",
+                   "url": "http://openemr:80/apis/default/fhir/Observation?patient=p1"},
+                  {"relation": "next", "url": url},
+              ]},
+        "1": {"resourceType": "Bundle", "entry": [obs("latest", "2025-06-01", status="final")]},
+    }
+    client = _paged_client(pages)
+
+    bundle = await client.get_observations(
+        "p1", sort="-date", count=1, elements=["status"]
+    )
+
+    assert [e["resource"]["id"] for e in bundle["entry"]] == ["latest"]
+    assert bundle["entry"][0]["resource"] == {
+        "resourceType": "Observation", "id": "latest", "status": "final",
+    }
+    assert client.http.get.call_count == 2
@@ -0,0 +1,169 @@
+"""Unit tests for the panel-wide interaction screening job and its store."""
+
+import asyncio
+import os
+import tempfile
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.clients.openfda import DrugInteractionClient
+from app.jobs.panel_screening import PanelResolver, PanelScreeningJob, medication_names
+from app.persistence.screening import ScreeningStore
+
+PANEL = {
+    "p1": ["Warfarin 5mg", "Aspirin 81mg"],
+    "p2": ["aspirin 81mg", "Metformin 500mg", "warfarin 5MG"],
+    "p3": ["Metformin 500mg"],
+    "p4": ["Lisinopril 10mg", "Metformin 500mg"],
+}
+
+
+def _bundle(names, status="active"):
+    return {
+        "entry": [
+            {"resource": {"status": status, "medicationCodeableConcept": {"text": n}}}
+            for n in names
+        ]
+    }
+
+
+def _make_openemr(panel=PANEL, fail=()):
+    openemr = MagicMock()
+
+    async def iter_bundle(path, params=None):
+        for uuid in panel:
+            yield {"resource": {"resourceType": "Patient", "id": uuid}}
+
+    async def get_medications(uuid):
+        await asyncio.sleep(0)
+        if uuid in fail:
+            raise ConnectionError("OpenEMR down")
+        return _bundle(panel[uuid])
+
+    openemr.iter_bundle = iter_bundle
+    openemr.get_medications = AsyncMock(side_effect=get_medications)
+    return openemr
+
+
+@pytest.fixture
+async def drug():
+    client = DrugInteractionClient()
+
+    async def resolve(name):
+        await asyncio.sleep(0.01)
+        key = name.split()[0].lower()
+        return {
+            "rxcui": key,
+            "name": key,
+            "resolution_tier": 1,
+            "confidence": 1.0,
+            "candidates": [],
+            "ambiguous": False,
+            "original_name": name,
+        }
+
+    async def interactions(rxcuis):
+        if {"warfarin", "aspirin"} <= set(rxcuis):
+            return [{"severity": "high", "description": "Bleeding", "drugs": []}]
+        return []
+
+    client.resolve_drug_name = AsyncMock(side_effect=resolve)
+    client.check_multi_interactions = AsyncMock(side_effect=interactions)
+    yield client
+    await client.close()
+
+
+@pytest.fixture
+async def store():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        s = ScreeningStore(os.path.join(tmpdir, "agent.db"))
+        await s.init_db()
+        yield s
+        await s.close()
+
+
+def test_medication_names_skips_inactive_and_duplicates():
+    bundle = _bundle(["Aspirin 81mg", "aspirin  81MG", "Warfarin"])
+    bundle["entry"] += _bundle(["Ibuprofen"], status="stopped")["entry"]
+    bundle["entry"].append(
+        {"resource": {"medicationCodeableConcept": {"coding": [{"display": "Lasix"}]}}}
+    )
+    assert medication_names(bundle) == ["Aspirin 81mg", "Warfarin", "Lasix"]
+
+
+def test_medication_names_match_get_medications_extraction():
+    """A data-absent coding is skipped the same way the tool skips it."""
+    absent = "http://terminology.hl7.org/CodeSystem/data-absent-reason"
+    concept = {"coding": [{"system": absent, "code": "unknown"}, {"code": "Metformin"}]}
+    bundle = {"entry": [{"resource": {"medicationCodeableConcept": concept}}]}
+    assert medication_names(bundle) == ["Metformin"]
+
+
+@pytest.mark.asyncio
+async def test_resolver_shares_in_flight_lookups(drug):
+    resolver = PanelResolver(drug.resolve_drug_name)
+
+    results = await asyncio.gather(
+        resolver("Aspirin 81mg"), resolver("aspirin 81MG"), resolver("Warfarin")
+    )
+
+    assert results[1]["original_name"] == "aspirin 81MG"
+    assert results[0]["rxcui"] == results[1]["rxcui"] == "aspirin"
+    assert drug.resolve_drug_name.await_count == 2
+    assert (resolver.lookups, resolver.distinct) == (3, 2)
+
+
+@pytest.mark.asyncio
+async def test_job_screens_panel_and_dedupes_drugs(drug, store):
+    job = PanelScreeningJob(_make_openemr(), drug, store, concurrency=2)
+
+    run = await job.run("run-1")
+
+    assert run.finished_at is not None
+    assert run.patients_done == 4
+    assert run.stats["distinct_drugs"] == 4
+    assert run.stats["interactions_found"] == 2
+    assert run.stats["patients_per_min"] > 0
+    # p3 has a single drug, so only three lists needed resolving.
+    assert drug.resolve_drug_name.await_count == 4
+
+    p2 = await store.get_latest("p2")
+    assert p2["run_id"] == "run-1"
+    assert p2["interactions"][0]["description"] == "Bleeding"
+    assert p2["check_complete"] is True
+    assert (await store.get_latest("p3"))["medications"] == ["Metformin 500mg"]
+    assert await store.get_latest("nobody") is None
+
+
+@pytest.mark.asyncio
+async def test_failed_patients_are_retried_on_resume(drug, store):
+    failing = PanelScreeningJob(_make_openemr(fail={"p2"}), drug, store)
+    first = await failing.run("run-1")
+
+    assert first.finished_at is None
+    assert (first.patients_done, first.patients_failed) == (3, 1)
+    assert (await store.latest_unfinished_run()).run_id == "run-1"
+
+    openemr = _make_openemr()
+    resumed = await PanelScreeningJob(openemr, drug, store).run("run-1")
+
+    assert resumed.finished_at is not None
+    assert (resumed.patients_done, resumed.patients_failed) == (4, 0)
+    openemr.get_medications.assert_awaited_once_with("p2")
+    assert await store.latest_unfinished_run() is None
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_keeps_checkpoint(drug, store):
+    openemr = _make_openemr()
+    openemr.get_medications.side_effect = [_bundle(PANEL["p1"]), asyncio.CancelledError()]
+    job = PanelScreeningJob(openemr, drug, store, concurrency=1)
+
+    with pytest.raises(asyncio.CancelledError):
+        await job.run("run-1")
+
+    assert await store.screened_patients("run-1") == {"p1"}
+    run = await store.get_run("run-1")
+    assert run.finished_at is None
+    assert run.patients_done == 1
@@ -0,0 +1,111 @@
+"""Unit tests for the persistent PubMed query and summary cache."""
+
+import os
+import tempfile
+
+import httpx
+import pytest
+
+from app.clients.eutils_scheduler import EUtilsScheduler
+from app.clients.pubmed_client import PubMedClient
+from app.persistence.ttl_cache import SqliteTTLCache
+
+
+def _article(pmid: str) -> dict:
+    return {
+        "title": f"Article {pmid}",
+        "authors": [{"name": "Smith J"}],
+        "source": "JAMA",
+        "pubdate": "2024",
+    }
+
+
+class FakeEUtils:
+    """Answers esearch from a fixed term -> PMIDs map and esummary for any ids."""
+
+    def __init__(self, searches: dict[str, list[str]]) -> None:
+        self.searches = searches
+        self.calls: list[tuple[str, str]] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        endpoint = request.url.path.rsplit("/", 1)[-1]
+        params = request.url.params
+        if endpoint == "esearch.fcgi":
+            self.calls.append(("esearch", params["term"]))
+            ids = self.searches.get(params["term"], [])[: int(params["retmax"])]
+            return httpx.Response(200, json={"esearchresult": {"idlist": ids}})
+        self.calls.append(("esummary", params["id"]))
+        ids = params["id"].split(",")
+        return httpx.Response(
+            200, json={"result": {"uids": ids, **{i: _article(i) for i in ids}}}
+        )
+
+
+@pytest.fixture
+async def cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        c = SqliteTTLCache(os.path.join(tmpdir, "cache.db"))
+        await c.init_db()
+        yield c
+        await c.close()
+
+
+@pytest.fixture
+async def client(cache):
+    c = PubMedClient(scheduler=EUtilsScheduler(rate=1000.0), cache=cache)
+    yield c
+    await c.close()
+
+
+@pytest.mark.asyncio
+async def test_repeat_query_makes_no_calls(client, httpx_mock):
+    eutils = FakeEUtils({"metformin renal dosing": ["1", "2"]})
+    httpx_mock.add_callback(eutils, is_reusable=True)
+
+    first = await client.search("metformin renal dosing")
+    second = await client.search("  Metformin   renal dosing")
+
+    assert second == first
+    assert [a["pmid"] for a in first] == ["1", "2"]
+    assert eutils.calls == [
+        ("esearch", "metformin renal dosing"),
+        ("esummary", "1,2"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_summaries_shared_across_queries(client, httpx_mock):
+    eutils = FakeEUtils({"metformin": ["1", "2"], "metformin ckd": ["2", "3"]})
+    httpx_mock.add_callback(eutils, is_reusable=True)
+
+    await client.search("metformin")
+    results = await client.search("metformin ckd")
+
+    assert [a["pmid"] for a in results] == ["2", "3"]
+    # Only the article not seen before is summarized.
+    assert eutils.calls[-1] == ("esummary", "3")
+
+
+@pytest.mark.asyncio
+async def test_larger_cached_list_answers_smaller_request(client, httpx_mock):
+    eutils = FakeEUtils({"statins": ["1", "2", "3"]})
+    httpx_mock.add_callback(eutils, is_reusable=True)
+
+    await client.search("statins", max_results=3)
+    smaller = await client.search("statins", max_results=2)
+    calls = len(eutils.calls)
+    await client.search("statins", max_results=5)
+
+    assert [a["pmid"] for a in smaller] == ["1", "2"]
+    assert calls == 2
+    assert eutils.calls[-1] == ("esearch", "statins")
+
+
+@pytest.mark.asyncio
+async def test_empty_result_is_cached(client, httpx_mock):
+    eutils = FakeEUtils({})
+    httpx_mock.add_callback(eutils, is_reusable=True)
+
+    assert await client.search("xyznonexistent") == []
+    assert await client.search("xyznonexistent") == []
+    assert len(eutils.calls) == 1
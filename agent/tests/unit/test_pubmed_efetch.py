@@ -0,0 +1,119 @@
+"""Unit tests for streaming PubMed abstract retrieval (efetch)."""
+
+import httpx
+import pytest
+
+from app.clients import pubmed_client as pubmed_module
+from app.clients.eutils_scheduler import EUtilsScheduler
+from app.clients.pubmed_client import PubMedClient
+from app.clients.pubmed_efetch import ArticleStream, truncate_to_tokens
+
+
+def _article_xml(pmid: str, abstract: str = "Metformin lowers HbA1c.") -> str:
+    return (
+        "<PubmedArticle><MedlineCitation>"
+        f"<PMID Version=\"1\">{pmid}</PMID>"
+        f"<Article><ArticleTitle>Study <i>{pmid}</i></ArticleTitle>"
+        "<Abstract>"
+        f"<AbstractText Label=\"BACKGROUND\">{abstract}</AbstractText>"
+        "<AbstractText Label=\"RESULTS\">It worked.</AbstractText>"
+        "</Abstract></Article>"
+        "<MeshHeadingList><MeshHeading>"
+        "<DescriptorName UI=\"D008687\">Metformin</DescriptorName>"
+        "</MeshHeading></MeshHeadingList>"
+        "</MedlineCitation></PubmedArticle>"
+    )
+
+
+def _efetch_body(pmids: list[str]) -> bytes:
+    articles = "".join(_article_xml(p) for p in pmids)
+    return (
+        '<?xml version="1.0" ?>\n'
+        '<!DOCTYPE PubmedArticleSet PUBLIC "-//NLM//DTD PubMedArticle, 1st January '
+        '2024//EN" "https://dtd.nlm.nih.gov/ncbi/pubmed/out/pubmed_240101.dtd">\n'
+        f"<PubmedArticleSet>{articles}</PubmedArticleSet>"
+    ).encode()
+
+
+def test_stream_yields_articles_across_chunk_boundaries():
+    body = _efetch_body(["1", "2", "3"])
+    stream = ArticleStream()
+
+    articles = []
+    for i in range(0, len(body), 37):
+        articles.extend(stream.feed(body[i:i + 37]))
+    articles.extend(stream.close())
+
+    assert [a["pmid"] for a in articles] == ["1", "2", "3"]
+    assert articles[0]["title"] == "Study 1"
+    assert articles[0]["abstract"] == (
+        "BACKGROUND: Metformin lowers HbA1c.\nRESULTS: It worked."
+    )
+    assert articles[0]["mesh_terms"] == ["Metformin"]
+    assert articles[0]["truncated"] is False
+
+
+def test_stream_releases_parsed_articles():
+    stream = ArticleStream()
+    list(stream.feed(_efetch_body(["1", "2"])))
+
+    assert stream._root is not None
+    assert len(stream._root) == 0
+
+
+def test_truncate_to_tokens_cuts_at_word_boundary():
+    text = "word " * 100
+
+    short, truncated = truncate_to_tokens(text, 10)
+
+    assert truncated is True
+    assert len(short) <= 10 * 4 + 2
+    assert short.endswith("word …")
+    assert truncate_to_tokens("brief", 10) == ("brief", False)
+
+
+@pytest.mark.asyncio
+async def test_iter_abstracts_fetches_small_sets_by_id(httpx_mock):
+    httpx_mock.add_response(content=_efetch_body(["11", "22"]))
+    client = PubMedClient(scheduler=EUtilsScheduler(rate=1000.0))
+
+    articles = [a async for a in client.iter_abstracts(["11", "22", "11"], max_tokens=5)]
+    await client.close()
+
+    assert [a["pmid"] for a in articles] == ["11", "22"]
+    assert all(a["truncated"] for a in articles)
+    request = httpx_mock.get_requests()[0]
+    assert request.url.path.endswith("/efetch.fcgi")
+    assert request.url.params["id"] == "11,22"
+
+
+@pytest.mark.asyncio
+async def test_iter_abstracts_uses_history_server_for_large_sets(
+    httpx_mock, monkeypatch
+):
+    monkeypatch.setattr(pubmed_module, "EFETCH_MAX_IDS", 2)
+    pmids = ["1", "2", "3"]
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/epost.fcgi"):
+            return httpx.Response(
+                200,
+                content=b"<ePostResult><QueryKey>1</QueryKey>"
+                b"<WebEnv>MCID_abc</WebEnv></ePostResult>",
+            )
+        start = int(request.url.params["retstart"])
+        return httpx.Response(200, content=_efetch_body(pmids[start:start + 2]))
+
+    httpx_mock.add_callback(respond, is_reusable=True)
+    client = PubMedClient(scheduler=EUtilsScheduler(rate=1000.0))
+
+    articles = [a async for a in client.iter_abstracts(pmids)]
+    await client.close()
+
+    assert [a["pmid"] for a in articles] == pmids
+    epost, *pages = httpx_mock.get_requests()
+    assert epost.method == "POST"
+    assert b"id=1%2C2%2C3" in epost.content
+    assert [p.url.params["retstart"] for p in pages] == ["0", "2"]
+    assert all(p.url.params["WebEnv"] == "MCID_abc" for p in pages)
+    assert all("id" not in p.url.params for p in pages)
@@ -0,0 +1,111 @@
+"""Unit tests for the patient-scoped OpenEMR response cache."""
+
+from app.clients.response_cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_key_ignores_param_order():
+    a = ResponseCache.make_key("fhir:Observation", {"patient": "p1", "category": "laboratory"})
+    b = ResponseCache.make_key("fhir:Observation", {"category": "laboratory", "patient": "p1"})
+    assert a == b
+    assert ResponseCache.make_key("fhir:Patient/p1") == "fhir:Patient/p1"
+
+
+def test_hit_and_miss_counters():
+    cache = ResponseCache()
+    assert cache.get("k") is None
+    cache.set("k", b'{"a": 1}', resource_type="Patient")
+    assert cache.get("k") == b'{"a": 1}'
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+    assert stats["bytes"] == 8
+
+
+def test_ttl_per_resource_type():
+    clock = FakeClock()
+    cache = ResponseCache(ttls={"Observation": 10.0, "Patient": 100.0}, clock=clock)
+    cache.set("obs", b"1", resource_type="Observation")
+    cache.set("pat", b"2", resource_type="Patient")
+
+    clock.now += 50
+    assert cache.get("obs") is None
+    assert cache.get("pat") == b"2"
+
+
+def test_lru_eviction_by_bytes():
+    cache = ResponseCache(max_bytes=10)
+    cache.set("a", b"aaaa", resource_type="Patient")
+    cache.set("b", b"bbbb", resource_type="Patient")
+    cache.get("a")  # a is now most recently used
+    cache.set("c", b"cccc", resource_type="Patient")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 8
+
+
+def test_oversized_body_not_cached():
+    cache = ResponseCache(max_bytes=4)
+    cache.set("big", b"0123456789", resource_type="Patient")
+    assert cache.get("big") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_invalidate_patient():
+    cache = ResponseCache()
+    cache.set("p1-cond", b"1", resource_type="Condition", patient_uuid="p1")
+    cache.set("p1-meds", b"2", resource_type="MedicationRequest", patient_uuid="p1")
+    cache.set("p2-cond", b"3", resource_type="Condition", patient_uuid="p2")
+
+    assert cache.invalidate_patient("p1") == 2
+    assert cache.get("p1-cond") is None
+    assert cache.get("p1-meds") is None
+    assert cache.get("p2-cond") == b"3"
+    assert cache.invalidate_patient("p1") == 0
+
+
+def test_expired_entry_with_validators_kept_for_revalidation():
+    clock = FakeClock()
+    cache = ResponseCache(ttls={"Observation": 10.0}, clock=clock)
+    cache.set("obs", b"12345", resource_type="Observation", etag='W/"v1"')
+    cache.set("plain", b"1", resource_type="Observation")
+
+    clock.now += 20
+    assert cache.get("obs") is None
+    assert cache.get("plain") is None
+    assert cache.validators("obs") == {"If-None-Match": 'W/"v1"'}
+    assert cache.validators("plain") == {}
+
+    assert cache.revalidate("obs") == b"12345"
+    assert cache.get("obs") == b"12345"
+    stats = cache.stats()
+    assert stats["revalidations"] == 1
+    assert stats["bytes_saved"] == 5
+
+
+def test_validators_include_last_modified():
+    cache = ResponseCache()
+    cache.set(
+        "pat",
+        b"1",
+        resource_type="Patient",
+        etag='"abc"',
+        last_modified="Wed, 21 Oct 2026 07:28:00 GMT",
+    )
+    assert cache.validators("pat") == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Wed, 21 Oct 2026 07:28:00 GMT",
+    }
+    assert cache.revalidate("missing") is None
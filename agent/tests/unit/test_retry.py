@@ -0,0 +1,172 @@
+"""Unit tests for the idempotent-GET retry policy."""
+
+import httpx
+import pytest
+
+from app.clients.metrics import RequestMetrics, current_metrics
+from app.clients.retry import RetryPolicy, RetryTransport, retry_after_seconds
+from app.config import Settings
+
+
+class Sleeps:
+    def __init__(self) -> None:
+        self.delays: list[float] = []
+
+    async def __call__(self, delay: float) -> None:
+        self.delays.append(delay)
+
+
+def _client(statuses, policy=None, headers=None, sleep=None):
+    """AsyncClient whose stand-in server answers with each status in turn."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        status = statuses[min(len(calls), len(statuses)) - 1]
+        if isinstance(status, Exception):
+            raise status
+        return httpx.Response(status, headers=headers or {}, json={"n": len(calls)})
+
+    transport = RetryTransport(
+        httpx.MockTransport(handler), policy, client="rxnav", sleep=sleep or Sleeps()
+    )
+    return httpx.AsyncClient(transport=transport), calls
+
+
+@pytest.mark.asyncio
+async def test_get_retried_until_success():
+    sleeps = Sleeps()
+    http, calls = _client([503, 502, 200], sleep=sleeps)
+
+    resp = await http.get("http://rxnav.test/x")
+
+    assert resp.status_code == 200
+    assert resp.json() == {"n": 3}
+    assert len(calls) == 3
+    # Full jitter: each delay is within [0, base * 2^(attempt-1)].
+    assert 0 <= sleeps.delays[0] <= 0.2
+    assert 0 <= sleeps.delays[1] <= 0.4
+
+
+@pytest.mark.asyncio
+async def test_last_failure_returned_when_attempts_exhausted():
+    http, calls = _client([503], RetryPolicy(max_attempts=2))
+
+    resp = await http.get("http://rxnav.test/x")
+
+    assert resp.status_code == 503
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_post_not_retried():
+    http, calls = _client([503, 200])
+
+    resp = await http.post("http://rxnav.test/x")
+
+    assert resp.status_code == 503
+    assert calls == ["POST"]
+
+
+@pytest.mark.asyncio
+async def test_client_errors_not_retried():
+    http, calls = _client([404, 200])
+
+    resp = await http.get("http://rxnav.test/x")
+
+    assert resp.status_code == 404
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_after_honored():
+    sleeps = Sleeps()
+    http, _ = _client([429, 200], headers={"Retry-After": "2"}, sleep=sleeps)
+
+    await http.get("http://rxnav.test/x")
+
+    assert sleeps.delays == [2.0]
+
+
+@pytest.mark.asyncio
+async def test_retry_after_beyond_budget_gives_up():
+    http, calls = _client(
+        [429, 200], RetryPolicy(budget_seconds=1.0), headers={"Retry-After": "30"}
+    )
+
+    resp = await http.get("http://rxnav.test/x")
+
+    assert resp.status_code == 429
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_attempts_count_against_budget():
+    """Timeouts that each take 4s stop after 12s of a 10s budget, not 5 tries."""
+    now = [0.0]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        now[0] += 4.0
+        raise httpx.ReadTimeout("slow", request=request)
+
+    transport = RetryTransport(
+        httpx.MockTransport(handler),
+        RetryPolicy(max_attempts=5, base_delay=0.01, budget_seconds=10.0),
+        sleep=Sleeps(),
+        clock=lambda: now[0],
+    )
+    http = httpx.AsyncClient(transport=transport)
+
+    with pytest.raises(httpx.ReadTimeout):
+        await http.get("http://rxnav.test/x")
+    assert now[0] == 12.0
+
+
+@pytest.mark.asyncio
+async def test_transport_error_retried_then_raised():
+    error = httpx.ConnectError("refused")
+    http, calls = _client([error], RetryPolicy(max_attempts=3))
+
+    with pytest.raises(httpx.ConnectError):
+        await http.get("http://rxnav.test/x")
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_retries_recorded_in_request_metrics():
+    metrics = RequestMetrics()
+    token = current_metrics.set(metrics)
+    try:
+        http, _ = _client([503, 503, 200], headers={"Retry-After": "0.5"})
+        await http.get("http://rxnav.test/x")
+    finally:
+        current_metrics.reset(token)
+
+    assert metrics.to_dict() == {
+        "upstream_retries": {"rxnav": 2},
+        "upstream_retry_wait_seconds": 1.0,
+    }
+
+
+def test_retry_after_http_date():
+    resp = httpx.Response(503, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    assert retry_after_seconds(resp) == 0.0
+    assert retry_after_seconds(httpx.Response(503)) is None
+    assert retry_after_seconds(httpx.Response(503, headers={"Retry-After": "soon"})) is None
+
+
+def test_policy_from_settings_with_overrides():
+    settings = Settings(
+        retry_max_attempts=4,
+        retry_overrides={"pubmed": {"max_attempts": 2, "base_delay": 1.0}},
+    )
+
+    assert RetryPolicy.from_settings(settings, "rxnav").max_attempts == 4
+    pubmed = RetryPolicy.from_settings(settings, "pubmed")
+    assert pubmed.max_attempts == 2
+    assert isinstance(pubmed.max_attempts, int)
+    assert pubmed.base_delay == 1.0
+
+    bad = Settings(retry_overrides={"icd10": {"attempts": 2}})
+    with pytest.raises(ValueError, match="attempts"):
+        RetryPolicy.from_settings(bad, "icd10")
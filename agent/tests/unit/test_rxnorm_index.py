@@ -0,0 +1,199 @@
+"""Unit tests for the offline RxNorm index."""
+
+import os
+import tempfile
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.clients.fuzzy_matcher import FuzzyMatcher
+from app.clients.openfda import DrugInteractionClient
+from app.clients.rxnorm_index import RxNormIndex, build_index
+
+
+def _conso(rxcui, tty, name, sab="RXNORM", suppress="N"):
+    fields = [rxcui, "ENG", "", "", "", "", "", "", "", "", "", sab, tty, rxcui,
+              name, "", suppress, "4096"]
+    return "|".join(fields) + "|\n"
+
+
+def _rel(rxcui1, rela, rxcui2, sab="RXNORM"):
+    fields = [rxcui1, "", "CUI", "RO", rxcui2, "", "CUI", rela, "", "", sab, sab,
+              "", "", "N", ""]
+    return "|".join(fields) + "|\n"
+
+
+CONSO = [
+    _conso("6809", "IN", "metformin"),
+    _conso("235743", "PIN", "metformin hydrochloride"),
+    _conso("235743", "SY", "metformin HCl"),
+    _conso("861004", "SCDC", "metformin hydrochloride 500 MG"),
+    _conso("860975", "SCD", "metformin hydrochloride 500 MG Oral Tablet"),
+    _conso("151827", "BN", "Glucophage"),
+    _conso("861007", "SBD", "metformin hydrochloride 500 MG Oral Tablet [Glucophage]"),
+    _conso("29046", "IN", "lisinopril"),
+    _conso("99999", "IN", "withdrawndrug", suppress="O"),
+    _conso("88888", "IN", "splonly", sab="MTHSPL"),
+]
+
+# Mixed relationship directions: ingredient normalization must not depend on them.
+REL = [
+    _rel("6809", "ingredient_of", "861004"),
+    _rel("861004", "constitutes", "860975"),
+    _rel("860975", "tradename_of", "861007"),
+    _rel("151827", "tradename_of", "6809"),
+    _rel("6809", "has_form", "235743"),
+    _rel("29046", "has_tradename", "151827", sab="MTHSPL"),
+]
+
+
+@pytest.fixture(scope="module")
+def index_path():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, "RXNCONSO.RRF"), "w") as f:
+            f.writelines(CONSO)
+        with open(os.path.join(tmpdir, "RXNREL.RRF"), "w") as f:
+            f.writelines(REL)
+        path = os.path.join(tmpdir, "rxnorm.db")
+        counts = build_index(tmpdir, path)
+        assert counts["concepts"] == 7
+        yield path
+
+
+@pytest.fixture
+def index(index_path):
+    idx = RxNormIndex(index_path)
+    yield idx
+    idx.close()
+
+
+@pytest.mark.parametrize(
+    "rxcui", ["6809", "235743", "861004", "860975", "151827", "861007"]
+)
+def test_products_normalize_to_ingredient(index, rxcui):
+    assert index.get_ingredient(rxcui) == {"rxcui": "6809", "name": "metformin"}
+
+
+def test_unknown_rxcui_has_no_ingredient(index):
+    assert index.get_ingredient("12345") == {}
+
+
+def test_exact_name_resolves_tier1(index):
+    result = index.resolve("  GLUCOPHAGE ")
+
+    assert result == {
+        "original_name": "  GLUCOPHAGE ",
+        "rxcui": "6809",
+        "name": "metformin",
+        "resolution_tier": 1,
+        "confidence": 1.0,
+        "candidates": [],
+        "ambiguous": False,
+    }
+
+
+def test_synonym_resolves_tier3(index):
+    result = index.resolve("metformin hcl")
+
+    assert result["resolution_tier"] == 3
+    assert result["confidence"] == 0.6
+    assert result["rxcui"] == "6809"
+    assert result["candidates"] == [
+        {"rxcui": "235743", "name": "metformin hydrochloride"}
+    ]
+
+
+@pytest.mark.parametrize("name", ["withdrawndrug", "splonly", "metfromin"])
+def test_suppressed_foreign_and_misspelled_names_miss(index, name):
+    assert index.resolve(name) is None
+
+
+@pytest.mark.asyncio
+async def test_client_prefers_local_index(index):
+    client = DrugInteractionClient(rxnorm_index=index)
+    client.get_rxcui = AsyncMock(return_value=None)
+    client.get_approximate_match = AsyncMock(return_value=[])
+    client.get_drugs_by_name = AsyncMock(return_value=[])
+
+    local = await client.resolve_drug_name("lisinopril")
+    remote = await client.resolve_drug_name("metfromin")
+
+    assert local["rxcui"] == "29046"
+    assert remote["resolution_tier"] == 4
+    client.get_rxcui.assert_awaited_once_with("metfromin")
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_ingredient_normalization_uses_index(index):
+    client = DrugInteractionClient(rxnorm_index=index)
+    client.http.get = AsyncMock()
+
+    assert await client.get_ingredient_rxcui("861007") == {
+        "rxcui": "6809",
+        "name": "metformin",
+    }
+    client.http.get.assert_not_called()
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_match_resolves_locally(index):
+    client = DrugInteractionClient(
+        rxnorm_index=index, fuzzy_matcher=FuzzyMatcher(index.vocabulary())
+    )
+    client.http.get = AsyncMock()
+
+    result = await client.resolve_drug_name("Metfromin 500mg tab")
+
+    assert result["rxcui"] == "6809"
+    assert result["resolution_tier"] == 2
+    client.http.get.assert_not_called()
+    await client.close()
+
+
+class _StubMatcher:
+    def __init__(self, candidates):
+        self.candidates = candidates
+
+    def match(self, term, max_entries=5):
+        return self.candidates
+
+
+@pytest.mark.parametrize("candidates", [
+    # Too weak to trust without RxNav
+    [{"rxcui": "6809", "name": "metformin", "score": 72}],
+    # Near-tie between two different ingredients
+    [{"rxcui": "6809", "name": "metformin", "score": 84},
+     {"rxcui": "29046", "name": "lisinopril", "score": 80}],
+])
+@pytest.mark.asyncio
+async def test_weak_or_contested_fuzzy_match_defers_to_rxnav(index, candidates):
+    client = DrugInteractionClient(rxnorm_index=index, fuzzy_matcher=_StubMatcher(candidates))
+    client.get_rxcui = AsyncMock(return_value="1234567")
+    client.get_ingredient_rxcui = AsyncMock(return_value={})
+
+    result = await client.resolve_drug_name("metlisin")
+
+    assert result["rxcui"] == "1234567"
+    assert result["resolution_tier"] == 1
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_match_clear_of_rivals_is_accepted(index):
+    matcher = _StubMatcher([
+        {"rxcui": "6809", "name": "metformin", "score": 90},
+        {"rxcui": "235743", "name": "metformin hydrochloride", "score": 88},
+        {"rxcui": "29046", "name": "lisinopril", "score": 75},
+    ])
+    client = DrugInteractionClient(rxnorm_index=index, fuzzy_matcher=matcher)
+    client.http.get = AsyncMock()
+
+    result = await client.resolve_drug_name("metformn")
+
+    # Same-ingredient candidates are no rivals; lisinopril trails by 15.
+    assert result["rxcui"] == "6809"
+    assert result["ambiguous"] is False
+    client.http.get.assert_not_called()
+    await client.close()
@@ -0,0 +1,89 @@
+"""Unit tests for single-flight request coalescing."""
+
+import asyncio
+
+import pytest
+
+from app.clients.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight: SingleFlight[int] = SingleFlight()
+    calls = 0
+
+    async def fetch() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(*(flight.do("k", fetch) for _ in range(5)))
+
+    assert results == [42] * 5
+    assert calls == 1
+    assert flight.stats() == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    flight: SingleFlight[str] = SingleFlight()
+
+    async def fetch(value: str) -> str:
+        await asyncio.sleep(0)
+        return value
+
+    a, b = await asyncio.gather(
+        flight.do("a", lambda: fetch("a")), flight.do("b", lambda: fetch("b"))
+    )
+
+    assert (a, b) == ("a", "b")
+    assert flight.stats()["executed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_key_released_after_completion():
+    flight: SingleFlight[int] = SingleFlight()
+    calls = 0
+
+    async def fetch() -> int:
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await flight.do("k", fetch) == 1
+    assert await flight.do("k", fetch) == 2
+
+
+@pytest.mark.asyncio
+async def test_error_propagates_to_all_waiters():
+    flight: SingleFlight[int] = SingleFlight()
+
+    async def fail() -> int:
+        await asyncio.sleep(0.01)
+        raise ConnectionError("down")
+
+    results = await asyncio.gather(
+        flight.do("k", fail), flight.do("k", fail), return_exceptions=True
+    )
+
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert flight.stats()["executed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    flight: SingleFlight[int] = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch() -> int:
+        await release.wait()
+        return 7
+
+    first = asyncio.create_task(flight.do("k", fetch))
+    second = asyncio.create_task(flight.do("k", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == 7
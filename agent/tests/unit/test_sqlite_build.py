@@ -0,0 +1,49 @@
+"""Unit tests for the atomic SQLite build helper (agent/app/persistence/sqlite_build.py)."""
+
+import os
+import sqlite3
+
+import pytest
+
+from app.persistence.sqlite_build import building_sqlite
+
+
+def _rows(path: str) -> list[tuple]:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT v FROM t").fetchall()
+    finally:
+        conn.close()
+
+
+def _build(path: str, value: str) -> None:
+    with building_sqlite(path) as conn:
+        conn.execute("CREATE TABLE t (v TEXT)")
+        conn.execute("INSERT INTO t VALUES (?)", (value,))
+        conn.commit()
+
+
+def test_replaces_existing_file_on_success(tmp_path):
+    db_path = str(tmp_path / "index.db")
+    _build(db_path, "old")
+    # A stale temp file from a killed build is discarded, not reused.
+    with open(db_path + ".tmp", "wb") as f:
+        f.write(b"garbage")
+
+    _build(db_path, "new")
+
+    assert _rows(db_path) == [("new",)]
+    assert not os.path.exists(db_path + ".tmp")
+
+
+def test_failed_build_keeps_previous_index(tmp_path):
+    db_path = str(tmp_path / "index.db")
+    _build(db_path, "old")
+
+    with pytest.raises(ValueError):
+        with building_sqlite(db_path) as conn:
+            conn.execute("CREATE TABLE t (v TEXT)")
+            raise ValueError("bad input file")
+
+    assert _rows(db_path) == [("old",)]
+    assert not os.path.exists(db_path + ".tmp")
@@ -0,0 +1,116 @@
+"""Unit tests for get_patient_summary compaction (agent/app/tools/compaction.py)."""
+
+from app.tools.compaction import compact_chart, estimate_tokens
+
+
+def _bundle(*resources: dict) -> dict:
+    return {
+        "resourceType": "Bundle",
+        "meta": {"lastUpdated": "2026-01-15T10:00:00Z"},
+        "link": [{"relation": "self", "url": "http://openemr/fhir/Observation?..."}],
+        "entry": [{"fullUrl": "http://openemr/x", "resource": r} for r in resources],
+    }
+
+
+def _vital(day: int, value: int = 120) -> dict:
+    return {
+        "resourceType": "Observation",
+        "meta": {"versionId": "1", "lastUpdated": "2026-01-15T10:00:00Z"},
+        "text": {"status": "generated", "div": "<div>Blood pressure reading</div>"},
+        "code": {
+            "coding": [{"system": "http://loinc.org", "code": "85354-9",
+                        "display": "Blood pressure panel"}],
+            "text": "Blood Pressure",
+        },
+        "valueQuantity": {"value": value, "unit": "mmHg",
+                          "system": "http://unitsofmeasure.org", "code": "mm[Hg]"},
+        "effectiveDateTime": f"2026-01-{day:02d}",
+        "status": "final",
+    }
+
+
+def _sections(vitals: list[dict]) -> dict:
+    return {
+        "patient": {"resourceType": "Patient", "id": "p1",
+                    "meta": {"versionId": "3"},
+                    "name": [{"family": "Doe", "given": ["Jane"]}]},
+        "conditions": _bundle({"code": {"coding": [{"code": "I10",
+                                                    "display": "Hypertension"}]}}),
+        "medications": _bundle(
+            {"medicationCodeableConcept": {"text": "Lisinopril 10mg"}, "status": "active"},
+            {"medicationCodeableConcept": {"text": "Lisinopril 10mg"}, "status": "active"},
+        ),
+        "allergies": _bundle({
+            "code": {"coding": [{"system": "http://terminology.hl7.org/CodeSystem/"
+                                           "data-absent-reason", "display": "Unknown"}]},
+            "text": {"div": "<div xmlns='http://www.w3.org/1999/xhtml'>Sulfa</div>"},
+        }),
+        "vitals": _bundle(*vitals),
+    }
+
+
+def test_projects_sections_and_removes_duplicates():
+    data = compact_chart(_sections([_vital(3), _vital(3), _vital(9, 118)]))
+
+    assert data["patient"] == {"id": "p1", "name": "Jane Doe"}
+    assert data["conditions"] == [{"condition": "Hypertension", "code": "I10"}]
+    assert data["medications"] == [{"medication": "Lisinopril 10mg", "status": "active"}]
+    assert data["allergies"] == [{"substance": "Sulfa"}]
+    # Newest first, duplicate reading dropped
+    assert [v["date"] for v in data["vitals"]] == ["2026-01-09", "2026-01-03"]
+
+
+def test_compacted_chart_is_much_smaller_than_raw():
+    sections = _sections([_vital(d % 28 + 1, 100 + d) for d in range(30)])
+
+    data = compact_chart(sections, token_budget=0)
+
+    assert estimate_tokens(data) < estimate_tokens(sections) / 3
+
+
+def test_trims_longest_section_to_fit_budget():
+    sections = _sections([_vital(d % 28 + 1, 100 + d) for d in range(60)])
+
+    data = compact_chart(sections, token_budget=400)
+
+    assert estimate_tokens(data) <= 400
+    assert data["conditions"] and data["medications"] and data["allergies"]
+    kept = len(data["vitals"])
+    assert data["omitted"] == {"vitals": 60 - kept}
+    assert "get_vitals" in data["note"]
+    # The newest readings are the ones kept
+    assert data["vitals"][0]["date"] == "2026-01-28"
+
+
+def test_failed_sections_stay_none():
+    sections = _sections([])
+    sections["conditions"] = None
+
+    data = compact_chart(sections)
+
+    assert data["conditions"] is None
+    assert data["vitals"] == []
+
+
+def test_allergies_are_never_trimmed():
+    sections = _sections([])
+    sections["allergies"] = _bundle(
+        *({"code": {"text": f"Allergen {i}"}} for i in range(40))
+    )
+
+    data = compact_chart(sections, token_budget=100)
+
+    assert len(data["allergies"]) == 40
+    assert "allergies" not in data.get("omitted", {})
+
+
+def test_conditions_are_never_trimmed():
+    sections = _sections([])
+    sections["conditions"] = _bundle(
+        *({"code": {"text": f"Condition {i}"}} for i in range(40))
+    )
+
+    data = compact_chart(sections, token_budget=100)
+
+    assert len(data["conditions"]) == 40
+    assert "conditions" not in data.get("omitted", {})
@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
+import os
+import tempfile
+import time
 from unittest.mock import AsyncMock
 
+import httpx
 import pytest
 
 from app.clients.openfda import DrugInteractionClient, _deduplicate_ingredients
+from app.persistence.ttl_cache import SqliteTTLCache
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -22,6 +28,9 @@ def _make_client_with_tiers(
     """Build a DrugInteractionClient with mocked tier methods."""
     client = DrugInteractionClient.__new__(DrugInteractionClient)
     client.http = AsyncMock()
+    client.resolution_cache = None
+    client.rxnorm_index = None
+    client.hedge_delay = None
 
     client.get_rxcui = AsyncMock(return_value=exact)
     client.get_approximate_match = AsyncMock(return_value=approximate or [])
@@ -84,6 +93,9 @@ async def test_tier2_ambiguous_multiple_ingredients():
     """Approximate match with different ingredients → ambiguous, confidence 0.4."""
     client = DrugInteractionClient.__new__(DrugInteractionClient)
     client.http = AsyncMock()
+    client.resolution_cache = None
+    client.rxnorm_index = None
+    client.hedge_delay = None
     client.get_rxcui = AsyncMock(return_value=None)
     client.get_approximate_match = AsyncMock(
         return_value=[
@@ -288,6 +300,65 @@ async def test_check_interactions_mixed_resolved_partial():
     client.check_multi_interactions.assert_called_once_with(["1191", "11289"])
 
 
+@pytest.mark.asyncio
+async def test_check_interactions_resolves_concurrently_in_order():
+    """Drugs resolve concurrently, but results keep the input order."""
+    client = _make_client_with_tiers()
+    client.check_multi_interactions = AsyncMock(return_value=[])
+    delays = {"warfarin": 0.03, "aspirin": 0.01, "metformin": 0.0}
+    running = 0
+    peak = 0
+
+    async def mock_resolve(name):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(delays[name])
+        running -= 1
+        return {"rxcui": f"rx-{name}", "name": name, "resolution_tier": 1}
+
+    client.resolve_drug_name = mock_resolve
+
+    result = await client.check_interactions_by_names(["warfarin", "aspirin", "metformin"])
+
+    assert peak == 3
+    assert list(result["resolutions"]) == ["warfarin", "aspirin", "metformin"]
+    client.check_multi_interactions.assert_called_once_with(
+        ["rx-warfarin", "rx-aspirin", "rx-metformin"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_rxnav_calls_bounded_by_semaphore():
+    """Concurrent RxNav GETs never exceed max_concurrency."""
+    client = DrugInteractionClient(max_concurrency=2)
+    running = 0
+    peak = 0
+
+    async def fake_get(url, params=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return httpx.Response(
+            200,
+            json={"relatedGroup": {"conceptGroup": [
+                {"conceptProperties": [{"rxcui": url.split("/")[-2], "name": "x"}]}
+            ]}},
+            request=httpx.Request("GET", url),
+        )
+
+    client.http = AsyncMock()
+    client.http.get = fake_get
+    candidates = [{"rxcui": str(i)} for i in range(5)]
+
+    ingredients = await client._resolve_candidates_to_ingredients(candidates)
+
+    assert peak == 2
+    assert [i["rxcui"] for i in ingredients] == ["0", "1", "2", "3", "4"]
+
+
 # ---------------------------------------------------------------------------
 # Error handling
 # ---------------------------------------------------------------------------
@@ -298,6 +369,9 @@ async def test_tier1_api_error_falls_through():
     """API error in tier 1 gracefully falls to tier 2+."""
     client = DrugInteractionClient.__new__(DrugInteractionClient)
     client.http = AsyncMock()
+    client.resolution_cache = None
+    client.rxnorm_index = None
+    client.hedge_delay = None
     client.get_rxcui = AsyncMock(side_effect=ConnectionError("API down"))
     client.get_approximate_match = AsyncMock(return_value=[])
     client.get_drugs_by_name = AsyncMock(return_value=[])
@@ -310,6 +384,106 @@ async def test_tier1_api_error_falls_through():
     assert result["confidence"] == 0.0
 
 
+# ---------------------------------------------------------------------------
+# Hedged tiers
+# ---------------------------------------------------------------------------
+
+
+def _delayed(delay: float, value=None) -> AsyncMock:
+    async def call(*args):
+        await asyncio.sleep(delay)
+        return value
+
+    return AsyncMock(side_effect=call)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "tiers",
+    [
+        {"exact": "1191", "ingredient": {"rxcui": "1191", "name": "aspirin"}},
+        {
+            "approximate": [{"rxcui": "11", "name": "metformin", "score": "90"}],
+            "ingredient": {"rxcui": "6809", "name": "metformin"},
+        },
+        {
+            "drugs": [{"rxcui": "5000", "name": "Tylenol"}],
+            "ingredient": {"rxcui": "161", "name": "acetaminophen"},
+        },
+        {},
+    ],
+)
+async def test_hedged_matches_sequential(tiers):
+    sequential = _make_client_with_tiers(**tiers)
+    hedged = _make_client_with_tiers(**tiers)
+    hedged.hedge_delay = 0.01
+
+    assert await hedged.resolve_drug_name("x") == await sequential.resolve_drug_name("x")
+
+
+@pytest.mark.asyncio
+async def test_hedged_overlaps_slow_empty_tiers():
+    """Slow empty tiers 1 and 2 no longer add up before tier 3 answers."""
+    client = _make_client_with_tiers(
+        drugs=[{"rxcui": "5000", "name": "Tylenol"}],
+        ingredient={"rxcui": "161", "name": "acetaminophen"},
+    )
+    client.hedge_delay = 0.02
+    client.get_rxcui = _delayed(0.2)
+    client.get_approximate_match = _delayed(0.2, [])
+
+    start = time.monotonic()
+    result = await client.resolve_drug_name("Tylenol")
+    elapsed = time.monotonic() - start
+
+    assert result["resolution_tier"] == 3
+    assert elapsed < 0.35
+
+
+@pytest.mark.asyncio
+async def test_hedged_higher_tier_wins_even_if_slower():
+    client = _make_client_with_tiers(
+        drugs=[{"rxcui": "5000", "name": "Tylenol"}],
+        ingredient={"rxcui": "161", "name": "acetaminophen"},
+    )
+    client.hedge_delay = 0.01
+    client.get_rxcui = _delayed(0.1, "161")
+
+    result = await client.resolve_drug_name("acetaminophen")
+
+    assert result["resolution_tier"] == 1
+    assert result["confidence"] == 1.0
+    client.get_drugs_by_name.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_hedged_fast_answer_cancels_lower_tiers():
+    client = _make_client_with_tiers(
+        exact="1191", ingredient={"rxcui": "1191", "name": "aspirin"}
+    )
+    client.hedge_delay = 0.05
+
+    result = await client.resolve_drug_name("aspirin")
+    await asyncio.sleep(0.15)
+
+    assert result["resolution_tier"] == 1
+    client.get_approximate_match.assert_not_called()
+    client.get_drugs_by_name.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_hedged_error_counts_as_failed(resolution_cache):
+    client = _make_client_with_tiers()
+    client.hedge_delay = 0.01
+    client.resolution_cache = resolution_cache
+    client.get_approximate_match = AsyncMock(side_effect=ConnectionError("down"))
+
+    result = await client.resolve_drug_name("aspirin")
+
+    assert result["resolution_tier"] == 4
+    assert await resolution_cache.get("drug_resolution", "aspirin") is None
+
+
 # ---------------------------------------------------------------------------
 # _deduplicate_ingredients helper
 # ---------------------------------------------------------------------------
@@ -332,3 +506,70 @@ def test_deduplicate_ingredients_removes_duplicates():
 def test_deduplicate_ingredients_empty_list():
     """Empty list returns empty list."""
     assert _deduplicate_ingredients([]) == []
+
+
+# ---------------------------------------------------------------------------
+# Persistent resolution cache
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+async def resolution_cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = SqliteTTLCache(os.path.join(tmpdir, "cache.db"))
+        await cache.init_db()
+        yield cache
+        await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_resolution_served_from_cache(resolution_cache):
+    """A repeat lookup of the same drug makes no RxNav calls."""
+    client = _make_client_with_tiers(
+        exact="6809", ingredient={"rxcui": "6809", "name": "metformin"}
+    )
+    client.resolution_cache = resolution_cache
+    client.resolution_ttl = 3600
+    client.negative_ttl = 60
+
+    first = await client.resolve_drug_name("Metformin")
+    second = await client.resolve_drug_name("  metformin ")
+
+    assert client.get_rxcui.call_count == 1
+    assert second["rxcui"] == first["rxcui"] == "6809"
+    assert second["resolution_tier"] == 1
+    assert second["original_name"] == "  metformin "
+
+
+@pytest.mark.asyncio
+async def test_unresolved_cached_with_negative_ttl(resolution_cache):
+    client = _make_client_with_tiers()
+    client.resolution_cache = resolution_cache
+    client.resolution_ttl = 3600
+    client.negative_ttl = 60
+
+    await client.resolve_drug_name("notadrug")
+    result = await client.resolve_drug_name("notadrug")
+
+    assert result["resolution_tier"] == 4
+    assert client.get_rxcui.call_count == 1
+    cursor = await resolution_cache._conn.execute(
+        "SELECT expires_at - ? FROM ttl_cache WHERE key = 'notadrug'",
+        (time.time(),),
+    )
+    (remaining,) = await cursor.fetchone()
+    assert 0 < remaining <= 60
+
+
+@pytest.mark.asyncio
+async def test_unresolved_after_api_error_not_cached(resolution_cache):
+    client = _make_client_with_tiers()
+    client.get_rxcui = AsyncMock(side_effect=ConnectionError("API down"))
+    client.resolution_cache = resolution_cache
+    client.resolution_ttl = 3600
+    client.negative_ttl = 60
+
+    await client.resolve_drug_name("aspirin")
+    await client.resolve_drug_name("aspirin")
+
+    assert client.get_rxcui.call_count == 2
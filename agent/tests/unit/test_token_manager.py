@@ -0,0 +1,120 @@
+"""Unit tests for serialized, proactive OAuth2 token refresh."""
+
+import asyncio
+
+import pytest
+
+from app.clients.token_manager import TokenManager
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _counting_acquire(expires_in: float | None = 3600, delay: float = 0.0):
+    calls = {"n": 0}
+
+    async def acquire() -> dict:
+        calls["n"] += 1
+        if delay:
+            await asyncio.sleep(delay)
+        data: dict = {"access_token": f"token-{calls['n']}"}
+        if expires_in is not None:
+            data["expires_in"] = expires_in
+        return data
+
+    return acquire, calls
+
+
+@pytest.mark.asyncio
+async def test_first_get_token_acquires_once_for_concurrent_callers():
+    acquire, calls = _counting_acquire(delay=0.01)
+    tokens = TokenManager(acquire)
+
+    results = await asyncio.gather(*(tokens.get_token() for _ in range(10)))
+
+    assert calls["n"] == 1
+    assert set(results) == {"token-1"}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_401_refreshes_once():
+    acquire, calls = _counting_acquire(delay=0.01)
+    tokens = TokenManager(acquire)
+    await tokens.get_token()
+    stale = tokens.generation
+
+    await asyncio.gather(
+        *(tokens.refresh(stale_generation=stale) for _ in range(10))
+    )
+
+    assert calls["n"] == 2
+    assert tokens.access_token == "token-2"
+
+
+@pytest.mark.asyncio
+async def test_expired_token_refreshed_before_use():
+    clock = FakeClock()
+    acquire, calls = _counting_acquire(expires_in=100)
+    tokens = TokenManager(acquire, refresh_margin=10, clock=clock)
+    assert await tokens.get_token() == "token-1"
+
+    clock.now += 101
+    assert tokens.expired
+    assert await tokens.get_token() == "token-2"
+    assert calls["n"] == 2
+
+
+@pytest.mark.asyncio
+async def test_refresh_starts_in_background_near_expiry():
+    clock = FakeClock()
+    acquire, calls = _counting_acquire(expires_in=100)
+    tokens = TokenManager(acquire, refresh_margin=10, clock=clock)
+    await tokens.get_token()
+
+    clock.now += 95  # inside the refresh margin, not yet expired
+    # The still-valid token is handed out immediately...
+    assert await tokens.get_token() == "token-1"
+    assert await tokens.get_token() == "token-1"
+    # ...while exactly one background refresh replaces it.
+    assert tokens._background is not None
+    await tokens._background
+    assert calls["n"] == 2
+    assert await tokens.get_token() == "token-2"
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_failure_keeps_current_token():
+    clock = FakeClock()
+    calls = {"n": 0}
+
+    async def acquire() -> dict:
+        calls["n"] += 1
+        if calls["n"] > 1:
+            raise ConnectionError("token endpoint down")
+        return {"access_token": "token-1", "expires_in": 100}
+
+    tokens = TokenManager(acquire, refresh_margin=10, clock=clock)
+    await tokens.get_token()
+    clock.now += 95
+
+    assert await tokens.get_token() == "token-1"
+    assert tokens._background is not None
+    await tokens._background
+    assert tokens.access_token == "token-1"
+
+
+@pytest.mark.asyncio
+async def test_no_expiry_tracking_without_expires_in():
+    acquire, calls = _counting_acquire(expires_in=None)
+    tokens = TokenManager(acquire)
+    await tokens.get_token()
+
+    assert tokens.expires_at is None
+    assert not tokens.expired
+    await tokens.get_token()
+    assert calls["n"] == 1
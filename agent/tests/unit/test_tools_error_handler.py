@@ -2,6 +2,7 @@
 
 import pytest
 
+from app.clients.upstream_guard import UpstreamUnavailableError
 from app.tools.base import tool_error_handler
 
 
@@ -25,3 +26,17 @@ async def test_error_handler_catches_timeout():
     result = await slow_tool()
     assert result["status"] == "error"
     assert "timed out" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_error_handler_structures_upstream_unavailable():
+    @tool_error_handler
+    async def guarded_tool():
+        raise UpstreamUnavailableError("rxnav.nlm.nih.gov", "circuit open", 12.3)
+
+    result = await guarded_tool()
+    assert result["status"] == "error"
+    assert result["retryable"] is True
+    assert result["upstream"] == "rxnav.nlm.nih.gov"
+    assert result["retry_after_seconds"] == 12.3
+    assert "circuit open" in result["error"]
@@ -30,9 +30,32 @@ async def test_passes_laboratory_category_to_client(mock_openemr_client):
 
     await get_lab_results.ainvoke({"patient_uuid": "uuid-1"})
 
-    mock_openemr_client.get_observations.assert_called_once_with(
-        "uuid-1", category="laboratory"
-    )
+    mock_openemr_client.get_observations.assert_called_once()
+    args, kwargs = mock_openemr_client.get_observations.call_args
+    assert args == ("uuid-1",)
+    assert kwargs["category"] == "laboratory"
+
+
+@pytest.mark.asyncio
+async def test_passes_filters_to_client(mock_openemr_client):
+    """Date window, LOINC codes and result cap are pushed down to the FHIR search."""
+    set_client(mock_openemr_client)
+
+    await get_lab_results.ainvoke({
+        "patient_uuid": "uuid-1",
+        "date_from": "2025-01-01",
+        "date_to": "2025-12-31",
+        "loinc_codes": ["4548-4"],
+        "max_results": 5,
+    })
+
+    kwargs = mock_openemr_client.get_observations.call_args.kwargs
+    assert kwargs["date_from"] == "2025-01-01"
+    assert kwargs["date_to"] == "2025-12-31"
+    assert kwargs["codes"] == ["4548-4"]
+    assert kwargs["count"] == 5
+    assert kwargs["sort"] == "-date"
+    assert "valueQuantity" in kwargs["elements"]
 
 
 @pytest.mark.asyncio
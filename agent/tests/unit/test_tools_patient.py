@@ -19,58 +19,77 @@ async def test_get_patient_summary_happy_path(mock_openemr_client):
 
     assert result["status"] == "success"
     data = result["data"]
-    assert data["patient"]["id"] == "uuid-1"
-    assert data["patient"]["name"][0]["family"] == "Doe"
-
-    # Conditions bundle forwarded as-is
-    assert data["conditions"]["resourceType"] == "Bundle"
-    assert len(data["conditions"]["entry"]) == 1
-    assert data["conditions"]["entry"][0]["resource"]["code"]["coding"][0]["code"] == "E11.9"
-
-    # Medications bundle contains both meds
-    assert len(data["medications"]["entry"]) == 2
-    med_texts = [
-        e["resource"]["medicationCodeableConcept"]["text"]
-        for e in data["medications"]["entry"]
+    assert data["patient"] == {
+        "id": "uuid-1",
+        "name": "John Doe",
+        "birthDate": "1980-01-15",
+        "gender": "male",
+    }
+
+    # Sections are compacted to their clinical fields
+    assert data["conditions"] == [
+        {"condition": "Type 2 diabetes mellitus", "code": "E11.9", "status": "active"}
     ]
-    assert "Metformin 500mg" in med_texts
-    assert "Lisinopril 10mg" in med_texts
+    med_names = [m["medication"] for m in data["medications"]]
+    assert med_names == ["Metformin 500mg", "Lisinopril 10mg"]
+    assert data["allergies"][0]["substance"] == "Penicillin"
+    assert data["allergies"][0]["reactions"] == ["Hives"]
+    assert data["vitals"] == [
+        {"type": "Blood Pressure", "value": 120, "unit": "mmHg", "date": "2026-01-15"}
+    ]
+    assert "note" not in data
+
 
-    # Allergies bundle
-    assert len(data["allergies"]["entry"]) == 1
-    assert data["allergies"]["entry"][0]["resource"]["code"]["text"] == "Penicillin"
+@pytest.mark.asyncio
+async def test_get_patient_summary_fetches_chart_once(mock_openemr_client):
+    """The summary is built from a single concurrent get_chart() fan-out."""
+    set_client(mock_openemr_client)
+
+    await get_patient_summary.ainvoke({"patient_uuid": "uuid-1"})
 
-    # Vitals bundle
-    assert data["vitals"]["entry"][0]["resource"]["code"]["text"] == "Blood Pressure"
+    mock_openemr_client.get_chart.assert_awaited_once_with("uuid-1")
 
 
 @pytest.mark.asyncio
-async def test_get_patient_summary_calls_all_five_endpoints(mock_openemr_client):
-    """Verify each OpenEMR endpoint is called exactly once with the correct UUID."""
+async def test_get_patient_summary_partial_result_on_section_error(
+    mock_openemr_client,
+):
+    """A failed section yields a partial summary with per-section errors."""
+    chart = mock_openemr_client.get_chart.return_value
+    del chart["sections"]["conditions"]
+    chart["errors"] = {"conditions": "ConnectionError: API unreachable"}
     set_client(mock_openemr_client)
 
-    await get_patient_summary.ainvoke({"patient_uuid": "uuid-1"})
+    result = await get_patient_summary.ainvoke({"patient_uuid": "uuid-1"})
 
-    mock_openemr_client.get_patient.assert_awaited_once_with("uuid-1")
-    mock_openemr_client.get_conditions.assert_awaited_once_with("uuid-1")
-    mock_openemr_client.get_medications.assert_awaited_once_with("uuid-1")
-    mock_openemr_client.get_allergies.assert_awaited_once_with("uuid-1")
-    mock_openemr_client.get_vitals.assert_awaited_once_with("uuid-1")
+    assert result["status"] == "success"
+    data = result["data"]
+    assert data["partial"] is True
+    assert data["conditions"] is None
+    assert data["section_errors"] == {"conditions": "ConnectionError: API unreachable"}
+    assert data["patient"]["id"] == "uuid-1"
+    assert len(data["medications"]) == 2
 
 
 @pytest.mark.asyncio
-async def test_get_patient_summary_client_error_returns_structured_error(
+async def test_get_patient_summary_all_sections_failed_returns_error(
     mock_openemr_client,
 ):
-    """When any sub-call raises, tool_error_handler returns a structured error dict."""
-    mock_openemr_client.get_conditions.side_effect = ConnectionError("API unreachable")
+    """When every section fails the tool reports a structured error."""
+    mock_openemr_client.get_chart.return_value = {
+        "sections": {},
+        "errors": {
+            "patient": "ConnectionError: API unreachable",
+            "vitals": "TimeoutError: ",
+        },
+        "timings_ms": {},
+    }
     set_client(mock_openemr_client)
 
     result = await get_patient_summary.ainvoke({"patient_uuid": "uuid-1"})
 
     assert result["status"] == "error"
     assert "get_patient_summary" in result["error"]
-    assert "ConnectionError" in result["error"]
     assert "API unreachable" in result["error"]
 
 
@@ -79,7 +98,7 @@ async def test_get_patient_summary_timeout_returns_structured_error(
     mock_openemr_client,
 ):
     """TimeoutError is caught and returns a structured timeout error."""
-    mock_openemr_client.get_vitals.side_effect = TimeoutError()
+    mock_openemr_client.get_chart.side_effect = TimeoutError()
     set_client(mock_openemr_client)
 
     result = await get_patient_summary.ainvoke({"patient_uuid": "uuid-1"})
@@ -2,6 +2,7 @@
 
 from unittest.mock import AsyncMock
 
+import httpx
 import pytest
 
 from app.tools.pubmed import pubmed_search, set_client
@@ -240,3 +241,64 @@ async def test_articles_with_empty_and_missing_fields_handled_gracefully():
     second = next(a for a in returned if a["pmid"] == "66666666")
     assert second["title"] == ""
     assert second["authors"] == ["Solo Author"]
+
+
+# ---------------------------------------------------------------------------
+# include_abstracts — abstracts merged into the matching articles
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_include_abstracts_merges_streamed_abstracts():
+    """With include_abstracts, each article gets its abstract from iter_abstracts."""
+    client = AsyncMock()
+    client.search.return_value = [
+        _make_article(pmid="11111111"),
+        _make_article(pmid="22222222"),
+    ]
+    requested: list[str] = []
+
+    async def iter_abstracts(pmids):
+        requested.extend(pmids)
+        yield {"pmid": "22222222", "abstract": "Short abstract.", "truncated": False}
+
+    client.iter_abstracts = iter_abstracts
+    set_client(client)
+
+    result = await pubmed_search.ainvoke(
+        {"query": "metformin renal dosing", "include_abstracts": True}
+    )
+
+    articles = result["data"]["articles"]
+    assert requested == ["11111111", "22222222"]
+    assert "abstract" not in articles[0]
+    assert articles[1]["abstract"] == "Short abstract."
+    assert articles[1]["abstract_truncated"] is False
+
+
+@pytest.mark.asyncio
+async def test_abstract_outage_keeps_search_results():
+    """An efetch failure after a successful search returns the articles."""
+    client = AsyncMock()
+    client.search.return_value = [
+        _make_article(pmid="11111111"),
+        _make_article(pmid="22222222"),
+    ]
+
+    async def iter_abstracts(pmids):
+        yield {"pmid": "11111111", "abstract": "Streamed first.", "truncated": False}
+        raise httpx.ConnectError("efetch unreachable")
+
+    client.iter_abstracts = iter_abstracts
+    set_client(client)
+
+    result = await pubmed_search.ainvoke(
+        {"query": "metformin renal dosing", "include_abstracts": True}
+    )
+
+    assert result["status"] == "success"
+    articles = result["data"]["articles"]
+    assert [a["pmid"] for a in articles] == ["11111111", "22222222"]
+    assert articles[0]["abstract"] == "Streamed first."
+    assert "abstract" not in articles[1]
+    assert "could not be retrieved" in result["data"]["note"]
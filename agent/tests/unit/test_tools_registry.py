@@ -8,7 +8,7 @@ def test_mvp_tools_count():
 
 
 def test_all_tools_count():
-    assert len(ALL_TOOLS) == 11
+    assert len(ALL_TOOLS) == 12
 
 
 def test_all_tools_have_names():
@@ -0,0 +1,41 @@
+"""Unit tests for the interaction screening LangChain tool."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.tools.screening import get_interaction_screening, set_store
+
+
+@pytest.mark.asyncio
+async def test_returns_latest_screening():
+    store = AsyncMock()
+    store.get_latest.return_value = {
+        "run_id": "run-1",
+        "screened_at": "2026-10-16T02:00:00+00:00",
+        "medications": ["Warfarin 5mg", "Aspirin 81mg"],
+        "interactions": [{"severity": "high", "description": "Bleeding"}],
+        "unresolved": [],
+        "check_complete": True,
+        "warning": None,
+    }
+    set_store(store)
+
+    result = await get_interaction_screening.ainvoke({"patient_uuid": "uuid-1"})
+
+    assert result["status"] == "success"
+    assert result["data"]["screened"] is True
+    assert result["data"]["interactions"][0]["severity"] == "high"
+    store.get_latest.assert_awaited_once_with("uuid-1")
+
+
+@pytest.mark.asyncio
+async def test_unscreened_patient():
+    store = AsyncMock()
+    store.get_latest.return_value = None
+    set_store(store)
+
+    result = await get_interaction_screening.ainvoke({"patient_uuid": "uuid-2"})
+
+    assert result["status"] == "success"
+    assert result["data"]["screened"] is False
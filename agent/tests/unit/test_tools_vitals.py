@@ -196,3 +196,23 @@ async def test_no_client_raises_runtime_error():
     assert result["status"] == "error"
     assert "error" in result
     assert "RuntimeError" in result["error"] or "not initialized" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_requests_most_recent_vitals_with_filters(mock_openemr_client):
+    """Filters are pushed down to the client, newest-first and capped."""
+    set_client(mock_openemr_client)
+
+    await get_vitals.ainvoke({
+        "patient_uuid": "uuid-1",
+        "date_from": "2026-01-01",
+        "loinc_codes": ["8867-4"],
+    })
+
+    args, kwargs = mock_openemr_client.get_vitals.call_args
+    assert args == ("uuid-1",)
+    assert kwargs["date_from"] == "2026-01-01"
+    assert kwargs["date_to"] is None
+    assert kwargs["codes"] == ["8867-4"]
+    assert kwargs["sort"] == "-date"
+    assert kwargs["count"] == 25
@@ -0,0 +1,90 @@
+"""Unit tests for the SQLite-backed TTL cache."""
+
+import os
+import tempfile
+
+import pytest
+
+from app.persistence.ttl_cache import SqliteTTLCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+async def cache_path():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield os.path.join(tmpdir, "cache.db")
+
+
+@pytest.fixture
+async def cache(cache_path):
+    c = SqliteTTLCache(cache_path, clock=FakeClock())
+    await c.init_db()
+    yield c
+    await c.close()
+
+
+@pytest.mark.asyncio
+async def test_set_and_get_roundtrip(cache):
+    await cache.set("ns", "metformin", {"rxcui": "6809", "confidence": 1.0}, ttl=60)
+
+    assert await cache.get("ns", "metformin") == {"rxcui": "6809", "confidence": 1.0}
+    assert await cache.get("other", "metformin") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_expire(cache):
+    await cache.set("ns", "short", 1, ttl=10)
+    await cache.set("ns", "long", 2, ttl=100)
+
+    cache._clock.now += 50
+    assert await cache.get("ns", "short") is None
+    assert await cache.get("ns", "long") == 2
+    assert await cache.purge_expired() == 1
+
+
+@pytest.mark.asyncio
+async def test_get_many(cache):
+    await cache.set_many("ns", {"a": 1, "b": 2}, ttl=60)
+
+    assert await cache.get_many("ns", ["a", "b", "c"]) == {"a": 1, "b": 2}
+    assert await cache.get_many("ns", []) == {}
+
+
+@pytest.mark.asyncio
+async def test_get_many_beyond_sqlite_variable_limit(cache):
+    values = {f"k{i}": i for i in range(2500)}
+    await cache.set_many("ns", values, ttl=60)
+
+    assert await cache.get_many("ns", list(values) + ["missing"]) == values
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_across_connections(cache_path):
+    """A second process (connection) sees entries written by the first."""
+    writer = SqliteTTLCache(cache_path)
+    reader = SqliteTTLCache(cache_path)
+    try:
+        await writer.set("ns", "k", "v", ttl=60)
+        assert await reader.get("ns", "k") == "v"
+    finally:
+        await writer.close()
+        await reader.close()
+
+
+@pytest.mark.asyncio
+async def test_read_errors_are_misses(cache):
+    await cache._conn.execute("DROP TABLE ttl_cache")
+
+    assert await cache.get("ns", "k") is None
+    await cache.set("ns", "k", "v", ttl=60)  # logged, not raised
+    assert await cache.purge_expired() == 0
@@ -0,0 +1,176 @@
+"""Unit tests for the per-upstream concurrency limit and circuit breaker."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.clients.upstream_guard import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    GuardConfig,
+    GuardedTransport,
+    GuardRegistry,
+    UpstreamGuard,
+    UpstreamUnavailableError,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _guard(clock=None, **overrides) -> UpstreamGuard:
+    config = GuardConfig(**{"failure_threshold": 3, "open_seconds": 30.0, **overrides})
+    return UpstreamGuard("rxnav.test", config, clock=clock or FakeClock())
+
+
+async def _call(guard: UpstreamGuard, ok: bool = True, latency: float = 0.01) -> None:
+    await guard.acquire()
+    await guard.release(ok, latency)
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_after_consecutive_failures():
+    guard = _guard()
+    for _ in range(3):
+        await _call(guard, ok=False)
+
+    assert guard.state == OPEN
+    with pytest.raises(UpstreamUnavailableError) as exc:
+        await guard.acquire()
+    assert exc.value.reason == "circuit open"
+    assert exc.value.retry_after == pytest.approx(30.0)
+    assert guard.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_success_resets_failure_streak():
+    guard = _guard()
+    await _call(guard, ok=False)
+    await _call(guard, ok=False)
+    await _call(guard, ok=True)
+    await _call(guard, ok=False)
+
+    assert guard.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_slow_responses_count_as_failures():
+    guard = _guard(latency_threshold=1.0)
+    for _ in range(3):
+        await _call(guard, ok=True, latency=5.0)
+
+    assert guard.state == OPEN
+
+
+@pytest.mark.asyncio
+async def test_half_open_allows_single_probe():
+    clock = FakeClock()
+    guard = _guard(clock)
+    for _ in range(3):
+        await _call(guard, ok=False)
+
+    clock.now += 31
+    await guard.acquire()  # the probe
+    assert guard.state == HALF_OPEN
+    with pytest.raises(UpstreamUnavailableError, match="half-open"):
+        await guard.acquire()
+
+    await guard.release(True, 0.01)
+    assert guard.state == CLOSED
+    await _call(guard)
+
+
+@pytest.mark.asyncio
+async def test_failed_probe_reopens():
+    clock = FakeClock()
+    guard = _guard(clock)
+    for _ in range(3):
+        await _call(guard, ok=False)
+
+    clock.now += 31
+    await _call(guard, ok=False)
+
+    assert guard.state == OPEN
+    assert guard.opened_at == clock.now
+
+
+@pytest.mark.asyncio
+async def test_aimd_limit_halves_on_failure_and_grows_back():
+    guard = _guard(max_concurrency=8, failure_threshold=100)
+    await _call(guard, ok=False)
+    assert guard.stats()["limit"] == 4
+    await _call(guard, ok=False)
+    assert guard.stats()["limit"] == 2
+
+    for _ in range(20):
+        await _call(guard)
+    assert guard.stats()["limit"] > 2
+    assert guard.limit <= 8
+
+
+@pytest.mark.asyncio
+async def test_saturated_guard_fails_fast():
+    guard = _guard(max_concurrency=1, queue_timeout=0.05)
+    await guard.acquire()
+
+    with pytest.raises(UpstreamUnavailableError, match="concurrency limit"):
+        await guard.acquire()
+
+    await guard.release(True, 0.01)
+    await _call(guard)
+
+
+@pytest.mark.asyncio
+async def test_waiter_gets_slot_when_released():
+    guard = _guard(max_concurrency=1, queue_timeout=1.0)
+    await guard.acquire()
+
+    waiter = asyncio.create_task(guard.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    await guard.release(True, 0.01)
+    await waiter
+    assert guard.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_transport_records_outcomes_per_host():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503 if request.url.host == "down.test" else 200)
+
+    guards = GuardRegistry(GuardConfig(failure_threshold=2))
+    transport = GuardedTransport(httpx.MockTransport(handler), guards=guards)
+    async with httpx.AsyncClient(transport=transport) as http:
+        for _ in range(2):
+            await http.get("http://down.test/x")
+            await http.get("http://up.test/x")
+        with pytest.raises(UpstreamUnavailableError):
+            await http.get("http://down.test/x")
+        resp = await http.get("http://up.test/x")
+
+    assert resp.status_code == 200
+    stats = guards.stats()
+    assert stats["down.test"]["state"] == OPEN
+    assert stats["up.test"]["state"] == CLOSED
+    assert stats["up.test"]["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_transport_counts_connection_errors():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("refused", request=request)
+
+    guards = GuardRegistry(GuardConfig(failure_threshold=1))
+    transport = GuardedTransport(httpx.MockTransport(handler), guards=guards)
+    async with httpx.AsyncClient(transport=transport) as http:
+        with pytest.raises(httpx.ConnectError):
+            await http.get("http://down.test/x")
+        with pytest.raises(UpstreamUnavailableError):
+            await http.get("http://down.test/x")